@@ -0,0 +1,60 @@
+"""
+Copyright 2026 GRENMap Authors
+
+SPDX-License-Identifier: Apache License 2.0
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+--------------------------------------------------------------------
+
+Synopsis: Times the computation of the lengths of the links of a
+topology, from the topology and from a TopologyFrame. Requires NumPy.
+    Example use:
+    PYTHONPATH=. python3 benchmarks/bench_link_lengths.py 200000
+"""
+import random
+import sys
+from timeit import timeit
+
+from grenml import GRENMLManager
+from grenml.models import Node, Link
+
+
+def build_manager(size):
+    rng = random.Random(0)
+    manager = GRENMLManager(name='Benchmark')
+    for i in range(size):
+        manager.topology.add_node(Node(
+            id=f'node-{i}', latitude=rng.uniform(-90, 90), longitude=rng.uniform(-180, 180),
+        ))
+    for i in range(size):
+        manager.topology.add_link(Link(
+            id=f'link-{i}', nodes=[f'node-{i}', f'node-{rng.randrange(size)}'],
+        ))
+    return manager
+
+
+def main(size):
+    topology = build_manager(size).topology
+    first = timeit(topology.link_lengths, number=1)
+    cached = timeit(topology.link_lengths, number=10) / 10
+    frame = topology.to_frame()
+    vectorized = timeit(frame.link_lengths, number=10) / 10
+    print(f'{size} links')
+    print(f'Topology.link_lengths, first call:  {first * 1000:.1f} ms')
+    print(f'Topology.link_lengths, cached:      {cached * 1000:.1f} ms')
+    print(f'TopologyFrame.link_lengths:         {vectorized * 1000:.1f} ms')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
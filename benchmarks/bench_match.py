@@ -0,0 +1,69 @@
+"""
+Copyright 2026 GRENMap Authors
+
+SPDX-License-Identifier: Apache License 2.0
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+--------------------------------------------------------------------
+
+Synopsis: Compares the per-element cost of matching a search against
+every node of a large topology with GRENMLObject.match, which compiles
+the arguments of the search again for each node, and with a predicate
+from compile_match, compiled once, which Topology.get_elements uses.
+    Example use: PYTHONPATH=. python3 benchmarks/bench_match.py 100000
+"""
+import sys
+from timeit import timeit
+
+from grenml.models import Topology, Node, NODES
+from grenml.models.meta import compile_match
+
+SEARCHES = {
+    'exact name': {'name': 'Node 99999'},
+    'name__contains': {'name__contains': '9999'},
+    'owners__contains': {'owners__contains': ['owner-3', 'owner-4']},
+    'owners__in': {'owners__in': ['owner-1', 'owner-2', 'owner-3', 'owner-4']},
+}
+
+
+def build_topology(size):
+    topology = Topology(name='Benchmark')
+    for i in range(size):
+        topology.add_node(Node(
+            id=f'node-{i}', name=f'Node {i}', owners=[f'owner-{i % 5}', f'owner-{i % 7}'],
+        ))
+    return topology
+
+
+def main(size):
+    topology = build_topology(size)
+    nodes = list(topology._elements[NODES])
+    print(f'{len(nodes)} nodes, ns per element')
+    print(f'{"search":<20}{"match":>10}{"compiled":>10}')
+    for label, kwargs in SEARCHES.items():
+        per_call = timeit(lambda: [node.match(**kwargs) for node in nodes], number=3) / 3
+
+        def compiled():
+            predicate = compile_match(**kwargs)
+            return [predicate(node) for node in nodes]
+
+        per_compiled = timeit(compiled, number=3) / 3
+        print(
+            f'{label:<20}{per_call / len(nodes) * 1e9:>10.0f}'
+            f'{per_compiled / len(nodes) * 1e9:>10.0f}'
+        )
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,108 @@
+"""
+Copyright 2026 GRENMap Authors
+
+SPDX-License-Identifier: Apache License 2.0
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+--------------------------------------------------------------------
+
+Synopsis: Measures the memory used per element by a topology of nodes
+and links, as allocated while building it, and again once the queries
+that need them have built its reverse and global indexes. Given a git
+revision, such as the one before the model classes were slotted, it
+also measures the build of the package at that revision, extracted with
+git archive into a temporary directory and run in another process.
+    Example use:
+    PYTHONPATH=. python3 benchmarks/bench_memory.py 100000 [revision]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+from grenml import GRENMLManager
+from grenml.models import Node, Link
+
+
+def build_manager(size):
+    manager = GRENMLManager(name='Benchmark')
+    manager.add_institution(id='owner', name='Owner', primary_owner=True)
+    for i in range(size):
+        manager.add_node(Node(
+            id=f'node-{i}', name=f'Node {i}', short_name=f'N{i}',
+            latitude=(i % 180) - 90, longitude=(i % 360) - 180, address=f'{i} Main Street',
+            lifetime_start='2020-01-01T00:00:00+00:00', version='2021-01-01T00:00:00+00:00',
+        ))
+    for i in range(size):
+        manager.add_link(Link(
+            id=f'link-{i}', name=f'Link {i}', nodes=[f'node-{i}', f'node-{(i + 1) % size}'],
+        ))
+    return manager
+
+
+def bytes_per_element(size, build_indexes=False):
+    """
+    :return: The memory allocated while building a topology of size
+        nodes and size links, and optionally its reverse and global
+        indexes, divided by the number of elements
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    manager = build_manager(size)
+    if build_indexes:
+        manager.topology.links_of('node-0')
+        manager.topology.find_anywhere('node-0')
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del manager
+    return (after - before) / (2 * size)
+
+
+def bytes_per_element_at(size, revision):
+    """
+    Measure the build of the package at a git revision of this
+    repository, by running this script on it in another process.
+    """
+    repository = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory() as directory:
+        archive = subprocess.run(
+            ['git', 'archive', revision, 'grenml'], cwd=repository, check=True,
+            stdout=subprocess.PIPE,
+        ).stdout
+        subprocess.run(['tar', '-x', '-C', directory], input=archive, check=True)
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), str(size), '--build-only'],
+            env=dict(os.environ, PYTHONPATH=directory), check=True, stdout=subprocess.PIPE,
+        ).stdout
+    return float(output)
+
+
+def main(size, revision=None):
+    print(f'{size} nodes and {size} links')
+    print(f'{bytes_per_element(size):.0f} bytes per element as built')
+    print(f'{bytes_per_element(size, True):.0f} bytes per element with the reverse and '
+          f'global indexes built')
+    if revision is not None:
+        print(f'{bytes_per_element_at(size, revision):.0f} bytes per element as built '
+              f'at {revision}')
+
+
+if __name__ == '__main__':
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    if sys.argv[2:] == ['--build-only']:
+        # Only what every revision can build, see bytes_per_element_at
+        print(bytes_per_element(size))
+    else:
+        main(size, sys.argv[2] if len(sys.argv) > 2 else None)
@@ -0,0 +1,105 @@
+"""
+Copyright 2026 GRENMap Authors
+
+SPDX-License-Identifier: Apache License 2.0
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+--------------------------------------------------------------------
+
+Synopsis: Measures the time taken to parse a large GRENML document,
+per XML element, at once, element by element and in chunks, and the
+cost of finding the handler of an element from the dispatch tables
+against scanning the handler classes.
+    Example use:
+    PYTHONPATH=. python3 benchmarks/bench_parse.py 20000
+"""
+import inspect
+import sys
+from io import BytesIO
+from time import perf_counter
+from timeit import timeit
+
+from grenml import GRENMLManager
+from grenml.models import Institution, Node, Link
+from grenml.parse import GRENMLParser
+from grenml.parsing import ElementHandler, GRENMLHandler
+
+
+def build_document(size):
+    manager = GRENMLManager(name='Benchmark')
+    manager.add_institution(
+        Institution('institution', 'Institution', longitude=1, latitude=1), primary_owner=True,
+    )
+    for i in range(size):
+        manager.topology.add_node(Node(
+            id=f'node-{i}', name=f'Node {i}', short_name=f'N{i}',
+            latitude=i % 90 + 1, longitude=i % 180 + 1, lifetime_start='2020-01-01T00:00:00+00:00',
+        ))
+    for i in range(size):
+        manager.topology.add_link(Link(
+            id=f'link-{i}', name=f'Link {i}', nodes=[f'node-{i}', f'node-{(i + 1) % size}'],
+        ))
+    return manager.writer.write_string()
+
+
+def scan_handlers(handler_class, name):
+    """
+    Find the handler of an element by scanning the handler class, as
+    was done for each element before the dispatch tables.
+    """
+    for value in handler_class.__dict__.values():
+        if inspect.isclass(value) and issubclass(value, ElementHandler):
+            if value.element_name == name:
+                return value
+
+
+def main(size, repeat=100000):
+    document = build_document(size)
+    elements = document.count('<') - document.count('</') - document.count('/>') - 1
+    print(f'{size} nodes and {size} links, {len(document) / 1e6:.1f} MB, {elements} XML elements')
+
+    parser = GRENMLParser()
+    start = perf_counter()
+    parser.parse_string(document)
+    elapsed = perf_counter() - start
+    print(f'parse_string:  {elapsed:6.2f} s {elapsed / elements * 1e6:6.2f} us per element')
+
+    stream = BytesIO(document.encode())
+    start = perf_counter()
+    for _ in parser.iter_elements(stream):
+        pass
+    elapsed = perf_counter() - start
+    print(f'iter_elements: {elapsed:6.2f} s {elapsed / elements * 1e6:6.2f} us per element')
+
+    data = document.encode()
+    start = perf_counter()
+    for i in range(0, len(data), 65536):
+        parser.feed(data[i:i + 65536])
+    parser.close()
+    elapsed = perf_counter() - start
+    print(f'feed:          {elapsed:6.2f} s {elapsed / elements * 1e6:6.2f} us per element')
+
+    node_handler = GRENMLHandler.TopologyHandler.NodeHandler
+    handler = node_handler(None, None)
+    for name in ('grenml:name', 'grenml:Location', 'grenml:Property'):
+        scan = timeit(lambda: scan_handlers(node_handler, name), number=repeat)
+        table = timeit(lambda: handler.getHandler(name), number=repeat)
+        print(
+            f'{name:16} scan: {scan / repeat * 1e9:6.0f} ns '
+            f'table: {table / repeat * 1e9:6.0f} ns'
+        )
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,77 @@
+"""
+Copyright 2026 GRENMap Authors
+
+SPDX-License-Identifier: Apache License 2.0
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+--------------------------------------------------------------------
+
+Synopsis: Measures the time and memory taken by a copy-on-write
+snapshot of a topology, and by editing it, against a deep copy.
+    Example use:
+    PYTHONPATH=. python3 benchmarks/bench_snapshot.py 50000
+"""
+import copy
+import sys
+import tracemalloc
+from time import perf_counter
+
+from grenml import GRENMLManager
+from grenml.models import Institution, Node, Link
+
+
+def build_manager(size):
+    manager = GRENMLManager(name='Benchmark')
+    manager.add_institution(Institution('institution', 'Institution'), primary_owner=True)
+    manager.add_institution(Institution('other', 'Other'))
+    for i in range(size):
+        manager.topology.add_node(Node(id=f'node-{i}', latitude=0, longitude=0))
+    for i in range(size):
+        manager.topology.add_link(Link(
+            id=f'link-{i}', nodes=[f'node-{i}', f'node-{(i + 1) % size}'],
+        ))
+    return manager
+
+
+def measure(function):
+    tracemalloc.start()
+    start = perf_counter()
+    result = function()
+    elapsed = perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, elapsed, memory
+
+
+def main(size, edits=100):
+    manager = build_manager(size)
+    print(f'{size} nodes and {size} links')
+    snapshot, elapsed, memory = measure(manager.snapshot)
+    print(f'snapshot:              {elapsed * 1000:8.1f} ms {memory / 1e6:8.1f} MB')
+
+    def edit():
+        for i in range(edits):
+            snapshot.add_owner_to_node('other', f'node-{i}')
+    _, elapsed, memory = measure(edit)
+    print(f'{edits} edits of the snapshot: {elapsed * 1000:4.1f} ms {memory / 1e6:8.1f} MB')
+    # Reading every node hands them all out, which copies them
+    _, elapsed, memory = measure(lambda: snapshot.topology.nodes)
+    print(f'reading every node:    {elapsed * 1000:8.1f} ms {memory / 1e6:8.1f} MB')
+    if size <= 50000:
+        _, elapsed, memory = measure(lambda: copy.deepcopy(manager.topology))
+        print(f'deepcopy:              {elapsed * 1000:8.1f} ms {memory / 1e6:8.1f} MB')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
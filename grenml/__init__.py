@@ -1,2 +1,4 @@
 from .managers import GRENMLManager
+from .differences import diff
+from .parse import parse_many
 __version__ = '1.0.0'
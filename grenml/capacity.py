@@ -0,0 +1,289 @@
+"""
+Copyright 2026 GRENMap Authors
+
+SPDX-License-Identifier: Apache License 2.0
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+--------------------------------------------------------------------
+
+Synopsis: Capacity analysis of a Topology from the throughput of its
+Links: maximum flows and minimum cuts between Nodes or Institutions,
+and the aggregate capacity of the Links each Institution owns.
+Requires NumPy, which is installed with the "analytics" extra.
+"""
+import re
+from collections import deque
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError as e:  # pragma: no cover
+    raise ImportError(
+        'grenml.capacity requires NumPy, install it with "pip install grenml[analytics]"'
+    ) from e
+
+from grenml.graph import Graph
+from grenml.models.topologies import _reference_id
+
+# The additional property of Links that holds their throughput, as
+# imported from the Excel template
+THROUGHPUT = 'throughput'
+
+# Throughputs are in gigabits per second, the unit of the Excel
+# template, unless they give another unit
+UNITS = {'': 1.0, 'k': 1e-6, 'm': 1e-3, 'g': 1.0, 't': 1e3}
+THROUGHPUT_PATTERN = re.compile(
+    r'^\s*(?:(\d+)\s*[x*]\s*)?(\d+(?:\.\d*)?|\.\d+)\s*([kmgt]?)\s*(?:b(?:it)?(?:ps|/s)?)?\s*$',
+    re.IGNORECASE,
+)
+
+# Flows below this are rounding errors
+EPSILON = 1e-9
+
+
+@lru_cache(maxsize=4096)
+def _parse_throughput_string(value):
+    match = THROUGHPUT_PATTERN.match(value)
+    if not match:
+        raise ValueError(f'{value!r} is not a throughput')
+    count, amount, unit = match.groups()
+    return int(count or 1) * float(amount) * UNITS[unit.lower()]
+
+
+def parse_throughput(value):
+    """
+    Convert the throughput of a Link to a number of gigabits per
+    second. A plain number is already in gigabits per second; a string
+    may give a unit, such as "400 Mbps" or "1.2T", or a number of
+    circuits, such as "2x100G". The same strings are only parsed once.
+    :param value: The throughput, or a list of throughputs as stored
+        in the additional properties, of which the first is used
+    :return: The throughput in gigabits per second, or None if there
+        is no value
+    :raises: ValueError: The value is not a throughput
+    """
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    return _parse_throughput_string(str(value))
+
+
+class CapacityAnalysis:
+    """
+    Prepares the Graph of a Topology and the capacities of its Links
+    once, so that any number of flow and cut queries can be run
+    against it. Links without a throughput have no capacity.
+    Like the Graph, the analysis is a copy: changes to the topology
+    after it was prepared are not reflected in it.
+    """
+
+    def __init__(self, topology, graph=None, property=THROUGHPUT):
+        """
+        :param topology: The Topology to analyse
+        :param graph: A Graph already built from the topology, to
+            share with other analyses
+        :param property: The additional property of the Links that
+            holds their throughput
+        :raises: ValueError: A throughput is not a number
+        """
+        self.graph = graph if graph is not None else Graph(topology)
+        capacities = []
+        for link in self.graph._links:
+            try:
+                capacity = parse_throughput(link.additional_properties.get(property))
+            except ValueError as e:
+                raise ValueError(f'Link {link.id}: {e}')
+            capacities.append(capacity or 0.0)
+        self.capacities = np.array(capacities, dtype=np.float64)
+        self._capacity_list = capacities
+        # The entry of the same link in the adjacency of the other node
+        # carries the flow in the other direction
+        entries = np.argsort(self.graph.edge_links, kind='stable')
+        reverse = np.empty_like(entries)
+        reverse[entries[0::2]] = entries[1::2]
+        reverse[entries[1::2]] = entries[0::2]
+        self._reverse = reverse.tolist()
+        # The node whose adjacency every entry is in
+        self._entry_rows = np.repeat(
+            np.arange(len(self.graph)), self.graph.degrees()
+        ).tolist()
+
+        self._link_owners = [
+            {_reference_id(owner) for owner in link._owners} for link in self.graph._links
+        ]
+        self._nodes_by_owner = {}
+        for node in topology.nodes:
+            if node.id in self.graph._rows:
+                for owner in node._owners:
+                    self._nodes_by_owner.setdefault(_reference_id(owner), set()).add(
+                        self.graph.row(node.id)
+                    )
+
+    def institution_capacity(self):
+        """
+        The aggregate capacity of the Links each Institution owns. A
+        Link with several owners counts in full for each of them.
+        :return: A dictionary of the capacities in gigabits per second
+            by the ids of the Institutions that own Links
+        """
+        totals = {}
+        for owners, capacity in zip(self._link_owners, self._capacity_list):
+            for owner in owners:
+                totals[owner] = totals.get(owner, 0.0) + capacity
+        return totals
+
+    def max_flow(self, source_id, target_id):
+        """
+        The maximum throughput between two Nodes.
+        :return: The throughput in gigabits per second
+        :raises: NodeNotFoundError: One of the nodes is not in the graph
+        :raises: ValueError: The nodes are the same
+        """
+        return self._max_flow(self._node_rows(source_id), self._node_rows(target_id))[0]
+
+    def min_cut(self, source_id, target_id):
+        """
+        The Links of least total capacity that would disconnect two
+        Nodes if they were cut. Their capacity is the maximum flow.
+        :return: A tuple of the capacity of the cut in gigabits per
+            second and a set of the ids of its Links
+        :raises: NodeNotFoundError: One of the nodes is not in the graph
+        :raises: ValueError: The nodes are the same
+        """
+        sources = self._node_rows(source_id)
+        return self._min_cut(sources, self._node_rows(target_id))
+
+    def institution_max_flow(self, source_id, target_id):
+        """
+        The maximum throughput between the Nodes owned by one
+        Institution and the Nodes owned by another.
+        :return: The throughput in gigabits per second, 0 if either
+            Institution owns no Nodes
+        :raises: ValueError: The Institutions own a Node in common
+        """
+        sources, targets = self._owned_rows(source_id), self._owned_rows(target_id)
+        return self._max_flow(sources, targets)[0]
+
+    def institution_min_cut(self, source_id, target_id):
+        """
+        The Links of least total capacity that would disconnect the
+        Nodes owned by one Institution from those owned by another.
+        :return: A tuple of the capacity of the cut in gigabits per
+            second and a set of the ids of its Links
+        :raises: ValueError: The Institutions own a Node in common
+        """
+        return self._min_cut(self._owned_rows(source_id), self._owned_rows(target_id))
+
+    def _node_rows(self, node_id):
+        return {self.graph.row(node_id)}
+
+    def _owned_rows(self, institution_id):
+        return self._nodes_by_owner.get(_reference_id(institution_id), set())
+
+    def _levels(self, sources, flow):
+        """
+        Breadth first distances from the sources over the links that
+        have capacity left.
+        """
+        indptr, indices, edge_links = self.graph._lists()
+        capacities = self._capacity_list
+        levels = [-1] * len(self.graph)
+        for source in sources:
+            levels[source] = 0
+        queue = deque(sources)
+        while queue:
+            row = queue.popleft()
+            for entry in range(indptr[row], indptr[row + 1]):
+                neighbour = indices[entry]
+                if levels[neighbour] == -1 and \
+                        capacities[edge_links[entry]] - flow[entry] > EPSILON:
+                    levels[neighbour] = levels[row] + 1
+                    queue.append(neighbour)
+        return levels
+
+    def _max_flow(self, sources, targets):
+        """
+        Dinic's algorithm, with every link usable in either direction
+        up to its capacity.
+        :return: The total flow and the flow over every adjacency entry
+        """
+        if sources & targets:
+            raise ValueError('The sources and targets of a flow must be distinct')
+        indptr, indices, edge_links = self.graph._lists()
+        capacities = self._capacity_list
+        reverse = self._reverse
+        flow = [0.0] * len(indices)
+        total = 0.0
+        if not sources or not targets:
+            return total, flow
+        while True:
+            levels = self._levels(sources, flow)
+            if all(levels[target] == -1 for target in targets):
+                return total, flow
+            # The next entry to try from every node; entries that lead
+            # nowhere are skipped for the rest of the phase
+            next_entry = list(indptr[:-1])
+            for source in sources:
+                path = []
+                row = source
+                while True:
+                    if row in targets:
+                        pushed = min(
+                            capacities[edge_links[entry]] - flow[entry] for entry in path
+                        )
+                        for entry in path:
+                            flow[entry] += pushed
+                            flow[reverse[entry]] -= pushed
+                        total += pushed
+                        path = []
+                        row = source
+                        continue
+                    end = indptr[row + 1]
+                    entry = next_entry[row]
+                    while entry < end:
+                        neighbour = indices[entry]
+                        if levels[neighbour] == levels[row] + 1 and \
+                                capacities[edge_links[entry]] - flow[entry] > EPSILON:
+                            break
+                        entry += 1
+                    next_entry[row] = entry
+                    if entry < end:
+                        path.append(entry)
+                        row = indices[entry]
+                    elif path:
+                        # A dead end: retreat and skip the entry to it
+                        dead = path.pop()
+                        row = self._entry_rows[dead]
+                        next_entry[row] += 1
+                    else:
+                        break
+
+    def _min_cut(self, sources, targets):
+        total, flow = self._max_flow(sources, targets)
+        if not sources or not targets:
+            return total, set()
+        indptr, indices, edge_links = self.graph._lists()
+        capacities = self._capacity_list
+        # The sources' side of the cut is what can still be reached
+        levels = self._levels(sources, flow)
+        cut = {
+            self.graph.link_ids[edge_links[entry]]
+            for row in range(len(self.graph)) if levels[row] != -1
+            for entry in range(indptr[row], indptr[row + 1])
+            if levels[indices[entry]] == -1 and capacities[edge_links[entry]] > 0
+        }
+        return total, cut
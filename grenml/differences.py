@@ -0,0 +1,139 @@
+"""
+Copyright 2026 GRENMap Authors
+
+SPDX-License-Identifier: Apache License 2.0
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+--------------------------------------------------------------------
+
+Synopsis: Finds the differences between two versions of a topology,
+such as an updated GRENML file received from a member network.
+"""
+from grenml.models import INSTITUTIONS, NODES, LINKS, TOPOLOGIES
+
+ELEMENT_TYPES = (INSTITUTIONS, NODES, LINKS, TOPOLOGIES)
+
+
+def _field_name(field):
+    # Owners and nodes are compared through their private sets of ids
+    return field.lstrip('_')
+
+
+def field_changes(old, new):
+    """
+    Compare the content fields of two versions of an object, as
+    covered by their fingerprints. Owners and nodes are compared by
+    their ids, and collections regardless of their order.
+    :param old: The old version of the object
+    :param new: The new version of the object
+    :return: A dictionary of (old value, new value) tuples by the names
+        of the fields that differ
+    """
+    fields = old._content_fields
+    old_values = old._field_values(fields)
+    new_values = new._field_values(fields)
+    return {
+        _field_name(field): (old_value, new_value)
+        for field, old_value, new_value in zip(fields, old_values, new_values)
+        if old_value != new_value
+    }
+
+
+class TopologyDiff:
+    """
+    The differences between two versions of a topology.
+    Elements are matched by id. added and removed map each element
+    type to the elements, by id, only in the new or the old version.
+    modified maps INSTITUTIONS, NODES and LINKS to the field changes,
+    by id, of the elements in both versions that differ, and
+    topologies holds a TopologyDiff, by id, of each sub-topology in
+    both versions that differs. changes holds the field changes of
+    the topology itself.
+    """
+
+    def __init__(self, changes, added, removed, modified, topologies):
+        self.changes = changes
+        self.added = added
+        self.removed = removed
+        self.modified = modified
+        self.topologies = topologies
+
+    def __bool__(self):
+        """
+        :return: Whether there are any differences
+        """
+        return any((
+            self.changes, self.topologies,
+            any(self.added.values()), any(self.removed.values()), any(self.modified.values()),
+        ))
+
+    def __repr__(self):
+        counts = []
+        for ele_type in ELEMENT_TYPES:
+            modified = self.topologies if ele_type == TOPOLOGIES else self.modified[ele_type]
+            counts.append('{}: +{} -{} ~{}'.format(
+                ele_type, len(self.added[ele_type]), len(self.removed[ele_type]), len(modified),
+            ))
+        return '<TopologyDiff {}>'.format(', '.join(counts))
+
+
+def diff_topologies(old, new):
+    """
+    Find the differences between two versions of a topology, and of
+    their sub-topologies. Elements are matched by id, and elements with
+    the same fingerprint are skipped without comparing their fields.
+    :param old: The old version of the Topology
+    :param new: The new version of the Topology
+    :return: A TopologyDiff
+    """
+    added = {}
+    removed = {}
+    modified = {}
+    topologies = {}
+    for ele_type in ELEMENT_TYPES:
+        old_elements = old._id_index[ele_type]
+        new_elements = new._id_index[ele_type]
+        # The elements are got from their topologies, which copy those
+        # they share with a snapshot before handing them out
+        added[ele_type] = {
+            element_id: new._own(ele_type, element)
+            for element_id, element in new_elements.items() if element_id not in old_elements
+        }
+        removed[ele_type] = {
+            element_id: old._own(ele_type, element)
+            for element_id, element in old_elements.items() if element_id not in new_elements
+        }
+        changed = {}
+        for element_id, old_element in old_elements.items():
+            new_element = new_elements.get(element_id)
+            if new_element is None or new_element.fingerprint() == old_element.fingerprint():
+                continue
+            if ele_type == TOPOLOGIES:
+                topologies[element_id] = diff_topologies(old_element, new_element)
+            else:
+                changed[element_id] = field_changes(old_element, new_element)
+        if ele_type != TOPOLOGIES:
+            modified[ele_type] = changed
+    return TopologyDiff(field_changes(old, new), added, removed, modified, topologies)
+
+
+def diff(old, new):
+    """
+    Find what changed between two versions of a topology, such as an
+    updated GRENML file received from a member network.
+    :param old: The GRENMLManager, or Topology, of the old version
+    :param new: The GRENMLManager, or Topology, of the new version
+    :return: A TopologyDiff
+    """
+    return diff_topologies(getattr(old, 'topology', old), getattr(new, 'topology', new))
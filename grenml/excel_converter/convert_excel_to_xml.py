@@ -239,7 +239,8 @@ def append_error_message(error_message_list, error):
 
 class XLSParser:
     def __init__(self, topology_name, owner):
-        self.manager = GRENMLManager(name=topology_name)
+        # Owners and link endpoints are looked up by name once per cell
+        self.manager = GRENMLManager(name=topology_name, indexed_attributes=('name',))
         self.owner = owner
 
     def add_institution(self, **institution_fields):
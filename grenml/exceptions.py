@@ -35,6 +35,13 @@ class AttributeIdError(AttributeError):
     pass
 
 
+class MergeConflictError(AttributeIdError):
+    """
+    Topologies being merged have different elements with the same ID.
+    """
+    pass
+
+
 class AttributeOwnerError(AttributeError):
     """
     Attribute 'owner' must be an Institution Object
@@ -0,0 +1,421 @@
+"""
+Copyright 2026 GRENMap Authors
+
+SPDX-License-Identifier: Apache License 2.0
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+--------------------------------------------------------------------
+
+Synopsis: A columnar representation of the Institutions, Nodes and
+Links of a Topology, held in NumPy arrays for bulk analysis.
+Requires NumPy, which is installed with the "analytics" extra.
+"""
+try:
+    import numpy as np
+except ImportError as e:  # pragma: no cover
+    raise ImportError(
+        'grenml.frame requires NumPy, install it with "pip install grenml[analytics]"'
+    ) from e
+
+from grenml.models import Institution, Node, Link, GLOBAL_INSTITUTION_ID
+from grenml.models.topologies import _reference_id
+from grenml.models.spatial import EARTH_RADIUS_KM
+
+# The code of a missing string, or the row of a missing element
+MISSING = -1
+
+
+class StringTable:
+    """
+    Stores every distinct string of a frame once, so that the columns
+    of ids, names and other strings can be held as int32 codes into
+    the table.
+    """
+
+    def __init__(self):
+        self._codes = {}
+        self._strings = []
+
+    def __len__(self):
+        return len(self._strings)
+
+    def code(self, string):
+        """
+        The code of a string, adding the string to the table if it is
+        not in it yet.
+        :param string: The string, or None
+        :return: The code of the string, or MISSING for None
+        """
+        if string is None:
+            return MISSING
+        code = self._codes.get(string)
+        if code is None:
+            code = self._codes[string] = len(self._strings)
+            self._strings.append(string)
+        return code
+
+    def encode(self, strings):
+        """
+        :param strings: An iterable of strings or None
+        :return: An int32 array of the codes of the strings
+        """
+        return np.fromiter((self.code(string) for string in strings), dtype=np.int32)
+
+    def lookup(self, string):
+        """
+        The code of a string, without adding it to the table.
+        :return: The code of the string, or MISSING if it is not in
+            the table
+        """
+        return self._codes.get(string, MISSING)
+
+    def decode(self, codes):
+        """
+        :param codes: An array of codes into the table
+        :return: An object array of the strings, with None for MISSING
+        """
+        strings = np.array(self._strings + [None], dtype=object)
+        return strings[np.asarray(codes)]
+
+
+class ElementTable:
+    """
+    The columns of one type of element of a frame, one row per element.
+    The string columns (ids, names, short_names, versions and, where
+    the element has them, unlocodes, lifetime_starts and
+    lifetime_ends) are int32 codes into the StringTable of the frame,
+    with MISSING for None.
+    Institutions and Nodes have float64 latitudes, longitudes and
+    altitudes, with NaN for a missing value. Nodes and Links have an
+    int32 owners array of (row, institution row) pairs, and Links an
+    int32 endpoints array of the rows of their two nodes, with MISSING
+    for a node that is not in the frame. The ids of owners and nodes
+    that are not in the frame are kept in int32 unresolved_owners and,
+    for Links, unresolved_nodes arrays of (row, string code) pairs.
+    Values that are not suited to an array, the additional properties
+    and the addresses, are kept in object arrays.
+    """
+
+    def __init__(self, strings, **columns):
+        self._strings = strings
+        self._rows = None
+        for name, column in columns.items():
+            setattr(self, name, column)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def row(self, id):
+        """
+        Find the row of an element.
+        :param id: The id of the element
+        :return: The row of the element
+        :raises: KeyError: There is no element with the id
+        """
+        if self._rows is None:
+            self._rows = {code: row for row, code in enumerate(self.ids.tolist())}
+        return self._rows[self._strings.lookup(id)]
+
+    def decode(self, column):
+        """
+        :param column: The name of a string column, such as 'ids'
+        :return: An object array of the strings of the column
+        """
+        return self._strings.decode(getattr(self, column))
+
+    def owner_rows(self, row):
+        """
+        :param row: The row of a node or link
+        :return: An array of the institution rows of its owners
+        """
+        return self.owners[self.owners[:, 0] == row, 1]
+
+
+def haversine_km(latitudes_1, longitudes_1, latitudes_2, longitudes_2):
+    """
+    The great-circle distances between two arrays of points, computed
+    element-wise.
+    :return: A float64 array of the distances in kilometres, NaN where
+        a coordinate is NaN
+    """
+    latitudes_1, longitudes_1 = np.radians(latitudes_1), np.radians(longitudes_1)
+    latitudes_2, longitudes_2 = np.radians(latitudes_2), np.radians(longitudes_2)
+    a = np.sin((latitudes_2 - latitudes_1) / 2) ** 2
+    a += np.cos(latitudes_1) * np.cos(latitudes_2) * np.sin((longitudes_2 - longitudes_1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def _floats(values):
+    return np.fromiter(
+        (np.nan if value is None else value for value in values), dtype=np.float64,
+    )
+
+
+def _objects(values):
+    column = np.empty(len(values), dtype=object)
+    column[:] = values
+    return column
+
+
+def _copy_properties(properties):
+    # Property values are lists, which must not be shared with the
+    # topology
+    return {
+        key: list(value) if isinstance(value, list) else value
+        for key, value in properties.items()
+    }
+
+
+def _pairs(pairs):
+    return np.array(pairs, dtype=np.int32).reshape(-1, 2)
+
+
+def _reference_pairs(elements, references, rows, strings):
+    """
+    Build an array of (element row, referenced row) pairs, and one of
+    (element row, id code) pairs of the references to elements that are
+    not in the frame.
+    :return: A tuple of the two arrays
+    """
+    pairs = []
+    unresolved = []
+    for row, element in enumerate(elements):
+        for reference_id in map(_reference_id, references(element)):
+            reference_row = rows.get(reference_id)
+            if reference_row is None:
+                unresolved.append((row, strings.code(reference_id)))
+            else:
+                pairs.append((row, reference_row))
+    return _pairs(pairs), _pairs(unresolved)
+
+
+class TopologyFrame:
+    """
+    A columnar copy of the Institutions, Nodes and Links of a
+    Topology. Columns are NumPy arrays that can be filtered and
+    combined with vectorized operations rather than loops over the
+    element objects.
+    The frame is a copy: changes to the topology after the frame was
+    built are not reflected in it. Sub-topologies are not included.
+    """
+
+    def __init__(self, topology):
+        self.id = topology.id
+        self.name = topology.name
+        self.short_name = topology.short_name
+        self.version = topology.version
+        self.primary_owner = topology.primary_owner
+        self.strings = StringTable()
+        # Rows are sorted by id, so the frame of a topology is the same
+        # whatever order its elements are stored in
+        institutions = sorted(topology.institutions, key=lambda element: element.id)
+        nodes = sorted(topology.nodes, key=lambda element: element.id)
+        links = sorted(topology.links, key=lambda element: element.id)
+        institution_rows = {element.id: row for row, element in enumerate(institutions)}
+        node_rows = {element.id: row for row, element in enumerate(nodes)}
+        self.institutions = ElementTable(
+            self.strings,
+            **self._element_columns(institutions),
+            **self._location_columns(institutions),
+        )
+        node_owners, unresolved_node_owners = _reference_pairs(
+            nodes, lambda node: node._owners, institution_rows, self.strings,
+        )
+        self.nodes = ElementTable(
+            self.strings,
+            **self._element_columns(nodes),
+            **self._location_columns(nodes),
+            **self._lifetime_columns(nodes),
+            owners=node_owners,
+            unresolved_owners=unresolved_node_owners,
+        )
+        link_owners, unresolved_link_owners = _reference_pairs(
+            links, lambda link: link._owners, institution_rows, self.strings,
+        )
+        _, unresolved_nodes = _reference_pairs(
+            links, lambda link: link._nodes, node_rows, self.strings,
+        )
+        self.links = ElementTable(
+            self.strings,
+            **self._element_columns(links),
+            **self._lifetime_columns(links),
+            owners=link_owners,
+            unresolved_owners=unresolved_link_owners,
+            endpoints=self._endpoints(links, node_rows),
+            unresolved_nodes=unresolved_nodes,
+        )
+
+    def _element_columns(self, elements):
+        return {
+            'ids': self.strings.encode(element.id for element in elements),
+            'names': self.strings.encode(element.name for element in elements),
+            'short_names': self.strings.encode(element.short_name for element in elements),
+            'versions': self.strings.encode(element.version for element in elements),
+            'properties': _objects(
+                [_copy_properties(element.additional_properties) for element in elements]
+            ),
+        }
+
+    def _location_columns(self, elements):
+        return {
+            'latitudes': _floats(element.latitude for element in elements),
+            'longitudes': _floats(element.longitude for element in elements),
+            'altitudes': _floats(element.altitude for element in elements),
+            'unlocodes': self.strings.encode(element.unlocode for element in elements),
+            'addresses': _objects([list(element.addresses) for element in elements]),
+        }
+
+    def _lifetime_columns(self, elements):
+        return {
+            'lifetime_starts': self.strings.encode(element.lifetime_start for element in elements),
+            'lifetime_ends': self.strings.encode(element.lifetime_end for element in elements),
+        }
+
+    @staticmethod
+    def _endpoints(links, node_rows):
+        """
+        The rows of the two nodes of each link, in ascending order,
+        with MISSING for a node that is not in the frame.
+        :raises: ValueError: A link has more than two nodes
+        """
+        endpoints = np.full((len(links), 2), MISSING, dtype=np.int32)
+        for row, link in enumerate(links):
+            if len(link._nodes) > 2:
+                raise ValueError(f'Link {link.id} connects more than two nodes')
+            ends = sorted(node_rows.get(_reference_id(node), MISSING) for node in link._nodes)
+            endpoints[row, 2 - len(ends):] = ends
+        return endpoints
+
+    def nodes_in_bbox(self, min_latitude, min_longitude, max_latitude, max_longitude):
+        """
+        Find the nodes located within a bounding box, edges included.
+        Nodes without a location are never in the box.
+        :param min_latitude: The south edge of the box
+        :param min_longitude: The west edge of the box
+        :param max_latitude: The north edge of the box
+        :param max_longitude: The east edge of the box. A box with its
+            east edge west of its west edge crosses the antimeridian.
+        :return: An int array of the rows of the nodes in the box
+        """
+        latitudes = self.nodes.latitudes
+        longitudes = self.nodes.longitudes
+        inside = (latitudes >= min_latitude) & (latitudes <= max_latitude)
+        if min_longitude <= max_longitude:
+            inside &= (longitudes >= min_longitude) & (longitudes <= max_longitude)
+        else:
+            inside &= (longitudes >= min_longitude) | (longitudes <= max_longitude)
+        return np.flatnonzero(inside)
+
+    def link_lengths(self):
+        """
+        The great-circle length of every link, between its two nodes.
+        :return: A float64 array of the lengths in kilometres, aligned
+            with the rows of the links table. The length is NaN for a
+            link without two located nodes in the frame.
+        """
+        endpoints = self.links.endpoints
+        if not len(self.nodes):
+            return np.full(len(endpoints), np.nan)
+        missing = (endpoints == MISSING).any(axis=1)
+        rows = np.where(endpoints == MISSING, 0, endpoints)
+        latitudes = self.nodes.latitudes
+        longitudes = self.nodes.longitudes
+        lengths = haversine_km(
+            latitudes[rows[:, 0]], longitudes[rows[:, 0]],
+            latitudes[rows[:, 1]], longitudes[rows[:, 1]],
+        )
+        lengths[missing] = np.nan
+        return lengths
+
+    def _element_kwargs(self, table, row):
+        kwargs = {
+            'id': self._string(table.ids[row]),
+            'name': self._string(table.names[row]),
+            'short_name': self._string(table.short_names[row]),
+            'version': self._string(table.versions[row]),
+        }
+        if hasattr(table, 'latitudes'):
+            kwargs.update(
+                latitude=self._float(table.latitudes[row]),
+                longitude=self._float(table.longitudes[row]),
+                altitude=self._float(table.altitudes[row]),
+                unlocode=self._string(table.unlocodes[row]),
+                address=list(table.addresses[row]),
+            )
+        if hasattr(table, 'lifetime_starts'):
+            kwargs.update(
+                lifetime_start=self._string(table.lifetime_starts[row]),
+                lifetime_end=self._string(table.lifetime_ends[row]),
+            )
+        return kwargs
+
+    def _build(self, cls, table, row, **kwargs):
+        element = cls(**self._element_kwargs(table, row), **kwargs)
+        element.additional_properties.update(_copy_properties(table.properties[row]))
+        return element
+
+    def _string(self, code):
+        return None if code == MISSING else self.strings._strings[code]
+
+    @staticmethod
+    def _float(value):
+        return None if np.isnan(value) else float(value)
+
+    def _owner_ids(self, table):
+        institution_ids = self.institutions.decode('ids')
+        owners = [[] for _ in range(len(table))]
+        for row, institution in table.owners.tolist():
+            owners[row].append(institution_ids[institution])
+        for row, code in table.unresolved_owners.tolist():
+            owners[row].append(self._string(code))
+        return owners
+
+    def _unresolved_node_ids(self):
+        nodes = [[] for _ in range(len(self.links))]
+        for row, code in self.links.unresolved_nodes.tolist():
+            nodes[row].append(self._string(code))
+        return nodes
+
+    def to_elements(self):
+        """
+        Build new model objects from the rows of the frame. Owners and
+        nodes that are not in the frame are referred to by their ids,
+        as they were in the topology.
+        :return: A tuple of lists of the Institutions, Nodes and Links,
+            in the order of the rows. The global institution, which
+            every topology has, is left out.
+        """
+        institution_ids = self.institutions.decode('ids')
+        institutions = [
+            self._build(Institution, self.institutions, row)
+            for row in range(len(self.institutions))
+            if institution_ids[row] != GLOBAL_INSTITUTION_ID
+        ]
+        node_ids = self.nodes.decode('ids')
+        nodes = [
+            self._build(Node, self.nodes, row, owners=owners)
+            for row, owners in enumerate(self._owner_ids(self.nodes))
+        ]
+        links = [
+            self._build(
+                Link, self.links, row, owners=owners,
+                nodes=[
+                    node_ids[end] for end in self.links.endpoints[row] if end != MISSING
+                ] + unresolved,
+            )
+            for row, (owners, unresolved) in enumerate(
+                zip(self._owner_ids(self.links), self._unresolved_node_ids())
+            )
+        ]
+        return institutions, nodes, links
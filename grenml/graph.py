@@ -0,0 +1,364 @@
+"""
+Copyright 2026 GRENMap Authors
+
+SPDX-License-Identifier: Apache License 2.0
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+--------------------------------------------------------------------
+
+Synopsis: Graph analysis of the Nodes and Links of a Topology, over a
+compressed sparse row (CSR) adjacency structure held in NumPy arrays.
+Requires NumPy, which is installed with the "analytics" extra.
+"""
+from collections import deque
+from heapq import heappop, heappush
+from math import inf, isnan
+
+try:
+    import numpy as np
+except ImportError as e:  # pragma: no cover
+    raise ImportError(
+        'grenml.graph requires NumPy, install it with "pip install grenml[analytics]"'
+    ) from e
+
+from grenml.exceptions import NodeNotFoundError
+from grenml.frame import haversine_km
+from grenml.models.topologies import _reference_id
+
+# The weight that measures a path by the great-circle length of its
+# links, rather than by a property of the links
+LENGTH = 'length'
+
+
+class Graph:
+    """
+    The Nodes of a Topology and the Links between them as an undirected
+    graph. Node i of the graph is node_ids[i] and link j is link_ids[j],
+    both in order of their ids. The links of node i are the entries
+    indptr[i] to indptr[i + 1] of indices, which holds the neighbouring
+    node, and of edge_links, which holds the link.
+    Links that do not connect two nodes of the topology are left out.
+    The graph is a copy: changes to the topology after the graph was
+    built are not reflected in it.
+    """
+
+    def __init__(self, topology):
+        nodes = sorted(topology.nodes, key=lambda node: node.id)
+        self.node_ids = np.array([node.id for node in nodes], dtype=object)
+        self._rows = {node_id: row for row, node_id in enumerate(self.node_ids.tolist())}
+        self._latitudes = np.array([node.latitude for node in nodes], dtype=np.float64)
+        self._longitudes = np.array([node.longitude for node in nodes], dtype=np.float64)
+
+        links = []
+        ends = []
+        for link in sorted(topology.links, key=lambda link: link.id):
+            rows = [self._rows.get(_reference_id(node)) for node in link._nodes]
+            if len(rows) == 2 and rows[0] is not None and rows[1] is not None:
+                links.append(link)
+                ends += rows
+        self._links = links
+        self.link_ids = np.array([link.id for link in links], dtype=object)
+        self.endpoints = np.array(ends, dtype=np.int32).reshape(-1, 2)
+
+        # Each link is an entry in the adjacency of both of its nodes
+        link_count = len(links)
+        heads = np.concatenate((self.endpoints[:, 0], self.endpoints[:, 1]))
+        tails = np.concatenate((self.endpoints[:, 1], self.endpoints[:, 0]))
+        edge_links = np.concatenate((np.arange(link_count), np.arange(link_count)))
+        order = np.argsort(heads, kind='stable')
+        self.indices = tails[order].astype(np.int32)
+        self.edge_links = edge_links[order].astype(np.int32)
+        self.indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(heads, minlength=len(nodes)), out=self.indptr[1:])
+        self._adjacency = None
+        self._weights = {}
+
+    def __len__(self):
+        return len(self.node_ids)
+
+    def row(self, node_id):
+        """
+        Find the row of a node in the graph.
+        :param node_id: The id of the node, or the node itself
+        :return: The row of the node
+        :raises: NodeNotFoundError: The node is not in the graph
+        """
+        try:
+            return self._rows[_reference_id(node_id)]
+        except KeyError:
+            raise NodeNotFoundError(node_id)
+
+    def neighbours(self, row):
+        """
+        :param row: The row of a node
+        :return: An array of the rows of the nodes linked to it, once
+            per link
+        """
+        return self.indices[self.indptr[row]:self.indptr[row + 1]]
+
+    def _lists(self):
+        # The traversals run in Python, which is faster over lists than
+        # over NumPy scalars
+        if self._adjacency is None:
+            self._adjacency = (
+                self.indptr.tolist(), self.indices.tolist(), self.edge_links.tolist(),
+            )
+        return self._adjacency
+
+    def weights(self, weight=None):
+        """
+        The weight of every link of the graph, as used to measure the
+        length of a path.
+        :param weight: None to count every link as 1, LENGTH to use the
+            great-circle length of the links in kilometres, or the name
+            of an additional property of the links that has a number
+            as its value
+        :return: A float64 array of the weights, aligned with link_ids.
+            The weight is NaN for a link without a value, such as one
+            between nodes without a location.
+        :raises: ValueError: A value of the property is not a
+            non-negative number
+        """
+        if weight not in self._weights:
+            if weight is None:
+                weights = np.ones(len(self._links))
+            elif weight == LENGTH:
+                start, end = self.endpoints[:, 0], self.endpoints[:, 1]
+                weights = haversine_km(
+                    self._latitudes[start], self._longitudes[start],
+                    self._latitudes[end], self._longitudes[end],
+                )
+            else:
+                weights = np.fromiter(
+                    (self._property_value(link, weight) for link in self._links),
+                    dtype=np.float64, count=len(self._links),
+                )
+            self._weights[weight] = weights
+        return self._weights[weight]
+
+    @staticmethod
+    def _property_value(link, name):
+        values = link.additional_properties.get(name)
+        if isinstance(values, list):
+            values = values[0] if values else None
+        if values is None:
+            return np.nan
+        try:
+            value = float(values)
+        except (TypeError, ValueError):
+            raise ValueError(f'Link {link.id} has a {name} of {values!r}, which is not a number')
+        if value < 0:
+            raise ValueError(f'Link {link.id} has a negative {name} of {values!r}')
+        return value
+
+    def degrees(self):
+        """
+        :return: An int array of the number of links of every node,
+            aligned with node_ids
+        """
+        return np.diff(self.indptr)
+
+    def degree_statistics(self):
+        """
+        :return: A dictionary of the 'min', 'max', 'mean' and 'median'
+            number of links of the nodes, and the number of 'isolated'
+            nodes that have none. The statistics are None for a graph
+            without nodes.
+        """
+        degrees = self.degrees()
+        if not len(degrees):
+            return {'min': None, 'max': None, 'mean': None, 'median': None, 'isolated': 0}
+        return {
+            'min': int(degrees.min()),
+            'max': int(degrees.max()),
+            'mean': float(degrees.mean()),
+            'median': float(np.median(degrees)),
+            'isolated': int(np.count_nonzero(degrees == 0)),
+        }
+
+    def component_labels(self):
+        """
+        Label the connected components of the graph.
+        :return: An int32 array aligned with node_ids of the component
+            of every node. Components are numbered from 0 in order of
+            their first node.
+        """
+        indptr, indices, _ = self._lists()
+        labels = [-1] * len(self)
+        label = 0
+        for start in range(len(self)):
+            if labels[start] != -1:
+                continue
+            labels[start] = label
+            stack = [start]
+            while stack:
+                row = stack.pop()
+                for neighbour in indices[indptr[row]:indptr[row + 1]]:
+                    if labels[neighbour] == -1:
+                        labels[neighbour] = label
+                        stack.append(neighbour)
+            label += 1
+        return np.array(labels, dtype=np.int32)
+
+    def connected_components(self):
+        """
+        :return: A list of sets of the ids of the nodes of each
+            connected component, largest first
+        """
+        labels = self.component_labels()
+        components = [set() for _ in range(labels.max() + 1 if len(labels) else 0)]
+        for node_id, label in zip(self.node_ids.tolist(), labels.tolist()):
+            components[label].add(node_id)
+        return sorted(components, key=len, reverse=True)
+
+    def hops_from(self, node_id):
+        """
+        Find the number of links on the shortest paths from a node to
+        every node it is connected to, breadth first.
+        :param node_id: The id of the node to start from
+        :return: A dictionary of the number of links by node id
+        :raises: NodeNotFoundError: The node is not in the graph
+        """
+        indptr, indices, _ = self._lists()
+        source = self.row(node_id)
+        hops = {source: 0}
+        queue = deque((source,))
+        while queue:
+            row = queue.popleft()
+            for neighbour in indices[indptr[row]:indptr[row + 1]]:
+                if neighbour not in hops:
+                    hops[neighbour] = hops[row] + 1
+                    queue.append(neighbour)
+        return {self.node_ids[row]: count for row, count in hops.items()}
+
+    def _dijkstra(self, source, weight, target=None):
+        indptr, indices, edge_links = self._lists()
+        weights = self.weights(weight).tolist()
+        distances = {source: 0.0}
+        previous = {}
+        done = set()
+        heap = [(0.0, source)]
+        while heap:
+            distance, row = heappop(heap)
+            if row in done:
+                continue
+            done.add(row)
+            if row == target:
+                break
+            for entry in range(indptr[row], indptr[row + 1]):
+                link_weight = weights[edge_links[entry]]
+                if isnan(link_weight):
+                    continue
+                neighbour = indices[entry]
+                candidate = distance + link_weight
+                if candidate < distances.get(neighbour, inf):
+                    distances[neighbour] = candidate
+                    previous[neighbour] = entry
+                    heappush(heap, (candidate, neighbour))
+        return distances, previous
+
+    def distances_from(self, node_id, weight=LENGTH):
+        """
+        Find the length of the shortest paths from a node to every node
+        it is connected to, with Dijkstra's algorithm. Links without a
+        weight are not used.
+        :param node_id: The id of the node to start from
+        :param weight: How to measure the links, see weights
+        :return: A dictionary of the lengths by node id
+        :raises: NodeNotFoundError: The node is not in the graph
+        """
+        distances, _ = self._dijkstra(self.row(node_id), weight)
+        return {self.node_ids[row]: distance for row, distance in distances.items()}
+
+    def shortest_path(self, source_id, target_id, weight=LENGTH):
+        """
+        Find the shortest path between two nodes, with Dijkstra's
+        algorithm. Links without a weight are not used.
+        :param source_id: The id of the node to start from
+        :param target_id: The id of the node to reach
+        :param weight: How to measure the links, see weights
+        :return: A tuple of the length of the path, the ids of the nodes
+            along it and the ids of its links, or None if the nodes are
+            not connected
+        :raises: NodeNotFoundError: One of the nodes is not in the graph
+        """
+        source, target = self.row(source_id), self.row(target_id)
+        distances, previous = self._dijkstra(source, weight, target)
+        if target not in distances:
+            return None
+        _, indices, edge_links = self._lists()
+        rows = [target]
+        links = []
+        while rows[-1] != source:
+            entry = previous[rows[-1]]
+            links.append(edge_links[entry])
+            # The entry is in the adjacency of the previous node
+            rows.append(self._entry_owner(entry))
+        rows.reverse()
+        links.reverse()
+        return (
+            distances[target],
+            [self.node_ids[row] for row in rows],
+            [self.link_ids[link] for link in links],
+        )
+
+    def _entry_owner(self, entry):
+        return int(np.searchsorted(self.indptr, entry, side='right')) - 1
+
+    def articulation_points(self):
+        """
+        Find the nodes whose removal would disconnect the part of the
+        graph they are in, with Tarjan's algorithm.
+        :return: A set of the ids of the articulation points
+        """
+        indptr, indices, edge_links = self._lists()
+        order = [-1] * len(self)
+        low = [0] * len(self)
+        points = set()
+        counter = 0
+        for root in range(len(self)):
+            if order[root] != -1:
+                continue
+            order[root] = low[root] = counter
+            counter += 1
+            root_children = 0
+            # Each frame is a node, the link it was reached by and the
+            # next entry of its adjacency to visit; iterating rather
+            # than recursing keeps long chains of nodes within bounds
+            stack = [(root, -1, indptr[root])]
+            while stack:
+                row, via, entry = stack[-1]
+                if entry < indptr[row + 1]:
+                    stack[-1] = (row, via, entry + 1)
+                    neighbour = indices[entry]
+                    if edge_links[entry] == via:
+                        continue
+                    if order[neighbour] == -1:
+                        order[neighbour] = low[neighbour] = counter
+                        counter += 1
+                        if row == root:
+                            root_children += 1
+                        stack.append((neighbour, edge_links[entry], indptr[neighbour]))
+                    else:
+                        low[row] = min(low[row], order[neighbour])
+                    continue
+                stack.pop()
+                if stack:
+                    parent = stack[-1][0]
+                    low[parent] = min(low[parent], low[row])
+                    if parent != root and low[row] >= order[parent]:
+                        points.add(parent)
+            if root_children > 1:
+                points.add(root)
+        return {self.node_ids[row] for row in points}
@@ -20,8 +20,9 @@ limitations under the License.
 Synopsis: GRENML controller to track and organize top-level objects in a
 GRENML model/document.
 """
+from copy import copy
 from grenml.models import Topology, Institution, Node, Link, meta
-from grenml.models import INSTITUTIONS, NODES, LINKS
+from grenml.models import INSTITUTIONS, NODES, LINKS, KEEP_FIRST
 from grenml.validation import TopologyValidator
 from grenml.write import GRENMLWriter
 
@@ -47,6 +48,64 @@ class GRENMLManager:
         self._validator.topology = self._topology
         self._id_format = id_format if id_format else meta.IDGeneration.DETERMINATE
 
+    @classmethod
+    def from_frame(cls, frame, **kwargs):
+        """
+        Create a manager with a topology built from the rows of a
+        TopologyFrame, such as one made with Topology.to_frame. Owners
+        and nodes that are not in the frame are kept as ids, as they
+        were in the topology the frame was made from.
+        :param frame: The grenml.frame.TopologyFrame
+        :param kwargs: Further arguments to create the manager with
+        :return: The new GRENMLManager
+        """
+        manager = cls(
+            name=frame.name, id=frame.id, short_name=frame.short_name, version=frame.version,
+            **kwargs
+        )
+        institutions, nodes, links = frame.to_elements()
+        for institution in institutions:
+            manager.topology.add_institution(institution)
+        if frame.primary_owner:
+            manager.set_primary_owner(frame.primary_owner)
+        for node in nodes:
+            manager.topology.add_node(node)
+        for link in links:
+            manager.topology.add_link(link)
+        return manager
+
+    def merge(self, *managers, on_conflict=KEEP_FIRST):
+        """
+        Merge the institutions, nodes and links of other managers into
+        this manager's topology, by id. See Topology.merge.
+        :param managers: The GRENMLManagers, or Topologies, to merge
+        :param on_conflict: How to resolve elements with the same id
+            and different content: KEEP_FIRST, KEEP_NEWEST or
+            RAISE_ON_CONFLICT, from grenml.models
+        :return: This manager
+        :raises: MergeConflictError: There is a conflict and the policy
+            is RAISE_ON_CONFLICT. Nothing is merged.
+        """
+        self.topology.merge(
+            *(getattr(manager, 'topology', manager) for manager in managers),
+            on_conflict=on_conflict,
+        )
+        return self
+
+    def snapshot(self):
+        """
+        Make a manager of a copy-on-write snapshot of this manager's
+        topology, such as to try out changes to it. Elements are only
+        copied when the snapshot hands them out, see Topology.snapshot.
+        :return: The new GRENMLManager
+        """
+        manager = copy(self)
+        manager._topology = self._topology.snapshot()
+        manager._writer = type(self._writer)(manager)
+        manager._validator = copy(self._validator)
+        manager._validator.topology = manager._topology
+        return manager
+
     @property
     def topology(self):
         return self._topology
@@ -106,6 +165,28 @@ class GRENMLManager:
     def get_institutions(self, **kwargs):
         return self.topology.get_elements(INSTITUTIONS, **kwargs)
 
+    def get_institutions_in_bbox(
+            self, min_latitude, min_longitude, max_latitude, max_longitude
+    ):
+        """
+        Find the institutions located within a bounding box, edges
+        included. A box with its east edge west of its west edge
+        crosses the antimeridian.
+        :return: A set of the institutions in the box, empty if there
+            are none
+        """
+        return self.topology.get_elements_in_bbox(
+            INSTITUTIONS, min_latitude, min_longitude, max_latitude, max_longitude
+        )
+
+    def get_institutions_within(self, latitude, longitude, km):
+        """
+        Find the institutions within a great-circle distance of a point.
+        :return: A set of the institutions within the distance, empty
+            if there are none
+        """
+        return self.topology.get_elements_within(INSTITUTIONS, latitude, longitude, km)
+
     def delete_institutions(self, **kwargs):
         """
         Collects a list of institutions based on criteria and deletes
@@ -159,11 +240,30 @@ class GRENMLManager:
     def get_nodes(self, **kwargs):
         return self.topology.get_elements(NODES, **kwargs)
 
+    def get_nodes_in_bbox(self, min_latitude, min_longitude, max_latitude, max_longitude):
+        """
+        Find the nodes located within a bounding box, edges included.
+        A box with its east edge west of its west edge crosses the
+        antimeridian.
+        :return: A set of the nodes in the box, empty if there are none
+        """
+        return self.topology.get_elements_in_bbox(
+            NODES, min_latitude, min_longitude, max_latitude, max_longitude
+        )
+
+    def get_nodes_within(self, latitude, longitude, km):
+        """
+        Find the nodes within a great-circle distance of a point.
+        :return: A set of the nodes within the distance, empty if there
+            are none
+        """
+        return self.topology.get_elements_within(NODES, latitude, longitude, km)
+
     def add_owner_to_node(self, owner_id, node_id):
-        self.topology.get_element(NODES, id=node_id)._owners.add(owner_id)
+        self.topology.add_owner(NODES, node_id, owner_id)
 
     def remove_owner_from_node(self, owner_id, node_id):
-        self.topology.get_element(NODES, id=node_id)._owners.remove(owner_id)
+        self.topology.remove_owner(NODES, node_id, owner_id)
 
     def delete_nodes(self, **kwargs):
         nodes = self.get_nodes(**kwargs)
@@ -220,10 +320,10 @@ class GRENMLManager:
         return self.topology.get_elements(LINKS, **kwargs)
 
     def add_owner_to_link(self, owner_id, link_id):
-        self.topology.get_element(LINKS, id=link_id)._owners.add(owner_id)
+        self.topology.add_owner(LINKS, link_id, owner_id)
 
     def remove_owner_from_link(self, owner_id, link_id):
-        self.topology.get_element(LINKS, id=link_id)._owners.remove(owner_id)
+        self.topology.remove_owner(LINKS, link_id, owner_id)
 
     def delete_links(self, **kwargs):
         links = self.get_links(**kwargs)
@@ -38,6 +38,9 @@ class Institution(Location, GRENMLObject):
     and RREN Y".
     """
 
+    __slots__ = Location._mixin_slots
+    _comparable_fields = ('type', 'types')
+
     def __init__(
             self, id=None, name=None, short_name=None, institution_type=None,
             longitude=None, latitude=None, altitude=None, unlocode=None, address=None,
@@ -67,10 +70,12 @@ class Institution(Location, GRENMLObject):
             ' assign the value instead.'.format(type),
             DeprecationWarning,
         )
+        self._changing('additional_properties')
         if type:
             self._properties['tag'] = add_to_list(None, type)
         else:
             self._properties['tag'] = []
+        self._changed('additional_properties')
 
     @property
     def types(self):
@@ -21,11 +21,14 @@ Synopsis: The representation of a Link connecting Nodes in the GRENML
 topology
 """
 from .meta import GRENMLObject, Lifetime, IDGeneration
-from .topologies import INSTITUTIONS, NODES
+from .topologies import INSTITUTIONS, NODES, _reference_id
 
 
 class Link(Lifetime, GRENMLObject):
 
+    __slots__ = Lifetime._mixin_slots + ('_owners', '_nodes')
+    _comparable_fields = ('_owners', '_nodes')
+
     def __init__(
             self, id=None, name=None, short_name=None, owners=None, nodes=None,
             lifetime_start=None, lifetime_end=None, version=None,
@@ -42,14 +45,17 @@ class Link(Lifetime, GRENMLObject):
     @property
     def owners(self):
         if self._parent:
-            return self._parent.get_elements(INSTITUTIONS, id__in=self._owners) or set()
+            return self._parent._resolve_ids(INSTITUTIONS, self._owners)
         return self._owners
 
     @owners.setter
     def owners(self, owners):
         if not owners:
             owners = []
+        old_owners = getattr(self, '_owners', None)
+        self._changing('owners')
         self._owners = set(owners)
+        self._changed('owners', old_owners)
 
     @owners.deleter
     def owners(self):
@@ -58,15 +64,27 @@ class Link(Lifetime, GRENMLObject):
     @property
     def nodes(self):
         if self._parent:
-            return self._parent.get_elements(NODES, id__in=self._nodes) or set()
+            return self._parent._resolve_ids(NODES, self._nodes)
         return self._nodes
 
     @nodes.setter
     def nodes(self, nodes):
         if not nodes:
             nodes = []
+        old_nodes = getattr(self, '_nodes', None)
+        self._changing('nodes')
         self._nodes = set(nodes)
+        self._changed('nodes', old_nodes)
 
     @nodes.deleter
     def nodes(self):
-        self._nodes = set()
+        self.nodes = set()
+
+    def copy(self):
+        """
+        Copy the link. The copy refers to its owners and nodes by id.
+        """
+        clone = super().copy()
+        clone._owners = {_reference_id(owner) for owner in self._owners}
+        clone._nodes = {_reference_id(node) for node in self._nodes}
+        return clone
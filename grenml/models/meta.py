@@ -25,7 +25,8 @@ from uuid import uuid4 as uuid
 from hashlib import sha256
 from grenml.exceptions import AttributeIdError, AttributeLongitudeError, MatchError
 from grenml.exceptions import AttributeLatitudeError
-from collections.abc import Iterable
+from collections.abc import Collection, Iterable
+from copy import copy as shallow_copy
 from datetime import datetime
 from dateutil.tz import tzlocal
 from backports.datetime_fromisoformat import MonkeyPatch
@@ -115,19 +116,181 @@ def convert_datetime_to_iso_string(value):
     return value
 
 
+def convert_to_epoch(value):
+    """
+    Convert a date, in any of the forms a Lifetime accepts, to a number
+    of seconds since the epoch.
+    :return: The number of seconds, or None if there is no date
+    """
+    return _iso_epoch(convert_datetime_to_iso_string(value))
+
+
+def _iso_epoch(iso_string):
+    if iso_string is None:
+        return None
+    return int(datetime.fromisoformat(iso_string).timestamp())
+
+
+def _hoisted_set(search_value):
+    """
+    Convert a search value to a set once, ahead of the match.
+    :return: The set, or None if the value is a string, which is only
+        converted if it is matched against a collection, or can not be
+        converted, in which case the conversion is left to the match
+        so that it fails the same way it would have.
+    """
+    if isinstance(search_value, str):
+        return None
+    try:
+        return set(search_value)
+    except TypeError:
+        return None
+
+
+def _compile_contains(key, search_value):
+    if isinstance(search_value, Iterable) and not isinstance(search_value, str):
+        search_set = _hoisted_set(search_value)
+        not_empty = bool(search_value)
+
+        def check(element):
+            values = search_set if search_set is not None else set(search_value)
+            return values.issubset(getattr(element, key, None)) and not_empty
+    else:
+        def check(element):
+            return search_value in getattr(element, key, None)
+    return check
+
+
+def _compile_in(key, search_value):
+    search_set = _hoisted_set(search_value)
+    # A string is searched for substrings, anything else for members
+    if isinstance(search_value, Collection) and not isinstance(search_value, str) \
+            and search_set is not None:
+        members = search_set
+    else:
+        members = search_value
+
+    def check(element):
+        value = getattr(element, key, None)
+        if isinstance(value, Iterable) and not isinstance(value, str):
+            values = search_set if search_set is not None else set(search_value)
+            return bool(values.issuperset(value) and value)
+        return value in members
+    return check
+
+
+def _compile_exact(key, search_value):
+    search_set = _hoisted_set(search_value)
+
+    def check(element):
+        value = getattr(element, key, None)
+        if isinstance(value, Iterable) and not isinstance(value, str):
+            values = search_set if search_set is not None else set(search_value)
+            return set(value) == values
+        return value == search_value
+    return check
+
+
+def _compile_check(param, search_value):
+    """
+    Compile one key word argument of a search into a check of an
+    object, for compile_match and GRENMLObject.match.
+    :raises: MatchError: The argument has an unknown extension.
+    """
+    parts = param.split('__')
+    # key of property to check in the source object
+    key = parts[0]
+    # If an operation is specified on the match, use it here
+    if len(parts) > 1:
+        # The desired option for match
+        option = parts[-1]
+        if option == 'contains':
+            return _compile_contains(key, search_value)
+        if option == 'in':
+            return _compile_in(key, search_value)
+        raise MatchError(f'The option "{option}" is not a valid match extension')
+    return _compile_exact(key, search_value)
+
+
+def compile_match(**kwargs):
+    """
+    Compile the key word arguments of a search into a predicate that
+    can be applied to many GRENMLObjects. The arguments are split into
+    attributes and extensions, and the search values converted to sets,
+    once rather than for every object matched.
+    See GRENMLObject.match for the supported arguments.
+    :return: A function that takes a GRENMLObject and returns True if
+        all the arguments match it, else False.
+    :raises: MatchError: An argument has an unknown extension.
+    """
+    checks = [_compile_check(param, search_value) for param, search_value in kwargs.items()]
+
+    def predicate(element):
+        for check in checks:
+            if not check(element):
+                return False
+        return True
+    return predicate
+
+
+def _canonical(value):
+    """
+    Convert the value of a field to a form that is equal, and has the
+    same representation, for equal content. Objects are referred to by
+    their ids, the order of dictionaries and of other collections is
+    not significant, and equal numbers such as 70 and 70.0 are alike.
+    """
+    if isinstance(value, GRENMLObject):
+        return value.id
+    if isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, dict):
+        return tuple(sorted((str(key), _canonical(item)) for key, item in value.items()))
+    if isinstance(value, Iterable) and not isinstance(value, str):
+        return tuple(sorted({_canonical(item) for item in value}, key=repr))
+    return value
+
+
+def _collect_fields(cls, declaration):
+    fields = []
+    for klass in reversed(cls.__mro__):
+        for field in vars(klass).get(declaration, ()):
+            if field not in fields:
+                fields.append(field)
+    return tuple(fields)
+
+
 class GRENMLObject:
 
-    _id = None
-    _id_format = None
-    _name = None
-    _parent = None
-    _version = None
-    _short_name = None
+    # The model classes are slotted so that large topologies don't
+    # carry a __dict__ per element. The __dict__ slot is only filled
+    # when an attribute that is not declared is set on an object. The
+    # mixins declare no slots of their own, but list them in
+    # _mixin_slots for the model classes to include.
+    __slots__ = (
+        '_id', '_id_format', '_name', '_parent', '_version', '_short_name', '_properties',
+        '_fingerprint', '__dict__',
+    )
+
+    # The fields compared by __eq__, and the other fields that are part
+    # of the content digested by fingerprint. Each class lists its own;
+    # the fields of a model class are collected along its MRO.
+    _comparable_fields = ('id', 'name', 'version')
+    _detail_fields = ('short_name', 'additional_properties')
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._fields = _collect_fields(cls, '_comparable_fields')
+        cls._content_fields = cls._fields + _collect_fields(cls, '_detail_fields')
 
     def __init__(
         self, id=None, name=None,
         short_name=None, version=None, id_format: IDGeneration = None, *args, **kwargs
     ):
+        self._parent = None
+        self._fingerprint = None
+        self._name = None
+        self._short_name = None
         self.name = name
         self.short_name = short_name
         self.version = version
@@ -170,7 +333,13 @@ class GRENMLObject:
     def id(self, id):
         if not id:
             raise AttributeIdError()
-        self._id = str(id)
+        id = str(id)
+        old_id = getattr(self, '_id', None)
+        if self._parent is not None and id != old_id:
+            self._parent._check_id(self, id)
+        self._changing('id')
+        self._id = id
+        self._changed('id', old_id)
 
     @property
     def name(self):
@@ -178,7 +347,10 @@ class GRENMLObject:
 
     @name.setter
     def name(self, name):
+        old_name = self._name
+        self._changing('name')
         self._name = name
+        self._changed('name', old_name)
 
     @property
     def version(self):
@@ -186,7 +358,10 @@ class GRENMLObject:
 
     @version.setter
     def version(self, version):
-        self._version = convert_datetime_to_iso_string(version)
+        version = convert_datetime_to_iso_string(version)
+        self._changing('version')
+        self._version = version
+        self._changed('version')
 
     @property
     def short_name(self):
@@ -194,7 +369,10 @@ class GRENMLObject:
 
     @short_name.setter
     def short_name(self, short_name):
+        old_short_name = self._short_name
+        self._changing('short_name')
         self._short_name = short_name
+        self._changed('short_name', old_short_name)
 
     @property
     def additional_properties(self):
@@ -202,21 +380,90 @@ class GRENMLObject:
 
     def add_property(self, attr, value):
         attr = attr.lower()
+        self._changing('additional_properties')
         got_attr = self._properties.get(attr, None)
         got_attr = add_to_list(got_attr, value)
         self._properties[attr] = got_attr
+        self._changed('additional_properties')
 
     def del_property(self, attr, value=None):
         attr = attr.lower()
+        self._changing('additional_properties')
         if not value:
             self._properties.pop(attr)
-            return
-        got_attr = self._properties[attr]
-        got_attr = remove_from_list(got_attr, value)
-        if not got_attr:
-            self._properties.pop(attr)
         else:
-            self._properties[attr] = got_attr
+            got_attr = self._properties[attr]
+            got_attr = remove_from_list(got_attr, value)
+            if not got_attr:
+                self._properties.pop(attr)
+            else:
+                self._properties[attr] = got_attr
+        self._changed('additional_properties')
+
+    def copy(self):
+        """
+        Copy the object, such as to add it to another topology. The
+        copy shares none of the collections of the object, such as its
+        additional properties, and is not in any topology.
+        :return: The copy
+        """
+        clone = shallow_copy(self)
+        clone._parent = None
+        clone._properties = {
+            key: list(value) if isinstance(value, list) else value
+            for key, value in self._properties.items()
+        }
+        return clone
+
+    def _changing(self, attr):
+        """
+        Called before a field of the object is changed, so that the
+        snapshots that share the object with the topology it is in can
+        copy it first, see Topology.snapshot.
+        :param attr: The name of the field about to be changed
+        """
+        if self._parent is not None:
+            self._parent._element_changing(self, attr)
+
+    def _changed(self, attr, old_value=None):
+        """
+        Called whenever a field of the object is changed, to drop the
+        cached fingerprint and have the topology the object is in
+        update its indexes.
+        :param attr: The name of the field that was changed
+        :param old_value: The value of the field before the change, for
+            the fields that are indexed by value.
+        """
+        old_fingerprint = self._fingerprint
+        self._fingerprint = None
+        if self._parent is not None:
+            self._parent._element_changed(self, attr, old_value, old_fingerprint)
+
+    def _field_values(self, fields=None):
+        return tuple(
+            _canonical(getattr(self, field, None)) for field in fields or self._fields
+        )
+
+    def fingerprint(self):
+        """
+        A digest of the content of the object, so that many objects can
+        be compared or deduplicated by comparing digests. Besides the
+        fields compared by __eq__ it covers details such as the short
+        name and the additional properties, so objects with the same
+        fingerprint are equal but equal objects may differ in details.
+        The digest is cached until one of the fields of the object is
+        changed through its setter or one of its methods; changes made
+        to its attributes in place are not seen.
+        :return: The digest as a hex string
+        """
+        if self._fingerprint is None:
+            self._fingerprint = self._content_digest()
+        return self._fingerprint
+
+    def _content_digest(self):
+        hsh = sha256(type(self).__name__.encode('utf-8'))
+        hsh.update(repr(self._field_values(self._content_fields)).encode('utf-8'))
+        return hsh.hexdigest()
 
     def match(self, **kwargs):
         """
@@ -254,67 +501,32 @@ class GRENMLObject:
             and the name contains the string 'TEST_' in it.
         match(owners__contains='CAN_1') will match if ID 'CAN_1'
         is in the owners list.
+        Each argument is checked as compile_match would check it, and
+        the arguments after the first that does not match are not
+        compiled; use compile_match to apply a search to many objects.
         :return: If all provided values given match, return True, else
             False.
         """
         for param, search_value in kwargs.items():
-            # key of property to check in the source object
-            key = param.split('__')[0]
-            # Value of the property being checked in the source object
-            value = getattr(self, key, None)
-            # If an operation is specified on the match, use it here
-            if '__' in param:
-                # The desired option for match
-                option = param.split('__')[-1]
-                if option == 'contains':
-                    if isinstance(search_value, Iterable) and not isinstance(search_value, str):
-                        if not (set(search_value).issubset(value) and search_value):
-                            return False
-                    else:
-                        if search_value not in value:
-                            return False
-                elif option == 'in':
-                    if isinstance(value, Iterable) and not isinstance(value, str):
-                        if not (set(search_value).issuperset(value) and value):
-                            return False
-                    else:
-                        if value not in search_value:
-                            return False
-                else:
-                    raise MatchError(f'The option "{option}" is not a valid match extension')
-            else:
-                if isinstance(value, Iterable) and not isinstance(value, str):
-                    if set(value) != set(search_value):
-                        return False
-                elif value != search_value:
-                    return False
+            if not _compile_check(param, search_value)(self):
+                return False
         return True
 
     def __eq__(self, other):
         """
-        Dynamically evaluate that all attributes in this object and the
+        Evaluate that the comparable fields of this object and the
         other object match or, if given a string, that
         the string matches the ID of the object.
         :param other: The object being equated to
-        :return: If all attributes and their values between the this
-            object and the other object match, or the given string
+        :return: If all comparable fields and their values between the
+            this object and the other object match, or the given string
             matches the ID, then return true, else false.
         """
         if not isinstance(other, (type(self), str)):
             return False
         elif isinstance(other, str):
             return other == self.id
-        for attr in dir(self):
-            value_self = getattr(self, attr, None)
-            value_other = getattr(other, attr, None)
-            if '_' in attr or callable(value_self):
-                continue
-            if isinstance(value_self, Iterable) and not isinstance(value_self, str):
-                if set(value_self) != set(value_other):
-                    return False
-            elif value_self != value_other:
-                return False
-        return True
+        return self._field_values() == other._field_values()
 
     def __hash__(self):
         """
@@ -324,6 +536,10 @@ class GRENMLObject:
         return hash(self.id)
 
 
+GRENMLObject._fields = GRENMLObject._comparable_fields
+GRENMLObject._content_fields = GRENMLObject._fields + GRENMLObject._detail_fields
+
+
 class Location:
     """
     A representation of a location for the purposes of
@@ -331,6 +547,11 @@ class Location:
     A location can be a city, PoP,
     """
 
+    __slots__ = ()
+    _mixin_slots = ('_longitude', '_latitude', '_altitude', '_unlocode', '_addresses')
+
+    _comparable_fields = ('longitude', 'latitude', 'altitude', 'unlocode', 'address', 'addresses')
+
     def __init__(
         self, longitude, latitude, altitude=None,
         unlocode=None, address=None, **kwargs
@@ -354,9 +575,13 @@ class Location:
     @longitude.setter
     def longitude(self, longitude):
         if longitude is None:
+            self._changing('longitude')
             self._longitude = longitude
+            self._changed('longitude')
         elif -180 <= float(longitude) <= 180:
+            self._changing('longitude')
             self._longitude = float(longitude)
+            self._changed('longitude')
         else:
             raise AttributeLongitudeError
 
@@ -367,9 +592,13 @@ class Location:
     @latitude.setter
     def latitude(self, latitude):
         if latitude is None:
+            self._changing('latitude')
             self._latitude = latitude
+            self._changed('latitude')
         elif -90 <= float(latitude) <= 90:
+            self._changing('latitude')
             self._latitude = float(latitude)
+            self._changed('latitude')
         else:
             raise AttributeLatitudeError
 
@@ -379,7 +608,9 @@ class Location:
 
     @altitude.setter
     def altitude(self, altitude):
+        self._changing('altitude')
         self._altitude = altitude
+        self._changed('altitude')
 
     @property
     def unlocode(self):
@@ -387,7 +618,9 @@ class Location:
 
     @unlocode.setter
     def unlocode(self, unlocode):
+        self._changing('unlocode')
         self._unlocode = unlocode
+        self._changed('unlocode')
 
     @property
     def address(self):
@@ -395,14 +628,18 @@ class Location:
 
     @address.setter
     def address(self, address):
+        self._changing('addresses')
         if len(self.addresses) == 0:
             self.addresses.append(address)
         else:
             self.addresses[0] = address
+        self._changed('addresses')
 
     @address.deleter
     def address(self):
+        self._changing('addresses')
         self.addresses[0] = None
+        self._changed('addresses')
 
     @property
     def addresses(self):
@@ -410,17 +647,30 @@ class Location:
 
     @addresses.setter
     def addresses(self, addresses):
+        self._changing('addresses')
         self._addresses = addresses
+        self._changed('addresses')
 
     @addresses.deleter
     def addresses(self):
+        self._changing('addresses')
         self._addresses = []
+        self._changed('addresses')
 
     def add_address(self, address):
+        self._changing('addresses')
         self.addresses.append(address)
+        self._changed('addresses')
 
     def remove_address(self, address):
+        self._changing('addresses')
         self.addresses.remove(address)
+        self._changed('addresses')
+
+    def copy(self):
+        clone = super().copy()
+        clone._addresses = list(self._addresses)
+        return clone
 
 
 class Lifetime:
@@ -429,9 +679,17 @@ class Lifetime:
     situations such as the timeline of a contract.
     If a end value is given to the Lifetime, there must be a value
     in the start attribute.
-    All Date values should be in ISO format.
+    All Date values should be in ISO format. They are also kept as
+    epoch seconds, to compare them without parsing them again.
     """
 
+    __slots__ = ()
+    _mixin_slots = (
+        '_lifetime_start', '_lifetime_end', '_lifetime_start_epoch', '_lifetime_end_epoch',
+    )
+
+    _detail_fields = ('lifetime_start', 'lifetime_end')
+
     def __init__(self, lifetime_start=None, lifetime_end=None, **kwargs):
         super().__init__(**kwargs)
         self.lifetime_start = lifetime_start
@@ -443,7 +701,15 @@ class Lifetime:
 
     @lifetime_start.setter
     def lifetime_start(self, start):
-        self._lifetime_start = convert_datetime_to_iso_string(start)
+        start = convert_datetime_to_iso_string(start)
+        self._changing('lifetime_start')
+        self._lifetime_start = start
+        self._lifetime_start_epoch = _iso_epoch(self._lifetime_start)
+        self._changed('lifetime_start')
+
+    @property
+    def lifetime_start_epoch(self):
+        return self._lifetime_start_epoch
 
     @property
     def lifetime_end(self):
@@ -451,4 +717,12 @@ class Lifetime:
 
     @lifetime_end.setter
     def lifetime_end(self, end):
-        self._lifetime_end = convert_datetime_to_iso_string(end)
+        end = convert_datetime_to_iso_string(end)
+        self._changing('lifetime_end')
+        self._lifetime_end = end
+        self._lifetime_end_epoch = _iso_epoch(self._lifetime_end)
+        self._changed('lifetime_end')
+
+    @property
+    def lifetime_end_epoch(self):
+        return self._lifetime_end_epoch
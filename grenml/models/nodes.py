@@ -20,7 +20,7 @@ limitations under the License.
 Synopsis: The representation of a Node in the GRENML topology
 """
 from .meta import GRENMLObject, Location, Lifetime, IDGeneration
-from .topologies import INSTITUTIONS
+from .topologies import INSTITUTIONS, _reference_id
 
 
 class Node(Location, Lifetime, GRENMLObject):
@@ -28,6 +28,9 @@ class Node(Location, Lifetime, GRENMLObject):
     GRENML NetworkObject representing a network node
     """
 
+    __slots__ = Location._mixin_slots + Lifetime._mixin_slots + ('_owners',)
+    _comparable_fields = ('_owners',)
+
     def __init__(
             self, id=None, name=None, short_name=None, owners=None,
             longitude=None, latitude=None, altitude=None, unlocode=None, address=None,
@@ -44,9 +47,7 @@ class Node(Location, Lifetime, GRENMLObject):
     @property
     def owners(self):
         if self._parent:
-            return self._parent.get_elements(
-                INSTITUTIONS, id__in=self._owners
-            ) or set()
+            return self._parent._resolve_ids(INSTITUTIONS, self._owners)
         else:
             return self._owners
 
@@ -54,8 +55,19 @@ class Node(Location, Lifetime, GRENMLObject):
     def owners(self, owners):
         if not owners:
             owners = []
+        old_owners = getattr(self, '_owners', None)
+        self._changing('owners')
         self._owners = set(owners)
+        self._changed('owners', old_owners)
 
     @owners.deleter
     def owners(self):
         self.owners = set()
+
+    def copy(self):
+        """
+        Copy the node. The copy refers to its owners by id.
+        """
+        clone = super().copy()
+        clone._owners = {_reference_id(owner) for owner in self._owners}
+        return clone
@@ -0,0 +1,166 @@
+"""
+Copyright 2026 GRENMap Authors
+
+SPDX-License-Identifier: Apache License 2.0
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+--------------------------------------------------------------------
+
+Synopsis: A grid index of located elements, for finding the elements
+within a bounding box or a distance of a point without looking at
+every element.
+"""
+from math import asin, cos, degrees, floor, radians, sin, sqrt
+
+# Mean radius of the Earth
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = radians(EARTH_RADIUS_KM)
+
+
+def haversine_km(latitude_1, longitude_1, latitude_2, longitude_2):
+    """
+    The great-circle distance between two points.
+    :return: The distance in kilometres
+    """
+    latitude_1, longitude_1 = radians(latitude_1), radians(longitude_1)
+    latitude_2, longitude_2 = radians(latitude_2), radians(longitude_2)
+    a = sin((latitude_2 - latitude_1) / 2) ** 2 + \
+        cos(latitude_1) * cos(latitude_2) * sin((longitude_2 - longitude_1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(a)))
+
+
+class GridIndex:
+    """
+    Buckets elements into cells of a fixed number of degrees of
+    latitude and longitude, so that a query only looks at the elements
+    in the cells it overlaps. Elements without a latitude or longitude
+    are not indexed.
+    The index does not follow changes to the elements by itself;
+    its owner must move an element when its location changes.
+    """
+
+    def __init__(self, cell_size=1.0):
+        """
+        :param cell_size: The size of the cells, in degrees
+        """
+        self._cell_size = cell_size
+        self._cells = {}
+        # The cell of each element, by identity, as the location of an
+        # element has already changed when it is moved
+        self._element_cells = {}
+
+    def __len__(self):
+        return len(self._element_cells)
+
+    def _cell(self, latitude, longitude):
+        return floor(latitude / self._cell_size), floor(longitude / self._cell_size)
+
+    def insert(self, element):
+        latitude, longitude = element.latitude, element.longitude
+        if latitude is None or longitude is None:
+            return
+        cell = self._cell(latitude, longitude)
+        self._cells.setdefault(cell, set()).add(element)
+        self._element_cells[id(element)] = cell
+
+    def remove(self, element):
+        cell = self._element_cells.pop(id(element), None)
+        if cell is None:
+            return
+        elements = self._cells[cell]
+        elements.discard(element)
+        if not elements:
+            del self._cells[cell]
+
+    def move(self, element):
+        """
+        Re-file an element after its location has changed.
+        """
+        self.remove(element)
+        self.insert(element)
+
+    def _cells_in_range(self, min_latitude, min_longitude, max_latitude, max_longitude):
+        min_row, min_column = self._cell(min_latitude, min_longitude)
+        max_row, max_column = self._cell(max_latitude, max_longitude)
+        area = (max_row - min_row + 1) * (max_column - min_column + 1)
+        # A query covering more cells than are occupied is cheaper to
+        # answer from the occupied cells
+        if area > len(self._cells):
+            for (row, column), elements in self._cells.items():
+                if min_row <= row <= max_row and min_column <= column <= max_column:
+                    yield elements
+            return
+        for row in range(min_row, max_row + 1):
+            for column in range(min_column, max_column + 1):
+                elements = self._cells.get((row, column))
+                if elements:
+                    yield elements
+
+    def _longitude_ranges(self, min_longitude, max_longitude):
+        # A box whose west edge is east of its east edge crosses the
+        # antimeridian
+        if min_longitude > max_longitude:
+            return (min_longitude, 180.0), (-180.0, max_longitude)
+        return (min_longitude, max_longitude),
+
+    def in_bbox(self, min_latitude, min_longitude, max_latitude, max_longitude):
+        """
+        Find the elements located within a bounding box, edges
+        included.
+        :param min_latitude: The south edge of the box
+        :param min_longitude: The west edge of the box
+        :param max_latitude: The north edge of the box
+        :param max_longitude: The east edge of the box. A box with its
+            east edge west of its west edge crosses the antimeridian.
+        :return: A set of the elements in the box
+        """
+        found = set()
+        for west, east in self._longitude_ranges(min_longitude, max_longitude):
+            for elements in self._cells_in_range(min_latitude, west, max_latitude, east):
+                for element in elements:
+                    if min_latitude <= element.latitude <= max_latitude:
+                        if west <= element.longitude <= east:
+                            found.add(element)
+        return found
+
+    def within(self, latitude, longitude, km):
+        """
+        Find the elements within a great-circle distance of a point.
+        :param latitude: The latitude of the point
+        :param longitude: The longitude of the point
+        :param km: The distance, in kilometres
+        :return: A set of the elements within the distance, edge
+            included
+        """
+        # Bound the circle by a box of latitudes and longitudes, then
+        # check the distance of each element in the box
+        delta = km / KM_PER_DEGREE
+        min_latitude, max_latitude = latitude - delta, latitude + delta
+        if min_latitude <= -90 or max_latitude >= 90 or delta >= 90:
+            # The circle covers a pole, so every longitude
+            min_latitude, max_latitude = max(min_latitude, -90.0), min(max_latitude, 90.0)
+            min_longitude, max_longitude = -180.0, 180.0
+        else:
+            delta_longitude = degrees(asin(min(1.0, sin(radians(delta)) / cos(radians(latitude)))))
+            min_longitude = longitude - delta_longitude
+            max_longitude = longitude + delta_longitude
+            if min_longitude < -180:
+                min_longitude += 360
+            elif max_longitude > 180:
+                max_longitude -= 360
+        candidates = self.in_bbox(min_latitude, min_longitude, max_latitude, max_longitude)
+        return {
+            element for element in candidates
+            if haversine_km(latitude, longitude, element.latitude, element.longitude) <= km
+        }
@@ -0,0 +1,192 @@
+"""
+Copyright 2026 GRENMap Authors
+
+SPDX-License-Identifier: Apache License 2.0
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+--------------------------------------------------------------------
+
+Synopsis: An interval index of the lifetimes of elements, for finding
+the elements active at a time or during a period without looking at
+every element.
+"""
+from bisect import bisect_left, bisect_right
+from math import inf
+
+
+class _IntervalNode:
+    """
+    The intervals that contain the centre of a node of the tree, sorted
+    by their starts and by their ends, and the nodes of the intervals
+    entirely before and entirely after the centre.
+    """
+
+    __slots__ = ('centre', 'starts', 'by_start', 'ends', 'by_end', 'before', 'after')
+
+    def __init__(self, centre, intervals):
+        self.centre = centre
+        by_start = sorted(intervals, key=lambda interval: interval[0])
+        self.starts = [interval[0] for interval in by_start]
+        self.by_start = [interval[2] for interval in by_start]
+        by_end = sorted(intervals, key=lambda interval: interval[1])
+        self.ends = [interval[1] for interval in by_end]
+        self.by_end = [interval[2] for interval in by_end]
+        self.before = None
+        self.after = None
+
+
+def _build(intervals):
+    """
+    Build a centred interval tree, splitting the intervals on the
+    median of their endpoints so that the tree is balanced.
+    """
+    if not intervals:
+        return None
+    endpoints = sorted(
+        endpoint for start, end, _ in intervals for endpoint in (start, end)
+        if endpoint not in (-inf, inf)
+    )
+    centre = endpoints[len(endpoints) // 2] if endpoints else 0
+    before, containing, after = [], [], []
+    for interval in intervals:
+        if interval[1] < centre:
+            before.append(interval)
+        elif interval[0] > centre:
+            after.append(interval)
+        else:
+            containing.append(interval)
+    node = _IntervalNode(centre, containing)
+    node.before = _build(before)
+    node.after = _build(after)
+    return node
+
+
+def _interval(element):
+    """
+    :return: The lifetime of an element as a (start, end, element)
+        interval, open on the sides it has no date for, or None if it
+        ends before it starts
+    """
+    start = element.lifetime_start_epoch
+    end = element.lifetime_end_epoch
+    start = -inf if start is None else start
+    end = inf if end is None else end
+    return (start, end, element) if start <= end else None
+
+
+class IntervalIndex:
+    """
+    A centred interval tree of the lifetimes of elements, as epoch
+    seconds. A lifetime without a start has been active forever, and
+    one without an end is active for good, so an element without a
+    lifetime is always active. A lifetime that ends before it starts
+    is never active, and is left out of the index.
+    Queries take logarithmic time plus the number of elements found.
+    The index does not follow changes to the elements; its owner adds
+    and removes them as they change. The elements added since the tree
+    was built are scanned by queries, and those removed are left out of
+    what the tree finds, until there are enough of them for the next
+    query to build the tree again.
+    """
+
+    # The changes kept before the tree is built again, beside one for
+    # every so many elements
+    MIN_PENDING = 64
+    PENDING_RATIO = 32
+
+    def __init__(self, elements=()):
+        # The intervals of the elements in the index, by identity
+        self._intervals = {}
+        for element in elements:
+            interval = _interval(element)
+            if interval is not None:
+                self._intervals[id(element)] = interval
+        self._build()
+
+    def _build(self):
+        self._root = _build(list(self._intervals.values()))
+        # The intervals added since the tree was built, and the
+        # elements whose intervals in the tree are no longer theirs
+        self._added = {}
+        self._removed = set()
+
+    def __len__(self):
+        return len(self._intervals)
+
+    def add(self, element):
+        """
+        Add an element, or update the lifetime of one in the index.
+        """
+        self.remove(element)
+        interval = _interval(element)
+        if interval is not None:
+            self._intervals[id(element)] = self._added[id(element)] = interval
+
+    def remove(self, element):
+        """
+        Remove an element, if it is in the index.
+        """
+        key = id(element)
+        if self._intervals.pop(key, None) is not None and self._added.pop(key, None) is None:
+            self._removed.add(key)
+
+    def active_at(self, time):
+        """
+        :param time: The time, in epoch seconds
+        :return: A list of the elements whose lifetime contains the
+            time, ends included
+        """
+        return self.active_between(time, time)
+
+    def active_between(self, start, end):
+        """
+        :param start: The start of the period, in epoch seconds, or
+            None for no start
+        :param end: The end of the period, in epoch seconds, or None
+            for no end
+        :return: A list of the elements whose lifetime overlaps the
+            period, ends included
+        """
+        if len(self._added) + len(self._removed) > \
+                self.MIN_PENDING + len(self._intervals) // self.PENDING_RATIO:
+            self._build()
+        start = -inf if start is None else start
+        end = inf if end is None else end
+        found = []
+        node = self._root
+        pending = []
+        while node is not None or pending:
+            if node is None:
+                node = pending.pop()
+            if end < node.centre:
+                # Every interval of the node ends after the period ends,
+                # so the ones that start before it ends overlap it
+                found.extend(node.by_start[:bisect_right(node.starts, end)])
+                node = node.before
+            elif start > node.centre:
+                found.extend(node.by_end[bisect_left(node.ends, start):])
+                node = node.after
+            else:
+                found.extend(node.by_start)
+                if node.after is not None:
+                    pending.append(node.after)
+                node = node.before
+        if self._removed:
+            removed = self._removed
+            found = [element for element in found if id(element) not in removed]
+        found.extend(
+            element for interval_start, interval_end, element in self._added.values()
+            if interval_start <= end and interval_end >= start
+        )
+        return found
@@ -19,10 +19,16 @@ limitations under the License.
 
 Synopsis: GRENML Topology NetworkObject representation.
 """
-from .meta import GRENMLObject
+from collections.abc import Collection
+from datetime import datetime
+from hashlib import sha256
+from weakref import WeakValueDictionary
+from .meta import GRENMLObject, compile_match, convert_to_epoch
 from .institutions import Institution
+from .spatial import GridIndex
+from .temporal import IntervalIndex
 from grenml.exceptions import InstitutionNotFoundError, NodeNotFoundError, \
-    AttributeIdError, MultipleReturnedError, \
+    ObjectNotFoundError, AttributeIdError, MultipleReturnedError, MergeConflictError, \
     LinkNotFoundError, TopologyNotFoundError
 GLOBAL_INSTITUTION_ID = 'urn:ogf:networking:global'
 
@@ -31,6 +37,40 @@ NODES = 'nodes'
 LINKS = 'links'
 TOPOLOGIES = 'topology'
 
+# Attributes that can be given a secondary index with Topology.add_index
+INDEXABLE_ATTRIBUTES = ('name', 'short_name')
+# Element types covered by the secondary indexes
+INDEXED_TYPES = (INSTITUTIONS, NODES, LINKS)
+# Element types that have a location, covered by the spatial indexes
+LOCATED_TYPES = (INSTITUTIONS, NODES)
+# Element types that have a lifetime, covered by the interval indexes
+LIFETIME_TYPES = (NODES, LINKS)
+# Search arguments answered from the interval indexes, see
+# Topology.iter_elements
+TEMPORAL_ARGUMENTS = ('active_at', 'active_between')
+LIFETIME_FIELDS = ('lifetime_start', 'lifetime_end')
+# Fields of nodes and links that the lengths of the links depend on
+LENGTH_FIELDS = ('id', 'latitude', 'longitude', 'nodes')
+
+# How Topology.merge resolves elements with the same id but different
+# content: keep the element merged first, keep the element with the
+# latest version, or raise MergeConflictError
+KEEP_FIRST = 'keep-first'
+KEEP_NEWEST = 'keep-newest-by-version'
+RAISE_ON_CONFLICT = 'raise'
+MERGE_POLICIES = (KEEP_FIRST, KEEP_NEWEST, RAISE_ON_CONFLICT)
+# Element types covered by the global index of a tree of topologies, in
+# the order Topology.find_anywhere searches them
+GLOBAL_TYPES = (INSTITUTIONS, NODES, LINKS, TOPOLOGIES)
+# The digests of the elements of each type are summed modulo 2 ** 256,
+# which does not depend on their order and can be undone on deletion
+DIGEST_MODULUS = 1 << 256
+# Element types merged by Topology.merge, in order
+MERGED_TYPES = (INSTITUTIONS, NODES, LINKS)
+# Fields by which elements refer to other elements, resolved from the
+# topology they are in
+REFERENCE_FIELDS = ('owners', 'nodes')
+
 EXCEPTIONS = {
     INSTITUTIONS: InstitutionNotFoundError,
     NODES: NodeNotFoundError,
@@ -39,12 +79,136 @@ EXCEPTIONS = {
 }
 
 
+def _reference_id(reference):
+    """
+    Elements refer to their owners and nodes by id, but may have been
+    given the objects themselves before being added to a topology.
+    """
+    return reference.id if isinstance(reference, GRENMLObject) else reference
+
+
+def _resolve_ids(id_index, ids):
+    return {id_index[element_id] for element_id in ids if element_id in id_index}
+
+
+def _version_time(element):
+    return datetime.fromisoformat(element.version) if element.version else None
+
+
+def _is_newer(element, other):
+    """
+    Whether an element has a later version than another. An element
+    without a version is never newer.
+    """
+    time, other_time = _version_time(element), _version_time(other)
+    return time is not None and (other_time is None or time > other_time)
+
+
+# The global index maps each id to the topology that holds the element,
+# or to a list of the topologies when several topologies of the tree
+# have an element with the id, so that the common case is a plain
+# dictionary that is quick to copy
+def _global_entries(entry):
+    if entry is None:
+        return ()
+    return entry if isinstance(entry, list) else (entry,)
+
+
+def _add_to_global_index(global_index, ele_type, element_id, topology):
+    entries = global_index[ele_type]
+    entry = entries.get(element_id)
+    if entry is None:
+        entries[element_id] = topology
+    elif isinstance(entry, list):
+        entry.append(topology)
+    else:
+        entries[element_id] = [entry, topology]
+
+
+def _remove_from_global_index(global_index, ele_type, element_id, topology):
+    entries = global_index[ele_type]
+    entry = entries.get(element_id)
+    if entry is topology:
+        del entries[element_id]
+    elif isinstance(entry, list):
+        remaining = [holder for holder in entry if holder is not topology]
+        entries[element_id] = remaining[0] if len(remaining) == 1 else remaining
+
+
+def _add_to_index(index, key, element):
+    index.setdefault(key, set()).add(element)
+
+
+def _remove_from_index(index, key, element):
+    elements = index.get(key)
+    if elements is not None:
+        elements.discard(element)
+        if not elements:
+            del index[key]
+
+
+class _ReverseIndex(dict):
+    """
+    A reverse index of elements by the ids they refer to, as sets of
+    the elements by id. A snapshot shares the sets with the index of
+    the topology it was taken of rather than copying them, and either
+    copies a set the first time it changes it.
+    """
+
+    __slots__ = ('_owned',)
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        # The ids whose sets this index has copied since it was last
+        # shared, or None if it has never been shared
+        self._owned = None
+
+    def share(self):
+        """
+        :return: A copy of the index that shares its sets
+        """
+        self._owned = set()
+        clone = _ReverseIndex(self)
+        clone._owned = set()
+        return clone
+
+    def _own(self, key, elements):
+        if self._owned is not None and key not in self._owned:
+            elements = self[key] = set(elements)
+            self._owned.add(key)
+        return elements
+
+    def add(self, key, element):
+        elements = self.get(key)
+        if elements is None:
+            self[key] = {element}
+            if self._owned is not None:
+                self._owned.add(key)
+        else:
+            self._own(key, elements).add(element)
+
+    def discard(self, key, element):
+        elements = self.get(key)
+        if elements is None or element not in elements:
+            return
+        if len(elements) == 1:
+            del self[key]
+        else:
+            self._own(key, elements).discard(element)
+
+
 class Topology(GRENMLObject):
     """
     Toplogy is an NML NetworkObject by definition.
     """
 
-    def __init__(self, name=None, version=None, primary_owner=None, **kwargs):
+    # The elements of the topology are compared separately
+    _detail_fields = ('primary_owner',)
+
+    def __init__(
+            self, name=None, version=None, primary_owner=None, indexed_attributes=(),
+            **kwargs
+    ):
         self._primary_owner = primary_owner
         self._elements = {
             INSTITUTIONS: set(),
@@ -52,12 +216,55 @@ class Topology(GRENMLObject):
             TOPOLOGIES: set(),
             LINKS: set(),
         }
+        # Maps the id of every element to the element itself, per
+        # element type, so lookups by id don't need to scan the sets
+        self._id_index = {ele_type: {} for ele_type in self._elements}
+        # Opt-in secondary indexes, see add_index
+        self._attribute_indexes = {}
+        # Reverse indexes of the references between elements: the links
+        # by the id of each of their nodes, and the nodes and links by
+        # the id of each of their owners, built on the first query that
+        # needs them. Snapshots share them with the topology they were
+        # taken of, see _ReverseIndex and _reference_indexes
+        self._links_by_node = None
+        self._owned_by = None
+        # Grid indexes of the located elements, built on the first
+        # spatial query, see _spatial_index
+        self._spatial_indexes = None
+        # The lengths of the links by their ids, see link_lengths
+        self._link_lengths = None
+        # Interval indexes of the lifetimes of the elements, by element
+        # type, built on the first temporal search and kept up to date
+        # from then on, see _active_candidates
+        self._interval_indexes = {}
+        # Maps the id of every element of the tree of topologies to the
+        # topology that holds it, per element type. Only the root
+        # topology of the tree keeps it, from the first search of the
+        # tree on, see _tree_index; otherwise it is None.
+        self._global_index = None
+        # The sum of the fingerprints of the elements of each type, and
+        # the elements, by identity, whose fingerprints are not in the
+        # sums yet because they are new or changed, see fingerprint.
+        # Both are only kept once fingerprint has been called.
+        self._digests = None
+        self._stale = {}
+        # The live snapshots that may hold elements of this topology,
+        # by identity, as snapshots are equal to the topology they were
+        # taken of; the topologies this one may hold elements of; and
+        # the number of elements of each type it holds but does not
+        # own, see snapshot
+        self._snapshots = None
+        self._lenders = ()
+        self._borrowed = dict.fromkeys(MERGED_TYPES, 0)
         global_institution = Institution(
             id=GLOBAL_INSTITUTION_ID, name='GREN', institution_type='global'
         )
         global_institution._parent = self
         self._elements[INSTITUTIONS].add(global_institution)
+        self._id_index[INSTITUTIONS][global_institution.id] = global_institution
         super(Topology, self).__init__(name=name, version=version, **kwargs)
+        for attr in indexed_attributes:
+            self.add_index(attr)
 
     @property
     def primary_owner(self):
@@ -67,19 +274,21 @@ class Topology(GRENMLObject):
     def primary_owner(self, owner):
         if isinstance(owner, GRENMLObject):
             owner = owner.id
+        self._changing('primary_owner')
         self._primary_owner = owner
+        self._changed('primary_owner')
 
     @property
     def institutions(self):
-        return self._elements[INSTITUTIONS]
+        return self._owned(INSTITUTIONS)
 
     @property
     def nodes(self):
-        return self._elements[NODES]
+        return self._owned(NODES)
 
     @property
     def links(self):
-        return self._elements[LINKS]
+        return self._owned(LINKS)
 
     @property
     def topologies(self):
@@ -91,25 +300,642 @@ class Topology(GRENMLObject):
 
     def add_node(self, node):
         if self.primary_owner and self.primary_owner not in node.owners:
-            # Only works because the node shouldn't have a parent yet.
-            node.owners.add(self.primary_owner)
+            node.owners = node._owners | {self.primary_owner}
         self._add_element(NODES, node)
 
     def add_link(self, link):
         if self.primary_owner and self.primary_owner not in link.owners:
-            link.owners.add(self.primary_owner)
+            link.owners = link._owners | {self.primary_owner}
         self._add_element(LINKS, link)
 
     def add_topology(self, topology):
         self._add_element(TOPOLOGIES, topology)
 
     def _add_element(self, ele_type, element):
-        if element.id in self._elements[ele_type]:
+        if element.id in self._id_index[ele_type]:
             raise AttributeIdError(
                 '{} ID: {} must be unique'.format(type(element).__name__, element.id)
             )
+        if element._parent is not None and element._parent is not self:
+            # The snapshots of the topology it was in keep it as it was
+            element._changing('parent')
         element._parent = self
+        self._id_index[ele_type][element.id] = element
+        self._index_element(ele_type, element)
+
+    def _index_element(self, ele_type, element):
+        """
+        Add an element to the set of the elements of its type and to
+        the indexes.
+        """
+        if ele_type in (NODES, LINKS):
+            self._link_lengths = None
+        if ele_type in self._interval_indexes:
+            self._interval_indexes[ele_type].add(element)
+        self._hash_element(ele_type, element)
+        if self._digests is not None:
+            if element._fingerprint is None:
+                self._stale[id(element)] = (ele_type, element)
+            else:
+                self._add_digest(ele_type, element._fingerprint)
+        self._content_changed()
+        if ele_type == TOPOLOGIES:
+            element._global_index = None
+        global_index = self._root()._global_index
+        if global_index is not None:
+            _add_to_global_index(global_index, ele_type, element.id, self)
+            if ele_type == TOPOLOGIES:
+                # The sub-topology's tree joins this one; the global
+                # institution of the root stands for its own
+                for sub_type, element_id, topology in element._tree_elements():
+                    if sub_type != INSTITUTIONS or element_id != GLOBAL_INSTITUTION_ID:
+                        _add_to_global_index(global_index, sub_type, element_id, topology)
+
+    def _unindex_element(self, ele_type, element):
+        """
+        Remove an element from the set of the elements of its type and
+        from the indexes.
+        """
+        if ele_type in (NODES, LINKS):
+            self._link_lengths = None
+        if ele_type in self._interval_indexes:
+            self._interval_indexes[ele_type].remove(element)
+        self._unhash_element(ele_type, element)
+        self._remove_digest(ele_type, element, element._fingerprint)
+        self._content_changed()
+        global_index = self._root()._global_index
+        if global_index is not None:
+            _remove_from_global_index(global_index, ele_type, element.id, self)
+            if ele_type == TOPOLOGIES:
+                # The sub-topology becomes the root of a tree of its
+                # own, which builds its index when it is searched
+                for sub_type, element_id, topology in element._tree_elements():
+                    _remove_from_global_index(global_index, sub_type, element_id, topology)
+
+    def _add_digest(self, ele_type, fingerprint, sign=1):
+        self._digests[ele_type] = (self._digests[ele_type] + sign * int(fingerprint, 16)) \
+            % DIGEST_MODULUS
+
+    def _remove_digest(self, ele_type, element, fingerprint):
+        """
+        Take the fingerprint an element had out of the sums, unless it
+        is not in them because the element is new or changed.
+        :param ele_type: The type of the element
+        :param element: The element
+        :param fingerprint: The fingerprint the element had when it was
+            added to the sums, or None if it is unknown
+        """
+        if self._digests is None or self._stale.pop(id(element), None) is not None:
+            return
+        if fingerprint is None:
+            # The element changed without this topology being told, so
+            # the sums are computed again by the next fingerprint
+            self._digests = None
+            self._stale = {}
+        else:
+            self._add_digest(ele_type, fingerprint, -1)
+
+    def _content_changed(self):
+        """
+        Drop the fingerprint of this topology when its elements change,
+        which also takes it out of the sums of the topology it is in.
+        Only the first change since the fingerprint was last computed
+        goes up the tree.
+        """
+        if self._fingerprint is not None:
+            self._changed('elements')
+
+    def _root(self):
+        """
+        :return: The topology at the root of the tree this topology is
+            in, which keeps the global index
+        """
+        topology = self
+        while isinstance(topology._parent, Topology) and \
+                topology._parent._id_index[TOPOLOGIES].get(topology.id) is topology:
+            topology = topology._parent
+        return topology
+
+    def _tree_index(self):
+        """
+        :return: The global index of the tree this topology is in,
+            built at its root the first time it is needed and then kept
+            up to date as elements are added, deleted or renamed
+        """
+        root = self._root()
+        if root._global_index is None:
+            global_index = {ele_type: {} for ele_type in GLOBAL_TYPES}
+            for ele_type, element_id, topology in root._tree_elements():
+                # The global institution of the root stands for those
+                # of the sub-topologies
+                if ele_type == INSTITUTIONS and element_id == GLOBAL_INSTITUTION_ID and \
+                        topology is not root:
+                    continue
+                _add_to_global_index(global_index, ele_type, element_id, topology)
+            root._global_index = global_index
+        return root._global_index
+
+    def _tree_elements(self):
+        """
+        Walk the tree of topologies under this one, only to build or
+        update a global index; queries use the global index instead.
+        :return: An iterator of (element type, element id, topology)
+            tuples of the elements of this topology and its
+            sub-topologies
+        """
+        for ele_type in GLOBAL_TYPES:
+            for element_id in self._id_index[ele_type]:
+                yield ele_type, element_id, self
+        for topology in self._elements[TOPOLOGIES]:
+            yield from topology._tree_elements()
+
+    def find_anywhere(self, element_id, ele_type=None):
+        """
+        Gets an element by id from anywhere in the tree of topologies
+        this topology is in, from its root down through every level of
+        sub-topologies, from the global index of the root rather than
+        by searching each topology.
+        :param element_id: The id of the element
+        :param ele_type: The type of the element, or None to search
+            every type
+        :return: The element. The topology that holds it is given by
+            topology_of.
+        :raises: ObjectNotFoundError: There is no element with the id.
+            A subclass of ObjectNotFoundError is raised if a type is
+            given.
+        :raises: MultipleReturnedError: Several elements of the tree
+            have the id
+        """
+        return self._find_anywhere(element_id, ele_type)[0]
+
+    def topology_of(self, element_id, ele_type=None):
+        """
+        Finds which topology of the tree holds an element, see
+        find_anywhere.
+        :return: The Topology that holds the element
+        """
+        return self._find_anywhere(element_id, ele_type)[1]
+
+    def _find_anywhere(self, element_id, ele_type):
+        global_index = self._tree_index()
+        ele_types = GLOBAL_TYPES if ele_type is None else (ele_type,)
+        found = [
+            (search_type, topology)
+            for search_type in ele_types
+            for topology in _global_entries(global_index[search_type].get(element_id))
+        ]
+        if not found:
+            raise ObjectNotFoundError() if ele_type is None else EXCEPTIONS[ele_type]()
+        if len(found) > 1:
+            raise MultipleReturnedError
+        search_type, topology = found[0]
+        return topology._own(search_type, topology._id_index[search_type][element_id]), topology
+
+    def iter_all_elements(self, ele_type):
+        """
+        Yields the elements of a type of every topology in the tree this
+        topology is in, from the global index of the root.
+        No topology of the tree may have elements added or deleted while
+        the iterator is in use.
+        :param ele_type: The type of the elements
+        """
+        for element_id, entry in self._tree_index()[ele_type].items():
+            for topology in _global_entries(entry):
+                yield topology._own(ele_type, topology._id_index[ele_type][element_id])
+
+    def iter_all_institutions(self):
+        return self.iter_all_elements(INSTITUTIONS)
+
+    def iter_all_nodes(self):
+        return self.iter_all_elements(NODES)
+
+    def iter_all_links(self):
+        return self.iter_all_elements(LINKS)
+
+    def add_index(self, attr):
+        """
+        Maintain a secondary index of the Institutions, Nodes and Links
+        of this topology on an attribute, so that searches for an exact
+        value of the attribute don't scan every element.
+        The index is kept up to date as elements are added, deleted or
+        have the attribute changed.
+        :param attr: The attribute to index, one of
+            INDEXABLE_ATTRIBUTES
+        :raises: ValueError: The attribute can't be indexed
+        """
+        if attr not in INDEXABLE_ATTRIBUTES:
+            raise ValueError(f'The attribute "{attr}" can not be indexed')
+        if self._attribute_indexes.get(attr) is not None:
+            return
+        index = {ele_type: {} for ele_type in INDEXED_TYPES}
+        for ele_type, values in index.items():
+            for element in self._elements[ele_type]:
+                _add_to_index(values, getattr(element, attr), element)
+        self._attribute_indexes[attr] = index
+
+    def _element_type(self, element, element_id=None):
+        """
+        Find which type of element of this topology the element is.
+        :param element_id: The id the element is indexed by, if it is
+            not its id, such as when it has just been renamed
+        :return: The element type, or None if the element is not in
+            this topology.
+        """
+        if element_id is None:
+            element_id = element.id
+        for ele_type, id_index in self._id_index.items():
+            if id_index.get(element_id) is element:
+                return ele_type
+        return None
+
+    def _check_id(self, element, element_id):
+        """
+        Called by the elements of this topology before their id is
+        changed, to keep ids unique.
+        :raises: AttributeIdError: Another element of the same type has
+            the id
+        """
+        ele_type = self._element_type(element)
+        if ele_type is not None and element_id in self._id_index[ele_type]:
+            raise AttributeIdError(
+                '{} ID: {} must be unique'.format(type(element).__name__, element_id)
+            )
+
+    def _element_changing(self, element, attr):
+        """
+        Called by the elements of this topology before one of their
+        attributes is changed. The snapshots that hold the element
+        replace it with a copy first, so they keep it as it was. An
+        element about to be renamed is taken out of the containers
+        that hash it by its id, until _rekey_element puts it back.
+        :param element: The element about to be changed
+        :param attr: The name of the attribute about to be changed
+        """
+        if self._snapshots:
+            for snapshot in list(self._snapshots.values()):
+                ele_type = snapshot._element_type(element)
+                if ele_type is not None:
+                    snapshot._own(ele_type, element)
+        if attr == 'id':
+            ele_type = self._element_type(element)
+            if ele_type is not None:
+                self._unhash_element(ele_type, element)
+
+    def _hash_element(self, ele_type, element):
+        """
+        Add an element to the containers that hash it by its id: the
+        set of the elements of its type, the secondary and reverse
+        indexes and the cells of the spatial index.
+        """
         self._elements[ele_type].add(element)
+        for attr, index in self._attribute_indexes.items():
+            if index is not None and ele_type in index:
+                _add_to_index(index[ele_type], getattr(element, attr), element)
+        if self._owned_by is not None and ele_type in self._owned_by:
+            self._reindex_references(self._owned_by[ele_type], element, (), element._owners)
+        if self._links_by_node is not None and ele_type == LINKS:
+            self._reindex_references(self._links_by_node, element, (), element._nodes)
+        if self._spatial_indexes is not None and ele_type in self._spatial_indexes:
+            self._spatial_indexes[ele_type].insert(element)
+
+    def _unhash_element(self, ele_type, element):
+        """
+        Remove an element from the containers that hash it by its id,
+        see _hash_element.
+        """
+        self._elements[ele_type].discard(element)
+        for attr, index in self._attribute_indexes.items():
+            if index is not None and ele_type in index:
+                _remove_from_index(index[ele_type], getattr(element, attr), element)
+        if self._owned_by is not None and ele_type in self._owned_by:
+            self._reindex_references(self._owned_by[ele_type], element, element._owners, ())
+        if self._links_by_node is not None and ele_type == LINKS:
+            self._reindex_references(self._links_by_node, element, element._nodes, ())
+        if self._spatial_indexes is not None and ele_type in self._spatial_indexes:
+            self._spatial_indexes[ele_type].remove(element)
+
+    def _own(self, ele_type, element):
+        """
+        Replace an element this topology holds, but shares with the
+        topology it is a snapshot of, with a copy of its own, in its
+        containers and indexes. The copy is equal to the element, so
+        the content of the topology does not change.
+        :param ele_type: The type of the element
+        :param element: The element
+        :return: The element if it is this topology's own, else the
+            copy
+        """
+        if element._parent is self:
+            return element
+        clone = element.copy()
+        clone._parent = self
+        self._unhash_element(ele_type, element)
+        self._hash_element(ele_type, clone)
+        self._id_index[ele_type][clone.id] = clone
+        self._borrowed[ele_type] -= 1
+        if ele_type in self._interval_indexes:
+            self._interval_indexes[ele_type].remove(element)
+            self._interval_indexes[ele_type].add(clone)
+        if self._stale.pop(id(element), None) is not None:
+            self._stale[id(clone)] = (ele_type, clone)
+        return clone
+
+    def _owned(self, ele_type):
+        """
+        :return: The set of the elements of a type, once every one of
+            them is this topology's own, see _own
+        """
+        elements = self._elements[ele_type]
+        if self._borrowed[ele_type]:
+            for element in list(elements):
+                self._own(ele_type, element)
+        return elements
+
+    def _element_changed(self, element, attr, old_value, old_fingerprint=None):
+        """
+        Called by the elements of this topology when one of their
+        attributes is changed, to keep the indexes up to date.
+        :param element: The element that was changed
+        :param attr: The name of the attribute that was changed
+        :param old_value: The value of the attribute before the change
+        :param old_fingerprint: The fingerprint of the element before
+            the change, if it had been computed
+        """
+        ele_type = self._element_type(element, old_value if attr == 'id' else None)
+        if ele_type is None:
+            return
+        if attr == 'id':
+            self._rekey_element(ele_type, element, old_value)
+        if self._digests is not None and id(element) not in self._stale:
+            # Its fingerprint is taken out of the sum, to be put back
+            # once it is computed again
+            self._remove_digest(ele_type, element, old_fingerprint)
+            if self._digests is not None:
+                self._stale[id(element)] = (ele_type, element)
+        self._content_changed()
+        if attr in LENGTH_FIELDS and ele_type in (NODES, LINKS):
+            self._link_lengths = None
+        if attr in LIFETIME_FIELDS and ele_type in self._interval_indexes:
+            self._interval_indexes[ele_type].add(element)
+        index = self._attribute_indexes.get(attr)
+        if index is not None and ele_type in index:
+            _remove_from_index(index[ele_type], old_value, element)
+            _add_to_index(index[ele_type], getattr(element, attr), element)
+        if attr == 'owners' and self._owned_by is not None and ele_type in self._owned_by:
+            self._reindex_references(self._owned_by[ele_type], element, old_value, element._owners)
+        elif attr == 'nodes' and self._links_by_node is not None and ele_type == LINKS:
+            self._reindex_references(self._links_by_node, element, old_value, element._nodes)
+        elif attr in ('latitude', 'longitude') and self._spatial_indexes is not None:
+            if ele_type in self._spatial_indexes:
+                self._spatial_indexes[ele_type].move(element)
+
+    def _rekey_element(self, ele_type, element, old_id):
+        """
+        Index an element that has been renamed by its new id, and put
+        it back in the containers that hash it by its id. The elements
+        that refer to it keep referring to the old id.
+        :param ele_type: The type of the element
+        :param element: The element
+        :param old_id: The id of the element before it was renamed
+        """
+        id_index = self._id_index[ele_type]
+        del id_index[old_id]
+        id_index[element.id] = element
+        self._hash_element(ele_type, element)
+        global_index = self._root()._global_index
+        if global_index is not None:
+            _remove_from_global_index(global_index, ele_type, old_id, self)
+            _add_to_global_index(global_index, ele_type, element.id, self)
+
+    @staticmethod
+    def _reindex_references(index, element, old_references, new_references):
+        for reference in old_references:
+            index.discard(_reference_id(reference), element)
+        for reference in new_references:
+            index.add(_reference_id(reference), element)
+
+    def links_of(self, node_id):
+        """
+        Collects the links of this topology that connect to a node.
+        :param node_id: The id of the node, or the node itself
+        :return: A set of the Links that have the node as one of their
+            nodes. The set is empty if there are none.
+        """
+        links_by_node, _ = self._reference_indexes()
+        return {
+            self._own(LINKS, link)
+            for link in list(links_by_node.get(_reference_id(node_id), ()))
+        }
+
+    def owned_by(self, institution_id, ele_type=None):
+        """
+        Collects the elements of this topology that an institution owns.
+        :param institution_id: The id of the institution, or the
+            institution itself
+        :param ele_type: NODES or LINKS to only collect elements of
+            that type, or None to collect both
+        :return: A set of the elements that have the institution as one
+            of their owners. The set is empty if there are none.
+        """
+        institution_id = _reference_id(institution_id)
+        _, owned_by = self._reference_indexes()
+        ele_types = owned_by if ele_type is None else (ele_type,)
+        owned = set()
+        for owned_type in ele_types:
+            owned.update(
+                self._own(owned_type, element)
+                for element in list(owned_by[owned_type].get(institution_id, ()))
+            )
+        return owned
+
+    def _reference_indexes(self):
+        """
+        The reverse indexes of the references between elements, which
+        a snapshot only builds when first used.
+        :return: A tuple of the links by node id and of the nodes and
+            links by owner id
+        """
+        if self._links_by_node is None:
+            self._links_by_node = _ReverseIndex()
+            self._owned_by = {NODES: _ReverseIndex(), LINKS: _ReverseIndex()}
+            for ele_type, index in self._owned_by.items():
+                for element in self._elements[ele_type]:
+                    for owner in element._owners:
+                        index.add(_reference_id(owner), element)
+            for link in self._elements[LINKS]:
+                for node in link._nodes:
+                    self._links_by_node.add(_reference_id(node), link)
+        return self._links_by_node, self._owned_by
+
+    def _spatial_index(self, ele_type):
+        """
+        The grid index of the located elements of a type. The indexes
+        are only built when first queried, and kept up to date from
+        then on.
+        :raises: ValueError: The elements of the type have no location
+        """
+        if ele_type not in LOCATED_TYPES:
+            raise ValueError(f'The elements of type "{ele_type}" have no location')
+        if self._spatial_indexes is None:
+            self._spatial_indexes = {}
+            for located_type in LOCATED_TYPES:
+                index = GridIndex()
+                for element in self._elements[located_type]:
+                    index.insert(element)
+                self._spatial_indexes[located_type] = index
+        return self._spatial_indexes[ele_type]
+
+    def get_elements_in_bbox(
+            self, ele_type, min_latitude, min_longitude, max_latitude, max_longitude
+    ):
+        """
+        Collects the elements of this topology located within a
+        bounding box, edges included, from a spatial index.
+        Elements without a location are never in the box.
+        :param ele_type: INSTITUTIONS or NODES
+        :param min_latitude: The south edge of the box
+        :param min_longitude: The west edge of the box
+        :param max_latitude: The north edge of the box
+        :param max_longitude: The east edge of the box. A box with its
+            east edge west of its west edge crosses the antimeridian.
+        :return: A set of the elements in the box. The set is empty if
+            there are none.
+        :raises: ValueError: The elements of the type have no location
+        """
+        found = self._spatial_index(ele_type).in_bbox(
+            min_latitude, min_longitude, max_latitude, max_longitude
+        )
+        return {self._own(ele_type, element) for element in found}
+
+    def get_elements_within(self, ele_type, latitude, longitude, km):
+        """
+        Collects the elements of this topology within a great-circle
+        distance of a point, from a spatial index.
+        :param ele_type: INSTITUTIONS or NODES
+        :param latitude: The latitude of the point
+        :param longitude: The longitude of the point
+        :param km: The distance, in kilometres
+        :return: A set of the elements within the distance. The set is
+            empty if there are none.
+        :raises: ValueError: The elements of the type have no location
+        """
+        found = self._spatial_index(ele_type).within(latitude, longitude, km)
+        return {self._own(ele_type, element) for element in found}
+
+    def link_lengths(self):
+        """
+        The great-circle length of every link of this topology, between
+        its two nodes, computed in bulk with NumPy. The lengths are
+        cached until a node or link is added, deleted or changed in a
+        way that affects them. Requires NumPy.
+        :return: A dictionary of the lengths in kilometres by the ids
+            of the links. The length is NaN for a link without two
+            located nodes in this topology.
+        """
+        if self._link_lengths is None:
+            from grenml.frame import haversine_km
+            import numpy as np
+            node_index = self._id_index[NODES]
+            link_ids = []
+            coordinates = []
+            for link_id, link in self._id_index[LINKS].items():
+                link_ids.append(link_id)
+                ends = [node_index.get(_reference_id(node)) for node in link._nodes]
+                if len(ends) == 2 and ends[0] is not None and ends[1] is not None:
+                    coordinates += (
+                        ends[0].latitude, ends[0].longitude, ends[1].latitude, ends[1].longitude,
+                    )
+                else:
+                    coordinates += (None, None, None, None)
+            # None becomes NaN, so links without a location get NaN
+            coordinates = np.array(coordinates, dtype=np.float64).reshape(-1, 4)
+            lengths = haversine_km(*coordinates.T)
+            self._link_lengths = dict(zip(link_ids, lengths.tolist()))
+        return dict(self._link_lengths)
+
+    def add_owner(self, ele_type, element_id, owner_id):
+        """
+        Add an owner to a node or link of this topology.
+        :param ele_type: NODES or LINKS
+        :param element_id: The id of the element
+        :param owner_id: The id of the institution that owns it
+        :raises: ObjectNotFoundError: There is no element with the id
+        """
+        element = self.get_element(ele_type, id=element_id)
+        element.owners = element._owners | {owner_id}
+
+    def remove_owner(self, ele_type, element_id, owner_id):
+        """
+        Remove an owner from a node or link of this topology.
+        :param ele_type: NODES or LINKS
+        :param element_id: The id of the element
+        :param owner_id: The id of the institution to remove
+        :raises: ObjectNotFoundError: There is no element with the id
+        :raises: KeyError: The institution does not own the element
+        """
+        element = self.get_element(ele_type, id=element_id)
+        if owner_id not in element._owners:
+            raise KeyError(owner_id)
+        element.owners = element._owners - {owner_id}
+
+    def _resolve_ids(self, ele_type, ids):
+        """
+        Look up the elements of a type with the given ids, as used to
+        resolve the owners and nodes that elements refer to by id.
+        :param ele_type: The type of the elements referred to
+        :param ids: The ids of the elements
+        :return: A set of the elements found. Ids of elements that are
+            not in the topology are left out.
+        """
+        elements = _resolve_ids(self._id_index[ele_type], ids)
+        if self._borrowed[ele_type]:
+            elements = {self._own(ele_type, element) for element in elements}
+        return elements
+
+    def _candidates(self, search_type, kwargs):
+        """
+        Narrow down the elements a search has to be matched against.
+        An exact id, or a collection of ids given with id__in, is
+        answered from the id index, and an exact value of an attribute
+        with a secondary index from that index; any other search has to
+        look at every element of the type.
+        :param search_type: The type of element being searched
+        :param kwargs: The key word arguments of the search
+        :return: An iterable of the elements that may match the search
+        """
+        id_index = self._id_index[search_type]
+        if 'id' in kwargs:
+            try:
+                element = id_index.get(kwargs['id'])
+            except TypeError:
+                # An unhashable value can never be equal to an id
+                return []
+            return [element] if element is not None else []
+        search_ids = kwargs.get('id__in')
+        # A string given to id__in is a substring check, which the
+        # index can't answer
+        if isinstance(search_ids, Collection) and not isinstance(search_ids, str):
+            candidates = {}
+            for search_id in search_ids:
+                try:
+                    element = id_index.get(search_id)
+                except TypeError:
+                    continue
+                if element is not None:
+                    candidates[element.id] = element
+            return candidates.values()
+        for attr, index in self._attribute_indexes.items():
+            if attr in kwargs and index is None:
+                # Not built yet in a snapshot
+                self.add_index(attr)
+                index = self._attribute_indexes[attr]
+            if attr in kwargs and search_type in index:
+                try:
+                    return index[search_type].get(kwargs[attr], ())
+                except TypeError:
+                    # Unhashable values are left to the full scan
+                    pass
+        return self._elements[search_type]
 
     def get_element(self, search_type=None, **kwargs):
         """
@@ -124,13 +950,92 @@ class Topology(GRENMLObject):
             element, raise this error.
         """
         try:
-            elements = self.get_elements(search_type, **kwargs)
-            if len(elements) > 1:
+            matches = self.iter_elements(search_type, **kwargs)
+            element = next(matches, None)
+            if element is None:
+                raise EXCEPTIONS[search_type]()
+            # Only whether there is a second match matters, stop there
+            if next(matches, None) is not None:
                 raise MultipleReturnedError
-            return elements.pop()
+            return element
         except (AttributeError, TypeError):
             raise EXCEPTIONS[search_type]()
 
+    def iter_elements(self, search_type=None, **kwargs):
+        """
+        Lazily yields the elements in the topology that match the given
+        parameters, so that a caller that only needs the first few
+        matches does not match every element.
+        The topology must not have elements added or deleted while the
+        iterator is in use.
+        Nodes and Links can also be searched by their lifetimes, with
+        active_at, a date, or active_between, a tuple of the start and
+        end of a period, either of which may be None. The dates may be
+        ISO strings, datetimes or epoch seconds, and are answered from
+        an interval index; see _active_candidates.
+        :param search_type: The specific type of element to search
+            against
+        :param kwargs: The key word arguments to search against specific
+            attributes
+        :return: An iterator of the GRENObjects that match the criteria
+        :raises: ValueError: The elements have no lifetime, or a period
+            ends before it starts
+        """
+        temporal = {key: kwargs.pop(key) for key in TEMPORAL_ARGUMENTS if key in kwargs}
+        predicate = compile_match(**kwargs)
+        if temporal:
+            candidates = self._active_candidates(search_type, **temporal)
+        else:
+            candidates = self._candidates(search_type, kwargs)
+        if not self._borrowed.get(search_type):
+            return (element for element in candidates if predicate(element))
+        # The elements shared with the topology this is a snapshot of
+        # are replaced with copies as they are found, which changes the
+        # containers the candidates come from
+        candidates = list(candidates)
+        if any(param.split('__')[0] in REFERENCE_FIELDS for param in kwargs):
+            # Their owners and nodes are only resolved from this
+            # topology once they are its own
+            candidates = [self._own(search_type, element) for element in candidates]
+        return (
+            self._own(search_type, element) for element in candidates if predicate(element)
+        )
+
+    def _active_candidates(self, search_type, active_at=None, active_between=None):
+        """
+        Find the elements whose lifetimes contain a date or overlap a
+        period, ends included, from an interval index of the lifetimes.
+        A lifetime without a start or an end is open on that side, so
+        an element without a lifetime is always active, and one whose
+        lifetime ends before it starts is never active. The index is
+        built on the first search and then follows the elements and
+        their lifetimes as they change, so a search takes logarithmic
+        time plus the number of elements found and of recent changes.
+        :return: A list of the active elements
+        :raises: ValueError: The elements have no lifetime, or the
+            period ends before it starts
+        """
+        if search_type not in LIFETIME_TYPES:
+            raise ValueError(f'The {search_type} of a topology have no lifetime')
+        index = self._interval_indexes.get(search_type)
+        if index is None:
+            index = IntervalIndex(self._elements[search_type])
+            self._interval_indexes[search_type] = index
+        found = None
+        if active_at is not None:
+            found = index.active_at(convert_to_epoch(active_at))
+        if active_between is not None:
+            start, end = (convert_to_epoch(date) for date in active_between)
+            if start is not None and end is not None and start > end:
+                raise ValueError('A period must not end before it starts')
+            active = index.active_between(start, end)
+            if found is None:
+                found = active
+            else:
+                active_ids = {id(element) for element in active}
+                found = [element for element in found if id(element) in active_ids]
+        return found if found is not None else self._elements[search_type]
+
     def get_elements(self, search_type=None, **kwargs):
         """
         Collects all the elements in the topology that matches the given
@@ -142,11 +1047,162 @@ class Topology(GRENMLObject):
         :return: A list of GRENObjects that match the criteria, or None
             if none are found.
         """
-        matches = []
-        for element in self._elements[search_type]:
-            if element.match(**kwargs):
-                matches.append(element)
-        return set(matches) or None
+        return set(self.iter_elements(search_type, **kwargs)) or None
+
+    def merge(self, *topologies, on_conflict=KEEP_FIRST):
+        """
+        Merge copies of the Institutions, Nodes and Links of other
+        topologies into this one, by id. Elements with the same id and
+        the same content are only merged once; elements with the same
+        id but different content are resolved by the on_conflict
+        policy. The copies refer to their owners and nodes by id, and
+        keep their owners as they are, without the primary owner of
+        this topology. Sub-topologies are not merged.
+        :param topologies: The topologies to merge, in order
+        :param on_conflict: KEEP_FIRST to keep the element that is in
+            this topology or comes from an earlier topology,
+            KEEP_NEWEST to keep the element with the latest version,
+            or RAISE_ON_CONFLICT to raise MergeConflictError
+        :raises: ValueError: The policy is not one of MERGE_POLICIES
+        :raises: MergeConflictError: There is a conflict and the policy
+            is RAISE_ON_CONFLICT. Nothing is merged.
+        """
+        if on_conflict not in MERGE_POLICIES:
+            raise ValueError(f'The conflict policy must be one of {MERGE_POLICIES}')
+        if on_conflict == RAISE_ON_CONFLICT:
+            self._check_merge_conflicts(topologies)
+        for ele_type in MERGED_TYPES:
+            id_index = self._id_index[ele_type]
+            for topology in topologies:
+                for element in topology._elements[ele_type]:
+                    if element.id == GLOBAL_INSTITUTION_ID:
+                        continue
+                    existing = id_index.get(element.id)
+                    if existing is not None:
+                        if on_conflict == KEEP_FIRST or not _is_newer(element, existing):
+                            continue
+                        if existing.fingerprint() == element.fingerprint():
+                            continue
+                        self.delete_elements(ele_type, [existing])
+                    self._add_element(ele_type, element.copy())
+
+    def snapshot(self):
+        """
+        Make a copy-on-write copy of this topology, such as to try out
+        changes to it. The snapshot shares the Institutions, Nodes and
+        Links of the topology rather than copying them, and leaves them
+        as they are. It replaces a shared element with a copy of its
+        own the first time it hands it out, by any of its methods or
+        through the owners and nodes of its elements, so an element got
+        from either topology can be edited directly without the other
+        seeing the edit. An element of the topology that is about to be
+        changed, or moved to another topology, is copied by the
+        snapshots that share it first. Elements are added to and
+        deleted from either without affecting the other.
+        Sub-topologies are snapshotted in turn.
+        The snapshot copies the containers of the elements and shares
+        the reverse indexes, but builds its other indexes only when
+        they are first used. Reading every element of a type, such as
+        with the nodes property, copies the ones still shared.
+        :return: The new Topology, not in any tree of topologies
+        """
+        clone = GRENMLObject.copy(self)
+        clone._elements = {}
+        clone._id_index = {}
+        for ele_type, elements in self._elements.items():
+            if ele_type == TOPOLOGIES:
+                clone._elements[ele_type] = set()
+                clone._id_index[ele_type] = {}
+                continue
+            clone._elements[ele_type] = set(elements)
+            clone._id_index[ele_type] = dict(self._id_index[ele_type])
+        clone._borrowed = {ele_type: len(self._elements[ele_type]) for ele_type in MERGED_TYPES}
+        clone._snapshots = None
+        # The elements of the snapshot belong to this topology or to the
+        # topologies this one shares elements with
+        clone._lenders = self._lenders + (self,)
+        for lender in clone._lenders:
+            if lender._snapshots is None:
+                lender._snapshots = WeakValueDictionary()
+            lender._snapshots[id(clone)] = clone
+        clone._attribute_indexes = dict.fromkeys(self._attribute_indexes)
+        if self._links_by_node is not None:
+            clone._links_by_node = self._links_by_node.share()
+            clone._owned_by = {
+                ele_type: index.share() for ele_type, index in self._owned_by.items()
+            }
+        clone._spatial_indexes = None
+        clone._interval_indexes = {}
+        clone._global_index = None
+        clone._digests = None
+        clone._stale = {}
+        if self._digests is not None:
+            clone._digests = dict(self._digests, **{TOPOLOGIES: 0})
+            clone._stale = {
+                key: entry for key, entry in self._stale.items() if entry[0] != TOPOLOGIES
+            }
+        for topology in self._elements[TOPOLOGIES]:
+            clone.add_topology(topology.snapshot())
+        return clone
+
+    def copy(self):
+        """
+        Copy the topology, such as to add it to another topology. The
+        copy shares none of the elements of the topology: its
+        Institutions, Nodes, Links and sub-topologies are copied too.
+        :return: The copy, not in any tree of topologies
+        """
+        clone = self.snapshot()
+        clone._detach()
+        return clone
+
+    def _detach(self):
+        """
+        Replace every element this snapshot and its sub-topologies
+        share with the topologies they were taken of with copies, so
+        that they share nothing.
+        """
+        for ele_type in MERGED_TYPES:
+            self._owned(ele_type)
+        for lender in self._lenders:
+            lender._snapshots.pop(id(self), None)
+        self._lenders = ()
+        for topology in self._elements[TOPOLOGIES]:
+            topology._detach()
+
+    def materialize(self, ele_type, element_id):
+        """
+        Get an element of this topology to edit. A topology only hands
+        out elements of its own, so this is get_element by id; the
+        element may also be given rather than its id, such as one got
+        from the topology this one is a snapshot of.
+        :param ele_type: The type of the element
+        :param element_id: The id of the element, or the element itself
+        :return: The element of this topology
+        :raises: ObjectNotFoundError: There is no element with the id
+        """
+        return self.get_element(ele_type, id=_reference_id(element_id))
+
+    def _check_merge_conflicts(self, topologies):
+        """
+        :raises: MergeConflictError: Elements of this topology or the
+            topologies to be merged have the same id and different
+            content
+        """
+        for ele_type in MERGED_TYPES:
+            fingerprints = {
+                element_id: element.fingerprint()
+                for element_id, element in self._id_index[ele_type].items()
+            }
+            for topology in topologies:
+                for element_id, element in topology._id_index[ele_type].items():
+                    fingerprint = element.fingerprint()
+                    if fingerprints.setdefault(element_id, fingerprint) != fingerprint:
+                        raise MergeConflictError(
+                            '{} ID: {} has different content in the topologies merged'.format(
+                                type(element).__name__, element_id
+                            )
+                        )
 
     def delete_elements(self, ele_type, elements):
         """
@@ -156,6 +1212,10 @@ class Topology(GRENMLObject):
         """
         for element in elements:
             self._elements[ele_type].remove(element)
+            element = self._id_index[ele_type].pop(getattr(element, 'id', element))
+            self._unindex_element(ele_type, element)
+            if element._parent is not self:
+                self._borrowed[ele_type] -= 1
 
     def update_elements_properties(
         self, element_type, match_kwargs,
@@ -176,4 +1236,74 @@ class Topology(GRENMLObject):
             elif remove:
                 element.del_property(attr, value)
             else:
+                element._changing('additional_properties')
                 element.additional_properties[attr] = value
+                element._changed('additional_properties')
+
+    def to_frame(self):
+        """
+        Copy the Institutions, Nodes and Links of this topology into a
+        columnar TopologyFrame of NumPy arrays, for analysis in bulk.
+        Requires NumPy.
+        :return: A grenml.frame.TopologyFrame
+        """
+        from grenml.frame import TopologyFrame
+        return TopologyFrame(self)
+
+    def __eq__(self, other):
+        """
+        Evaluate that the fields of this topology and the other topology
+        match, and that they have equal elements.
+        """
+        if not super().__eq__(other):
+            return False
+        if isinstance(other, str):
+            return True
+        return all(
+            elements == other._elements[ele_type]
+            for ele_type, elements in self._elements.items()
+        )
+
+    __hash__ = GRENMLObject.__hash__
+
+    def __getstate__(self):
+        """
+        Pickle or copy the topology without its live snapshots, which
+        only follow the topology itself, nor the sums of the
+        fingerprints of its elements, which track the elements by
+        identity. A snapshot makes the elements it still shares its own
+        first, so that the copy shares nothing.
+        """
+        self._detach()
+        slots = {
+            slot: getattr(self, slot) for slot in GRENMLObject.__slots__
+            if slot != '__dict__' and hasattr(self, slot)
+        }
+        return dict(self.__dict__, _snapshots=None, _digests=None, _stale={}), slots
+
+    def fingerprint(self):
+        """
+        A digest of the content of the topology, combining the digest of
+        its fields with the sums of the fingerprints of its elements of
+        each type, sub-topologies included, as a Merkle tree. The sums
+        are updated as elements are added, deleted or changed, and only
+        the fingerprints of the elements added or changed since the last
+        call are computed, so the cost of a call follows the number of
+        edits rather than the size of the topology.
+        :return: The digest as a hex string
+        """
+        if self._fingerprint is None:
+            if self._digests is None:
+                self._digests = dict.fromkeys(self._elements, 0)
+                for ele_type, elements in self._elements.items():
+                    for element in elements:
+                        self._add_digest(ele_type, element.fingerprint())
+            for ele_type, element in self._stale.values():
+                self._add_digest(ele_type, element.fingerprint())
+            self._stale = {}
+            hsh = sha256(self._content_digest().encode('utf-8'))
+            for ele_type in sorted(self._digests):
+                hsh.update(ele_type.encode('utf-8'))
+                hsh.update(self._digests[ele_type].to_bytes(32, 'big'))
+            self._fingerprint = hsh.hexdigest()
+        return self._fingerprint
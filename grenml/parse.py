@@ -23,17 +23,62 @@ and streams into a provided GRENML manager
 import importlib_resources
 import lxml.etree
 import xml  # nosemgrep : use-defused-xml
+import xml.parsers.expat  # nosemgrep : use-defused-xml
 
-from io import BytesIO, TextIOWrapper
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from io import BytesIO
+from warnings import warn
 
 from grenml import GRENMLManager
+from grenml.models import Topology, Institution, Node, Link
+from grenml.models import INSTITUTIONS, NODES, LINKS, KEEP_FIRST
+from grenml.models.topologies import _reference_id
 from grenml.parsing import GRENMLHandler
+from grenml.writing.grenml import GRENML_XMLNS_URI
 
+_TOPOLOGY_HANDLER = GRENMLHandler.TopologyHandler
 
+# The handler of each element read by GRENMLParser.iter_elements, and
+# the attribute of the handler that holds the element it read
+_STREAMED_ELEMENTS = {
+    '{{{}}}Institution'.format(GRENML_XMLNS_URI): (
+        _TOPOLOGY_HANDLER.InstitutionHander, 'institution',
+    ),
+    '{{{}}}Node'.format(GRENML_XMLNS_URI): (_TOPOLOGY_HANDLER.NodeHandler, 'node'),
+    '{{{}}}Link'.format(GRENML_XMLNS_URI): (_TOPOLOGY_HANDLER.LinkHandler, 'link'),
+}
+
+# The types of the elements packed by _pack_topology, in the order
+# they are packed and added back to a topology, with their classes and
+# the methods of Topology that add them
+_PACKED_TYPES = (
+    (INSTITUTIONS, Institution, Topology.add_institution),
+    (NODES, Node, Topology.add_node),
+    (LINKS, Link, Topology.add_link),
+)
+
+# The fields of a topology itself that are packed by _pack_topology
+_TOPOLOGY_FIELDS = (
+    '_id', '_id_format', '_name', '_version', '_short_name', '_properties', '_primary_owner',
+)
+
+# The slots of the elements that are not packed, since they tie an
+# element to its topology or cache what can be computed again
+_UNPACKED_SLOTS = ('_parent', '_fingerprint', '__dict__')
+
+# The slots of the elements that refer to other elements, which are
+# packed as the ids of the elements
+_REFERENCE_SLOTS = ('_owners', '_nodes')
+
+
+@lru_cache(maxsize=None)
 def load_schema():
     """
     Creates an lxml schema object, capable of validating XML input
     according to the GRENML schema.
+    The schema is compiled on the first call, and the same object is
+    returned by every further call for the life of the process.
     """
     schemas_traversable = importlib_resources.files('grenml.schemas')
     schema_path = str(schemas_traversable.joinpath('grenml.xsd'))
@@ -50,30 +95,574 @@ class SchemaValidationError(Exception):
     pass
 
 
+class FileParseError(Exception):
+    """
+    parse_many will raise this error when a file cannot be parsed, for
+    instance because it is not well formed or has an element that the
+    handlers do not expect, in place of the error of the parser, which
+    may not be sent back from a worker process.
+    """
+
+    def __init__(self, file_name, message):
+        super().__init__(file_name, message)
+        self.file_name = file_name
+        self.message = message
+
+    def __str__(self):
+        return '{}: {}'.format(self.file_name, self.message)
+
+
+def _is_invalid(error_log):
+    """
+    Whether the errors of a parse show that the document is well formed
+    but does not conform to the schema. The error log of a syntax error
+    is a copy of the global error log of lxml, so it is cleared with
+    lxml.etree.clear_error_log as each document starts, or the errors
+    of an earlier document would be taken for those of this one.
+    """
+    errors = error_log.filter_from_errors()
+    schema_errors = errors.filter_domains(lxml.etree.ErrorDomains.SCHEMASV)
+    return bool(schema_errors) and len(schema_errors) == len(errors)
+
+
+def _trailing_text(element):
+    """
+    The text of an lxml element after its last child element, which is
+    what SAX reports as its characters. The text around comments and
+    processing instructions is joined.
+    """
+    if not len(element):
+        return element.text or ''
+    text = element.text or ''
+    for child in element:
+        if isinstance(child.tag, str):
+            text = child.tail or ''
+        else:
+            text += child.tail or ''
+    return text
+
+
+def _handle_children(handler, element, names):
+    """
+    Pass the child elements of an lxml element to the handler of the
+    element, as SAX events would.
+    :param names: The names of elements as they are written in the
+        document, such as 'grenml:Node', by tag and namespace prefix,
+        added to as new ones are found
+    """
+    for child in element.iterchildren(lxml.etree.Element):
+        key = (child.tag, child.prefix)
+        name = names.get(key)
+        if name is None:
+            local_name = key[0].rpartition('}')[2]
+            name = names[key] = '{}:{}'.format(key[1], local_name) if key[1] else local_name
+        child_handler = handler.getChildHandler(name)
+        child_handler.startElement(name, child.attrib)
+        _handle_children(child_handler, child, names)
+        child_handler.characters(_trailing_text(child))
+        child_handler.endElement(name)
+
+
+class _ElementFound(Exception):
+    pass
+
+
+def _locate_element(byte_stream, start, count, encoding):
+    """
+    Find where an element of a document starts, as the SAX parser
+    would report it, by reading the document again with expat up to
+    the element.
+    :param byte_stream: The seekable stream of the document, which is
+        left where it was
+    :param start: The position of the document in the stream
+    :param count: The number of the element in the document, from 1
+    :return: The line and column numbers of the element
+    """
+    parser = xml.parsers.expat.ParserCreate(encoding)
+    found = []
+
+    def start_element(name, attrs):
+        found.append((parser.CurrentLineNumber, parser.CurrentColumnNumber))
+        if len(found) == count:
+            raise _ElementFound
+
+    parser.StartElementHandler = start_element
+    position = byte_stream.tell()
+    try:
+        byte_stream.seek(start)
+        parser.ParseFile(byte_stream)
+    except _ElementFound:
+        pass
+    finally:
+        byte_stream.seek(position)
+    return found[-1]
+
+
+class _TargetLocator(xml.sax.xmlreader.Locator):
+    """
+    The SAX locator of the handlers of a _HandlerTarget. lxml does not
+    tell a parser target where it is in the document, so the position
+    of the element being read is only found when an error of the
+    handlers asks for it, see _locate_element. It is unknown if the
+    document can't be read again.
+    """
+
+    def __init__(self, target, byte_stream, encoding):
+        self._target = target
+        self._byte_stream = None
+        self._system_id = getattr(byte_stream, 'name', None)
+        if byte_stream.seekable():
+            self._byte_stream = byte_stream
+            self._start = byte_stream.tell()
+        self._encoding = encoding
+        self._position = None
+
+    def _locate(self):
+        if self._byte_stream is None or not self._target.elements:
+            return -1, -1
+        if self._position is None or self._position[0] != self._target.elements:
+            self._position = self._target.elements, _locate_element(
+                self._byte_stream, self._start, self._target.elements, self._encoding,
+            )
+        return self._position[1]
+
+    def getColumnNumber(self):  # noqa: N802
+        return self._locate()[1]
+
+    def getLineNumber(self):  # noqa: N802
+        return self._locate()[0]
+
+    def getSystemId(self):  # noqa: N802
+        return self._system_id
+
+
+class _HandlerTarget:
+    """
+    An lxml parser target that passes the elements and text of the
+    document to a GRENMLHandler as SAX events, with the element names
+    as they are written in the document, such as 'grenml:Node'.
+
+    The handlers see an element before the schema validates it, so the
+    first error they raise is kept and the rest of the document is read
+    without them. The schema has its say before the error is raised.
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.error = None
+        # The number of elements started, for _TargetLocator
+        self.elements = 0
+        # The namespace prefixes in scope, by namespace, and the depth
+        # and prefixes to go back to when leaving the scope of further
+        # namespace declarations
+        self._prefixes = {}
+        self._scopes = []
+        self._depth = 0
+        self._names = {}
+
+    def _name(self, tag):
+        namespace, _, local_name = tag.lstrip('{').rpartition('}')
+        prefix = self._prefixes.get(namespace)
+        name = self._names[tag] = '{}:{}'.format(prefix, local_name) if prefix else local_name
+        return name
+
+    def start(self, tag, attrib, nsmap=None):
+        self._depth += 1
+        self.elements += 1
+        if nsmap:
+            self._scopes.append((self._depth, self._prefixes))
+            self._prefixes = dict(self._prefixes)
+            self._prefixes.update((namespace, prefix) for prefix, namespace in nsmap.items())
+            self._names = {}
+        if self.error is None:
+            try:
+                self.handler.startElement(self._names.get(tag) or self._name(tag), attrib)
+            except Exception as err:
+                self.error = err
+
+    def data(self, content):
+        if self.error is None:
+            try:
+                self.handler.characters(content)
+            except Exception as err:
+                self.error = err
+
+    def end(self, tag):
+        if self.error is None:
+            try:
+                self.handler.endElement(self._names.get(tag) or self._name(tag))
+            except Exception as err:
+                self.error = err
+        if self._scopes and self._scopes[-1][0] == self._depth:
+            self._prefixes = self._scopes.pop()[1]
+            self._names = {}
+        self._depth -= 1
+
+    def close(self):
+        return self.handler.manager
+
+
+class _FeedReader:
+    """
+    Reads a document fed to it in chunks with the incremental SAX
+    interface of expat, which passes the elements to a GRENMLHandler as
+    soon as they are read. expat does not validate, so the chunks are
+    also fed to an lxml pull parser with the schema, which frees each
+    institution, node and link once it has been validated.
+
+    As with _HandlerTarget, the first error raised by the handlers is
+    kept and only raised once the schema has validated the document.
+    """
+
+    def __init__(self, schema):
+        self.handler = GRENMLHandler()
+        self.sax_parser = xml.sax.make_parser()
+        self.sax_parser.setContentHandler(self.handler)
+        self.validator = None
+        if schema is not None:
+            self.validator = lxml.etree.XMLPullParser(
+                events=('end',), tag=tuple(_STREAMED_ELEMENTS), schema=schema,
+            )
+            lxml.etree.clear_error_log()
+        self.error = None
+
+    def _validate(self, parse, *args):
+        try:
+            parse(*args)
+        except lxml.etree.XMLSyntaxError as err:
+            if _is_invalid(err.error_log):
+                raise SchemaValidationError() from err
+            raise
+        for _, element in self.validator.read_events():
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+
+    def feed(self, data):
+        if self.validator is not None:
+            self._validate(self.validator.feed, data)
+        if self.error is None:
+            try:
+                self.sax_parser.feed(data)
+            except Exception as err:
+                self.error = err
+
+    def close(self):
+        if self.validator is not None:
+            self._validate(self.validator.close)
+        if self.error is None:
+            try:
+                self.sax_parser.close()
+            except Exception as err:
+                self.error = err
+        if self.error is not None:
+            raise self.error
+        return self.handler.manager
+
+
 class GRENMLParser:
     """
     Controller to manage parsing GRENML from streams as well as files
     """
 
-    def __init__(self):
-        self.parser = xml.sax.make_parser()
+    def __init__(self, validate_schema=True):
+        """
+        :param validate_schema: Whether to validate documents against
+            the GRENML schema. Only documents that are known to be
+            valid, such as ones written by this library, should be read
+            without validating them: an invalid document may then raise
+            other errors or be read incompletely.
+        """
         self.handler = GRENMLHandler()
-        self.parser.setContentHandler(self.handler)
-        self.schema = load_schema()
+        self.validate_schema = validate_schema
+        self._schema = None
+        self._reader = None
+        self._sax_parser = None
+
+    @property
+    def schema(self):
+        """
+        The GRENML schema, compiled once for all parsers the first time
+        it is used, or None if documents are not validated. Another
+        schema can be set to validate documents against it instead.
+        """
+        if not self.validate_schema:
+            return None
+        return self._schema if self._schema is not None else load_schema()
+
+    @schema.setter
+    def schema(self, schema):
+        self._schema = schema
+        self.validate_schema = schema is not None
+
+    @property
+    def parser(self):
+        """
+        The SAX parser that documents were read with before they were
+        read with lxml, for code that used it directly.
+        """
+        warn(
+            'GRENMLParser.parser has been deprecated, as documents are now read with lxml, and'
+            ' will be removed in the next major version. Use the parse methods instead.',
+            DeprecationWarning, 2
+        )
+        if self._sax_parser is None:
+            self._sax_parser = xml.sax.make_parser()
+            self._sax_parser.setContentHandler(self.handler)
+        return self._sax_parser
 
     def parse_byte_stream(self, byte_stream, encoding='utf-8') -> GRENMLManager:
+        """
+        Validate the document against the schema and build its manager
+        in a single pass, without building a tree of the document.
+        :raises: SchemaValidationError: The document does not conform
+            to the GRENML schema
+        """
+        target = _HandlerTarget(self.handler)
+        self.handler.setDocumentLocator(_TargetLocator(target, byte_stream, encoding))
+        parser = lxml.etree.XMLParser(target=target, schema=self.schema, encoding=encoding)
+        lxml.etree.clear_error_log()
         try:
-            lxml_doc = lxml.etree.parse(byte_stream)
-            self.schema.assertValid(lxml_doc)
-        except lxml.etree.DocumentInvalid:
+            manager = lxml.etree.parse(byte_stream, parser)
+            error_log = parser.error_log
+        except lxml.etree.XMLSyntaxError as err:
+            if not _is_invalid(err.error_log):
+                raise
+            error_log = err.error_log
+        if _is_invalid(error_log):
             raise SchemaValidationError()
+        if target.error is not None:
+            raise target.error
+        return manager
 
-        byte_stream.seek(0)
-        self.parser.parse(TextIOWrapper(byte_stream, encoding=encoding))
-        return self.handler.manager
+    def iter_elements(self, file_name):
+        """
+        Read the institutions, nodes and links of a document one at a
+        time, those of nested topologies included, as their closing
+        tags are read. Each is discarded from the parser once it has
+        been read, so memory use does not grow with the size of the
+        document. The elements are not added to a manager: owners and
+        nodes are left as ids, and duplicates are all yielded.
+        The document is validated as it is read, so elements may be
+        yielded before an error further on is found.
+        :param file_name: The path of the document, or a binary stream
+        :return: A generator of the Institutions, Nodes and Links
+        :raises: SchemaValidationError: The document does not conform
+            to the GRENML schema
+        """
+        events = lxml.etree.iterparse(
+            file_name, tag=tuple(_STREAMED_ELEMENTS), schema=self.schema,
+        )
+        lxml.etree.clear_error_log()
+        # The handler of each kind of element, reused for all of them
+        handlers = {}
+        names = {}
+        try:
+            for _, element in events:
+                handler_class, attribute = _STREAMED_ELEMENTS[element.tag]
+                handler = handlers.get(handler_class)
+                if handler is None:
+                    handler = handlers[handler_class] = handler_class(None, None)
+                try:
+                    handler.startElement(handler.element_name, element.attrib)
+                    _handle_children(handler, element, names)
+                except Exception:
+                    # The schema may only reject the element after it
+                    # has been read, so let it have its say first
+                    for _, element in events:
+                        element.clear()
+                    raise
+                # Free the element and the elements read before it
+                element.clear()
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+                yield getattr(handler, attribute)
+        except lxml.etree.XMLSyntaxError as err:
+            if _is_invalid(err.error_log):
+                raise SchemaValidationError() from err
+            raise
+
+    def feed(self, data):
+        """
+        Feed the parser the next chunk of a document, such as one that
+        is still being received. The elements in the chunk are read and
+        validated straight away, and close() ends the document.
+        :param data: The bytes of the chunk
+        :raises: SchemaValidationError: The document does not conform
+            to the GRENML schema. The parser is then ready for another
+            document.
+        """
+        if self._reader is None:
+            self._reader = _FeedReader(self.schema)
+        try:
+            self._reader.feed(data)
+        except Exception:
+            self._reader = None
+            raise
+
+    def close(self) -> GRENMLManager:
+        """
+        End the document fed to the parser and build its manager. The
+        parser is then ready for another document.
+        :raises: SchemaValidationError: The document does not conform
+            to the GRENML schema
+        """
+        reader, self._reader = self._reader, None
+        if reader is None:
+            reader = _FeedReader(self.schema)
+        return reader.close()
+
+    async def parse_async(self, reader, chunk_size=65536) -> GRENMLManager:
+        """
+        Read a document from an asyncio StreamReader, such as the body
+        of an upload, feeding the parser each chunk as it arrives
+        rather than waiting for the whole document.
+        :param reader: The asyncio.StreamReader, read until its end
+        :param chunk_size: The most bytes to read at a time
+        :raises: SchemaValidationError: The document does not conform
+            to the GRENML schema
+        """
+        try:
+            while True:
+                chunk = await reader.read(chunk_size)
+                if not chunk:
+                    break
+                self.feed(chunk)
+        except BaseException:
+            self._reader = None
+            raise
+        return self.close()
 
     def parse_string(self, string) -> GRENMLManager:
         return self.parse_byte_stream(BytesIO(string.encode()))
 
     def parse_file(self, file_name) -> GRENMLManager:
-        return self.parse_byte_stream(open(file_name, 'rb'))
+        with open(file_name, 'rb') as byte_stream:
+            return self.parse_byte_stream(byte_stream)
+
+
+@lru_cache(maxsize=None)
+def _packed_slots(cls):
+    """
+    The slots of a model class that hold the content of its objects.
+    """
+    return tuple(
+        slot for klass in reversed(cls.__mro__) for slot in getattr(klass, '__slots__', ())
+        if slot not in _UNPACKED_SLOTS
+    )
+
+
+def _pack_topology(topology):
+    """
+    Pack a topology, its elements and its sub-topologies into nested
+    tuples of plain values. These pickle to a fraction of the size of
+    the topology, without the references between the elements and
+    their topologies, so that they can be sent between processes.
+    The collections of the elements, such as their properties, are not
+    copied, so the topology should not be used after it is packed.
+    """
+    elements = []
+    for ele_type, cls, _ in _PACKED_TYPES:
+        slots = _packed_slots(cls)
+        elements.append([
+            tuple(
+                {_reference_id(reference) for reference in getattr(element, slot)}
+                if slot in _REFERENCE_SLOTS else getattr(element, slot)
+                for slot in slots
+            )
+            for element in topology.get_elements(ele_type) or ()
+        ])
+    return (
+        tuple(getattr(topology, field) for field in _TOPOLOGY_FIELDS),
+        elements,
+        [_pack_topology(sub_topology) for sub_topology in topology.topologies],
+    )
+
+
+def _unpack_topology(topology, packed):
+    """
+    Fill an empty topology with a topology packed by _pack_topology.
+    """
+    fields, elements, sub_topologies = packed
+    for field, value in zip(_TOPOLOGY_FIELDS, fields):
+        setattr(topology, field, value)
+    for (_, cls, add_element), values in zip(_PACKED_TYPES, elements):
+        slots = _packed_slots(cls)
+        for element_values in values:
+            element = cls.__new__(cls)
+            element._parent = None
+            element._fingerprint = None
+            for slot, value in zip(slots, element_values):
+                setattr(element, slot, value)
+            add_element(topology, element)
+    for packed_sub_topology in sub_topologies:
+        sub_topology = Topology()
+        _unpack_topology(sub_topology, packed_sub_topology)
+        topology.add_topology(sub_topology)
+
+
+def _parse_file(file_name, validate_schema=True):
+    """
+    Parse a file for parse_many.
+    :return: The GRENMLManager of the file
+    :raises: FileParseError: The file could not be parsed
+    """
+    try:
+        return GRENMLParser(validate_schema=validate_schema).parse_file(file_name)
+    except (SchemaValidationError, OSError):
+        raise
+    except Exception as err:
+        # The errors of lxml and SAX can't be pickled, and so can't be
+        # sent back from a worker process themselves
+        raise FileParseError(file_name, '{}: {}'.format(type(err).__name__, err)) from err
+
+
+def _parse_packed(file_name, validate_schema=True):
+    """
+    Parse a file in a worker process of parse_many.
+    :return: The topology of the file, packed by _pack_topology
+    """
+    return _pack_topology(_parse_file(file_name, validate_schema).topology)
+
+
+def parse_many(file_names, workers=None, merge=False, on_conflict=KEEP_FIRST,
+               validate_schema=True):
+    """
+    Parse many GRENML files at once, in a pool of processes. The
+    topologies parsed by the workers are sent back packed into tuples
+    of plain values, which pickle to a fraction of the size of their
+    objects, and are built again in this process.
+    :param file_names: The paths of the files
+    :param workers: The number of processes to parse in, by default
+        the number of CPUs. With 1, the files are parsed one after the
+        other in this process.
+    :param merge: Whether to merge the topologies of all the files into
+        the manager of the first one, see GRENMLManager.merge
+    :param on_conflict: How merge resolves elements with the same id
+        and different content: KEEP_FIRST, KEEP_NEWEST or
+        RAISE_ON_CONFLICT, from grenml.models
+    :param validate_schema: Whether to validate the files against the
+        GRENML schema, see GRENMLParser
+    :return: A list of the GRENMLManagers of the files, in the order of
+        file_names, or the merged GRENMLManager if merge is True
+    :raises: SchemaValidationError: A file does not conform to the
+        GRENML schema
+    :raises: FileParseError: A file could not be parsed otherwise
+    """
+    file_names = list(file_names)
+    if workers == 1 or len(file_names) < 2:
+        managers = [_parse_file(file_name, validate_schema) for file_name in file_names]
+    else:
+        parse = partial(_parse_packed, validate_schema=validate_schema)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            packed_topologies = list(executor.map(parse, file_names))
+        managers = []
+        for packed in packed_topologies:
+            manager = GRENMLManager()
+            _unpack_topology(manager.topology, packed)
+            managers.append(manager)
+    if not merge:
+        return managers
+    if not managers:
+        return GRENMLManager()
+    return managers[0].merge(*managers[1:], on_conflict=on_conflict)
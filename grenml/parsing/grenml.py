@@ -38,15 +38,13 @@ class GRENMLHandler(xml.sax.ContentHandler, ElementHandler):
     def __init__(self):
         self.handler = self
         self.manager = GRENMLManager()
+        self.child_handlers = {}
         self.character_cache = ''
         super().__init__()
 
     def startElement(self, name, attrs):
         try:
-            self.handler = self.handler.getHandler(name)(
-                self.handler,
-                self.handler.manager
-            )
+            self.handler = self.handler.getChildHandler(name)
             self.character_cache = ''
             self.handler.startElement(name, attrs)
         except GRENMLException as err:
@@ -29,14 +29,29 @@ from grenml import GRENMLManager
 class ElementHandler:
     """
     Base element handler that allows for automatic traversal of the dom
+
+    The handlers of the child elements are the ElementHandler classes
+    defined in the body of the handler class. They are collected into a
+    table by element name once, when the class is defined.
     """
 
     # Name of the element
     element_name = None
 
+    # Handler classes of the child elements, by element name
+    handlers = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.handlers = {}
+        for value in cls.__dict__.values():
+            if inspect.isclass(value) and issubclass(value, ElementHandler):
+                cls.handlers.setdefault(value.element_name, value)
+
     def __init__(self, parent, manager: GRENMLManager):
         self.parent_handler = parent
         self.manager = manager
+        self.child_handlers = {}
 
     def startElement(self, name, attrs):
         """
@@ -58,11 +73,25 @@ class ElementHandler:
         pass
 
     def getHandler(self, name):
-        for i in self.__class__.__dict__.values():
-            if inspect.isclass(i) and issubclass(i, ElementHandler):
-                if i.element_name == name:
-                    return i
-        raise UnexpectedElementException(self.element_name, name)
+        try:
+            return self.handlers[name]
+        except KeyError:
+            raise UnexpectedElementException(self.element_name, name) from None
+
+    def getChildHandler(self, name):
+        """
+        Returns a handler for a child element. Only one child element is
+        handled at a time, so the handler of the previous child with the
+        same name is reused rather than making a new one; startElement
+        sets up its state for the new element.
+        """
+        handler = self.child_handlers.get(name)
+        if handler is None:
+            handler = self.getHandler(name)(self, self.manager)
+            self.child_handlers[name] = handler
+        else:
+            handler.manager = self.manager
+        return handler
 
     def getRequiredAttribute(self, attrs, name):
         """
@@ -81,22 +110,10 @@ class RecursiveElementHandler(ElementHandler):
     to handle instances of itself
     """
 
-    def getHandler(self, name):
-        try:
-            return super().getHandler(name)
-        except UnexpectedElementException:
-            if name == self.element_name:
-                return self.__class__
-            else:
-                raise UnexpectedElementException(self.element_name, name)
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.handlers.setdefault(cls.element_name, cls)
 
 
 class NMLElementHandler(RecursiveElementHandler):
-    def getHandler(self, name):
-        try:
-            return super().getHandler(name)
-        except UnexpectedElementException:
-            if name == self.element_name:
-                return self.__class__
-            else:
-                raise UnexpectedElementException(self.element_name, name)
+    pass
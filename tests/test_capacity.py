@@ -0,0 +1,124 @@
+import random
+import pytest
+from grenml import managers
+from grenml.exceptions import NodeNotFoundError
+from grenml.models import Institution, Node, Link
+
+pytest.importorskip('numpy')
+capacity = pytest.importorskip('grenml.capacity')
+CapacityAnalysis = capacity.CapacityAnalysis
+
+# S reaches T over two paths, S-A-T and S-B-T, with a cross link A-B
+LINKS = {
+    'SA': ('S', 'A', '10'), 'SB': ('S', 'B', '5 Gbps'), 'AB': ('A', 'B', '15G'),
+    'AT': ('A', 'T', '4000 Mbps'), 'BT': ('B', 'T', 8),
+}
+
+
+class TestCapacity:
+
+    @pytest.fixture
+    def manager(self):
+        manager = managers.GRENMLManager('TEST_TOPOLOGY')
+        manager.add_institution(Institution('NREN_1', 'NREN 1'))
+        manager.add_institution(Institution('NREN_2', 'NREN 2'))
+        for node_id in 'SABT':
+            manager.add_node(Node(node_id, latitude=0, longitude=0))
+        manager.add_node(Node('ISOLATED', latitude=0, longitude=0))
+        for link_id, (start, end, throughput) in LINKS.items():
+            manager.add_link(Link(link_id, nodes=[start, end], throughput=throughput))
+        manager.add_link(Link('NO_THROUGHPUT', nodes=['S', 'T']))
+        for node_id in 'SA':
+            manager.add_owner_to_node('NREN_1', node_id)
+        manager.add_owner_to_node('NREN_2', 'T')
+        for link_id in ('SA', 'AB'):
+            manager.add_owner_to_link('NREN_1', link_id)
+        for link_id in ('AB', 'BT'):
+            manager.add_owner_to_link('NREN_2', link_id)
+        return manager
+
+    @pytest.fixture
+    def analysis(self, manager):
+        return CapacityAnalysis(manager.topology)
+
+    @pytest.mark.parametrize('value, expected', [
+        ('10', 10.0), (10, 10.0), (2.5, 2.5), ('100Gbps', 100.0), ('100 Gb/s', 100.0),
+        ('400 Mbps', 0.4), ('1.2T', 1200.0), ('2x100G', 200.0), ('1.0', 1.0),
+        (['40G', '10G'], 40.0), (None, None), ('', None), ([], None),
+    ])
+    def test_parse_throughput(self, value, expected):
+        assert capacity.parse_throughput(value) == pytest.approx(expected)
+
+    @pytest.mark.parametrize('value', ['fast', '10 apples', '1..2G'])
+    def test_parse_invalid_throughput(self, value):
+        with pytest.raises(ValueError):
+            capacity.parse_throughput(value)
+
+    def test_capacities(self, analysis):
+        capacities = dict(zip(analysis.graph.link_ids, analysis.capacities))
+        assert capacities == {
+            'SA': 10, 'SB': 5, 'AB': 15, 'AT': 4, 'BT': 8, 'NO_THROUGHPUT': 0,
+        }
+
+    def test_max_flow(self, analysis):
+        # A can pass 4 to T directly and 6 on through B, which has 8
+        assert analysis.max_flow('S', 'T') == pytest.approx(12)
+        assert analysis.max_flow('T', 'S') == pytest.approx(12)
+        # Directly, and through S and through T
+        assert analysis.max_flow('A', 'B') == pytest.approx(15 + 5 + 4)
+        assert analysis.max_flow('S', 'ISOLATED') == 0
+
+    def test_min_cut(self, analysis):
+        value, links = analysis.min_cut('S', 'T')
+        assert value == pytest.approx(12)
+        assert links == {'AT', 'BT'}
+
+    def test_repeated_queries_reuse_the_graph(self, analysis):
+        graph = analysis.graph
+        for _ in range(3):
+            assert analysis.max_flow('S', 'T') == pytest.approx(12)
+        assert analysis.graph is graph
+
+    def test_flow_errors(self, analysis):
+        with pytest.raises(NodeNotFoundError):
+            analysis.max_flow('S', 'NOT_A_NODE')
+        with pytest.raises(ValueError):
+            analysis.max_flow('S', 'S')
+
+    def test_institution_flow(self, analysis):
+        # NREN_1 owns S and A, NREN_2 owns T
+        assert analysis.institution_max_flow('NREN_1', 'NREN_2') == pytest.approx(12)
+        value, links = analysis.institution_min_cut('NREN_1', 'NREN_2')
+        assert value == pytest.approx(12)
+        assert links == {'AT', 'BT'}
+        assert analysis.institution_max_flow('NREN_1', 'NOT_AN_OWNER') == 0
+
+    def test_institution_capacity(self, analysis):
+        assert analysis.institution_capacity() == {'NREN_1': 25, 'NREN_2': 23}
+
+    def test_invalid_throughput(self, manager):
+        manager.get_link(id='SA').additional_properties['throughput'] = ['fast']
+        with pytest.raises(ValueError):
+            CapacityAnalysis(manager.topology)
+
+    def test_max_flow_matches_min_cut(self):
+        rng = random.Random(5)
+        for _ in range(10):
+            manager = managers.GRENMLManager('RANDOM')
+            for i in range(15):
+                manager.add_node(Node(f'N{i}', latitude=0, longitude=0))
+            for i in range(30):
+                start, end = rng.sample(range(15), 2)
+                manager.add_link(Link(
+                    f'L{i}', nodes=[f'N{start}', f'N{end}'], throughput=rng.randint(1, 10),
+                ))
+            analysis = CapacityAnalysis(manager.topology)
+            capacities = dict(zip(analysis.graph.link_ids, analysis.capacities))
+            flow = analysis.max_flow('N0', 'N1')
+            value, links = analysis.min_cut('N0', 'N1')
+            assert value == pytest.approx(flow)
+            assert sum(capacities[link] for link in links) == pytest.approx(flow)
+            # Cutting the links disconnects the nodes
+            for link in links:
+                manager.delete_links(id=link)
+            assert CapacityAnalysis(manager.topology).max_flow('N0', 'N1') == 0
@@ -0,0 +1,119 @@
+import pytest
+import grenml
+from grenml import managers
+from grenml.models import Institution, Node, Link, Topology, INSTITUTIONS, NODES, LINKS, TOPOLOGIES
+
+INSTITUTION_TEST_ID = 'TEST_ID'
+NODE_TEST_ID = 'TEST_NODE_ID'
+NODE_TEST_ID_2 = 'TEST_NODE_ID_2'
+LINK_TEST_ID = 'TEST_LINK_ID'
+SUB_TOPOLOGY_ID = 'SUB_TOPOLOGY_ID'
+
+
+def build_manager():
+    manager = managers.GRENMLManager('TEST_TOPOLOGY', id='TEST_TOPOLOGY_ID')
+    manager.add_institution(Institution(INSTITUTION_TEST_ID, 'Test Institution'), primary_owner=True)
+    manager.add_node(Node(NODE_TEST_ID, 'Node 1', latitude=45.4, longitude=-75.7))
+    manager.add_node(Node(NODE_TEST_ID_2, 'Node 2', latitude=45.5, longitude=-73.6))
+    manager.add_link(Link(LINK_TEST_ID, 'Link', nodes=[NODE_TEST_ID, NODE_TEST_ID_2]))
+    sub_topology = Topology(id=SUB_TOPOLOGY_ID, name='Sub Topology')
+    sub_topology.add_node(Node('SUB_NODE_ID', 'Sub Node', latitude=0, longitude=0))
+    manager.topology.add_topology(sub_topology)
+    return manager
+
+
+class TestDiff:
+
+    @pytest.fixture
+    def old(self):
+        return build_manager()
+
+    @pytest.fixture
+    def new(self):
+        return build_manager()
+
+    def test_no_differences(self, old, new):
+        difference = grenml.diff(old, new)
+        assert not difference
+        assert difference.changes == {}
+        for ele_type in (INSTITUTIONS, NODES, LINKS, TOPOLOGIES):
+            assert difference.added[ele_type] == {}
+            assert difference.removed[ele_type] == {}
+        assert difference.topologies == {}
+
+    def test_added_and_removed(self, old, new):
+        new.add_node(Node('NEW_NODE_ID', 'New Node', latitude=0, longitude=0))
+        new.delete_links(id=LINK_TEST_ID)
+        difference = grenml.diff(old, new)
+        assert difference
+        assert set(difference.added[NODES]) == {'NEW_NODE_ID'}
+        assert difference.added[NODES]['NEW_NODE_ID'] is new.get_node(id='NEW_NODE_ID')
+        assert set(difference.removed[LINKS]) == {LINK_TEST_ID}
+        assert difference.modified[NODES] == {}
+
+    def test_field_level_changes(self, old, new):
+        node = new.get_node(id=NODE_TEST_ID)
+        node.name = 'Renamed'
+        node.latitude = 46
+        node.add_property('tag', 'core')
+        new.add_institution(Institution('OTHER_ID', 'Other'))
+        new.add_owner_to_link('OTHER_ID', LINK_TEST_ID)
+        difference = grenml.diff(old, new)
+        assert set(difference.modified[NODES]) == {NODE_TEST_ID}
+        changes = difference.modified[NODES][NODE_TEST_ID]
+        assert changes['name'] == ('Node 1', 'Renamed')
+        assert changes['latitude'] == (45.4, 46)
+        assert set(changes) == {'name', 'latitude', 'additional_properties'}
+        assert difference.modified[LINKS][LINK_TEST_ID] == {
+            'owners': ((INSTITUTION_TEST_ID,), ('OTHER_ID', INSTITUTION_TEST_ID)),
+        }
+
+    def test_deprecated_institution_type_changes(self, old, new):
+        old.topology.fingerprint()
+        before = new.topology.fingerprint()
+        with pytest.warns(DeprecationWarning):
+            new.get_institution(id=INSTITUTION_TEST_ID).type = 'ren'
+        assert new.topology.fingerprint() != before
+        difference = grenml.diff(old, new)
+        assert set(difference.modified[INSTITUTIONS]) == {INSTITUTION_TEST_ID}
+        assert difference.modified[INSTITUTIONS][INSTITUTION_TEST_ID]['type'] == (None, 'ren')
+
+    def test_topology_changes(self, old, new):
+        new.topology.name = 'Renamed Topology'
+        assert grenml.diff(old, new).changes == {
+            'name': ('TEST_TOPOLOGY', 'Renamed Topology'),
+        }
+
+    def test_sub_topology_changes(self, old, new):
+        sub_topology = new.topology.get_element(TOPOLOGIES, id=SUB_TOPOLOGY_ID)
+        sub_topology.get_element(NODES, id='SUB_NODE_ID').name = 'Renamed'
+        difference = grenml.diff(old, new)
+        assert set(difference.topologies) == {SUB_TOPOLOGY_ID}
+        sub_difference = difference.topologies[SUB_TOPOLOGY_ID]
+        assert sub_difference.changes == {}
+        assert sub_difference.modified[NODES] == {'SUB_NODE_ID': {'name': ('Sub Node', 'Renamed')}}
+        assert difference.modified[NODES] == {}
+
+    def test_unchanged_elements_are_not_compared(self, old, new, monkeypatch):
+        new.get_node(id=NODE_TEST_ID).name = 'Renamed'
+        # Fingerprints are cached once computed
+        old.topology.fingerprint()
+        new.topology.fingerprint()
+        compared = []
+        original = Node._field_values
+
+        def counted_field_values(node, fields=None):
+            compared.append(node.id)
+            return original(node, fields)
+
+        monkeypatch.setattr(Node, '_field_values', counted_field_values)
+        grenml.diff(old, new)
+        # Only the node that changed has its fields compared, to list
+        # the changes; the rest are skipped on their cached fingerprints
+        assert set(compared) == {NODE_TEST_ID}
+
+    def test_diff_of_topologies(self, old, new):
+        new.get_node(id=NODE_TEST_ID).name = 'Renamed'
+        difference = grenml.diff(old.topology, new.topology)
+        assert set(difference.modified[NODES]) == {NODE_TEST_ID}
+        assert 'nodes: +0 -0 ~1' in repr(difference)
@@ -0,0 +1,165 @@
+import pytest
+from grenml import managers
+from grenml.models import Institution, Node, Link, GLOBAL_INSTITUTION_ID
+
+np = pytest.importorskip('numpy')
+frame_module = pytest.importorskip('grenml.frame')
+
+INSTITUTION_TEST_ID = 'TEST_ID'
+NODE_TEST_ID = 'TEST_NODE_ID'
+NODE_TEST_ID_2 = 'TEST_NODE_ID_2'
+NODE_TEST_ID_3 = 'TEST_NODE_ID_3'
+LINK_TEST_ID = 'TEST_LINK_ID'
+LINK_TEST_ID_2 = 'TEST_LINK_ID_2'
+
+
+class TestTopologyFrame:
+
+    @pytest.fixture
+    def manager(self):
+        manager = managers.GRENMLManager('TEST_TOPOLOGY', id='TEST_TOPOLOGY_ID')
+        manager.add_institution(Institution(
+            INSTITUTION_TEST_ID, 'Test Institution', 'TI', longitude=-75.7, latitude=45.4,
+            address='1 Street', tag='nren',
+        ), primary_owner=True)
+        manager.add_node(Node(
+            NODE_TEST_ID, 'Ottawa', longitude=-75.7, latitude=45.4, altitude=70,
+            lifetime_start='2020-01-01T00:00:00+00:00', unlocode='CAOTT',
+        ))
+        manager.add_node(Node(NODE_TEST_ID_2, 'Montreal', longitude=-73.6, latitude=45.5))
+        manager.add_node(Node(NODE_TEST_ID_3, 'Nowhere', longitude=None, latitude=None))
+        manager.add_link(Link(
+            LINK_TEST_ID, 'Ottawa-Montreal', nodes=[NODE_TEST_ID, NODE_TEST_ID_2],
+            throughput='100Gbps',
+        ))
+        manager.add_link(Link(LINK_TEST_ID_2, 'Dangling', nodes=[NODE_TEST_ID_3]))
+        return manager
+
+    def test_columns(self, manager):
+        frame = manager.topology.to_frame()
+        nodes = frame.nodes
+        assert len(nodes) == 3
+        assert list(nodes.decode('ids')) == [NODE_TEST_ID, NODE_TEST_ID_2, NODE_TEST_ID_3]
+        assert list(nodes.decode('names')) == ['Ottawa', 'Montreal', 'Nowhere']
+        assert nodes.ids.dtype == np.int32
+        assert nodes.latitudes.dtype == np.float64
+        assert nodes.latitudes[0] == 45.4
+        assert np.isnan(nodes.latitudes[2])
+        assert nodes.altitudes[0] == 70
+        assert nodes.decode('unlocodes')[0] == 'CAOTT'
+        assert nodes.decode('short_names')[0] is None
+
+    def test_strings_are_stored_once(self, manager):
+        frame = manager.topology.to_frame()
+        institution_row = frame.institutions.row(INSTITUTION_TEST_ID)
+        # The owner of the nodes refers to the same string as the id
+        assert frame.institutions.ids[institution_row] == frame.strings.lookup(INSTITUTION_TEST_ID)
+        assert len(frame.strings) < sum(
+            len(table) * 4 for table in (frame.institutions, frame.nodes, frame.links)
+        )
+
+    def test_references(self, manager):
+        frame = manager.topology.to_frame()
+        institution_row = frame.institutions.row(INSTITUTION_TEST_ID)
+        for row in range(len(frame.nodes)):
+            assert list(frame.nodes.owner_rows(row)) == [institution_row]
+        link_row = frame.links.row(LINK_TEST_ID)
+        assert sorted(frame.links.endpoints[link_row]) == [
+            frame.nodes.row(NODE_TEST_ID), frame.nodes.row(NODE_TEST_ID_2)
+        ]
+        dangling_row = frame.links.row(LINK_TEST_ID_2)
+        assert frame_module.MISSING in frame.links.endpoints[dangling_row]
+
+    def test_unresolved_references(self, manager):
+        manager.add_node(Node('ORPHAN_ID', 'Orphan', longitude=0, latitude=0, owners=['GONE_ID']))
+        manager.add_link(Link('HALF_ID', 'Half', nodes=[NODE_TEST_ID, 'GONE_NODE_ID']))
+        frame = manager.topology.to_frame()
+        orphan_row = frame.nodes.row('ORPHAN_ID')
+        assert frame.nodes.unresolved_owners.tolist() == [[orphan_row, frame.strings.lookup('GONE_ID')]]
+        half_row = frame.links.row('HALF_ID')
+        assert frame.links.unresolved_nodes.tolist() == [[half_row, frame.strings.lookup('GONE_NODE_ID')]]
+        assert frame.links.endpoints[half_row].tolist() == [frame_module.MISSING, frame.nodes.row(NODE_TEST_ID)]
+        copy = managers.GRENMLManager.from_frame(frame)
+        assert copy.get_node(id='ORPHAN_ID')._owners == {'GONE_ID', INSTITUTION_TEST_ID}
+        assert copy.get_link(id='HALF_ID')._nodes == {NODE_TEST_ID, 'GONE_NODE_ID'}
+        assert copy.topology.fingerprint() == manager.topology.fingerprint()
+
+    def test_row_of_missing_element(self, manager):
+        frame = manager.topology.to_frame()
+        with pytest.raises(KeyError):
+            frame.nodes.row('NOT_A_NODE')
+
+    def test_frame_is_a_copy(self, manager):
+        frame = manager.topology.to_frame()
+        manager.get_link(id=LINK_TEST_ID).additional_properties['throughput'].append('1Gbps')
+        manager.get_node(id=NODE_TEST_ID).latitude = 0
+        row = frame.links.row(LINK_TEST_ID)
+        assert frame.links.properties[row]['throughput'] == ['100Gbps']
+        assert frame.nodes.latitudes[frame.nodes.row(NODE_TEST_ID)] == 45.4
+
+    def test_nodes_in_bbox(self, manager):
+        frame = manager.topology.to_frame()
+        rows = frame.nodes_in_bbox(45, -76, 46, -75)
+        assert list(frame.nodes.decode('ids')[rows]) == [NODE_TEST_ID]
+        # A box whose west edge is east of its east edge crosses the antimeridian
+        rows = frame.nodes_in_bbox(45, 170, 46, -73)
+        assert list(frame.nodes.decode('ids')[rows]) == [NODE_TEST_ID, NODE_TEST_ID_2]
+        assert len(frame.nodes_in_bbox(45, 170, 46, -80)) == 0
+
+    def test_link_with_more_than_two_nodes(self, manager):
+        manager.add_link(Link(
+            'TRIANGLE', nodes=[NODE_TEST_ID, NODE_TEST_ID_2, NODE_TEST_ID_3],
+        ))
+        with pytest.raises(ValueError):
+            manager.topology.to_frame()
+
+    def test_round_trip(self, manager):
+        frame = manager.topology.to_frame()
+        copy = managers.GRENMLManager.from_frame(frame)
+        assert copy.topology.id == 'TEST_TOPOLOGY_ID'
+        assert copy.topology.primary_owner == INSTITUTION_TEST_ID
+        assert copy.topology == manager.topology
+        assert copy.topology.fingerprint() == manager.topology.fingerprint()
+        assert copy.get_institution(id=GLOBAL_INSTITUTION_ID)
+        assert copy.get_institution(id=INSTITUTION_TEST_ID).types == ['nren']
+
+    def test_frame_link_lengths(self, manager):
+        frame = manager.topology.to_frame()
+        lengths = frame.link_lengths()
+        assert lengths.shape == (2,)
+        # Ottawa to Montreal is about 165km
+        assert lengths[frame.links.row(LINK_TEST_ID)] == pytest.approx(165, abs=1)
+        assert np.isnan(lengths[frame.links.row(LINK_TEST_ID_2)])
+
+    def test_haversine_km(self):
+        lengths = frame_module.haversine_km(
+            np.array([0.0, 0.0, 90.0]), np.array([0.0, 0.0, 0.0]),
+            np.array([0.0, 0.0, -90.0]), np.array([0.0, 180.0, 0.0]),
+        )
+        half_circumference = np.pi * 6371.0088
+        assert lengths == pytest.approx([0, half_circumference, half_circumference])
+
+    def test_topology_link_lengths(self, manager):
+        lengths = manager.topology.link_lengths()
+        assert set(lengths) == {LINK_TEST_ID, LINK_TEST_ID_2}
+        assert lengths[LINK_TEST_ID] == pytest.approx(165, abs=1)
+        assert np.isnan(lengths[LINK_TEST_ID_2])
+        frame = manager.topology.to_frame()
+        assert lengths[LINK_TEST_ID] == frame.link_lengths()[frame.links.row(LINK_TEST_ID)]
+
+    def test_topology_link_lengths_follow_changes(self, manager):
+        assert manager.topology.link_lengths()[LINK_TEST_ID] == pytest.approx(165, abs=1)
+        montreal = manager.get_node(id=NODE_TEST_ID_2)
+        montreal.latitude, montreal.longitude = 45.4, -75.7
+        assert manager.topology.link_lengths()[LINK_TEST_ID] == pytest.approx(0)
+        nowhere = manager.get_node(id=NODE_TEST_ID_3)
+        nowhere.latitude, nowhere.longitude = 45.4, -73.6
+        manager.get_link(id=LINK_TEST_ID_2).nodes = [NODE_TEST_ID, NODE_TEST_ID_3]
+        assert manager.topology.link_lengths()[LINK_TEST_ID_2] == pytest.approx(164, abs=1)
+        manager.delete_links(id=LINK_TEST_ID)
+        manager.add_link(Link('NEW_LINK', nodes=[NODE_TEST_ID_2, NODE_TEST_ID_3]))
+        assert set(manager.topology.link_lengths()) == {LINK_TEST_ID_2, 'NEW_LINK'}
+
+    def test_topology_link_lengths_are_a_copy(self, manager):
+        manager.topology.link_lengths()[LINK_TEST_ID] = 0
+        assert manager.topology.link_lengths()[LINK_TEST_ID] == pytest.approx(165, abs=1)
@@ -0,0 +1,154 @@
+import random
+import pytest
+from grenml import managers
+from grenml.exceptions import NodeNotFoundError
+from grenml.models import Node, Link
+
+np = pytest.importorskip('numpy')
+graph_module = pytest.importorskip('grenml.graph')
+Graph = graph_module.Graph
+
+# Two triangles joined by a bridge from C to D, a node hanging off F,
+# and an isolated node:
+#   A - B       E
+#    \ /       / \
+#     C ----- D - F - G       H
+LOCATIONS = {
+    'A': (45.0, -76.0), 'B': (45.0, -75.0), 'C': (44.0, -75.5),
+    'D': (44.0, -70.0), 'E': (45.0, -69.5), 'F': (44.0, -69.0),
+    'G': (44.0, -68.0), 'H': (0.0, 0.0),
+}
+LINKS = {
+    'AB': ('A', 'B', 10), 'AC': ('A', 'C', 10), 'BC': ('B', 'C', 10),
+    'CD': ('C', 'D', 100), 'DE': ('D', 'E', 10), 'DF': ('D', 'F', 10),
+    'EF': ('E', 'F', 10), 'FG': ('F', 'G', 1),
+}
+
+
+class TestGraph:
+
+    @pytest.fixture
+    def manager(self):
+        manager = managers.GRENMLManager('TEST_TOPOLOGY')
+        for node_id, (latitude, longitude) in LOCATIONS.items():
+            manager.add_node(Node(node_id, latitude=latitude, longitude=longitude))
+        for link_id, (start, end, cost) in LINKS.items():
+            manager.add_link(Link(link_id, nodes=[start, end], cost=cost))
+        # Links that don't connect two nodes of the topology are left out
+        manager.add_link(Link('DANGLING', nodes=['A', 'NOT_A_NODE']))
+        return manager
+
+    @pytest.fixture
+    def graph(self, manager):
+        return Graph(manager.topology)
+
+    def test_csr_structure(self, graph):
+        assert list(graph.node_ids) == sorted(LOCATIONS)
+        assert list(graph.link_ids) == sorted(LINKS)
+        assert graph.indptr[-1] == 2 * len(LINKS)
+        neighbours = graph.neighbours(graph.row('D'))
+        assert sorted(graph.node_ids[neighbours]) == ['C', 'E', 'F']
+        for entry in range(graph.indptr[-1]):
+            start, end = graph.endpoints[graph.edge_links[entry]]
+            assert graph.indices[entry] in (start, end)
+
+    def test_degrees(self, graph):
+        degrees = dict(zip(graph.node_ids, graph.degrees()))
+        assert degrees == {'A': 2, 'B': 2, 'C': 3, 'D': 3, 'E': 2, 'F': 3, 'G': 1, 'H': 0}
+        statistics = graph.degree_statistics()
+        assert statistics['min'] == 0
+        assert statistics['max'] == 3
+        assert statistics['mean'] == pytest.approx(2 * len(LINKS) / len(LOCATIONS))
+        assert statistics['isolated'] == 1
+
+    def test_connected_components(self, graph):
+        assert graph.connected_components() == [set('ABCDEFG'), {'H'}]
+        labels = graph.component_labels()
+        assert labels[graph.row('A')] == labels[graph.row('G')] != labels[graph.row('H')]
+
+    def test_hops_from(self, graph):
+        hops = graph.hops_from('A')
+        assert hops == {'A': 0, 'B': 1, 'C': 1, 'D': 2, 'E': 3, 'F': 3, 'G': 4}
+
+    def test_shortest_path_by_property(self, graph):
+        distance, nodes, links = graph.shortest_path('A', 'G', weight='cost')
+        assert distance == 10 + 100 + 10 + 1
+        assert nodes == ['A', 'C', 'D', 'F', 'G']
+        assert links == ['AC', 'CD', 'DF', 'FG']
+
+    def test_shortest_path_by_length(self, graph):
+        distance, nodes, _ = graph.shortest_path('B', 'E')
+        assert nodes == ['B', 'C', 'D', 'E']
+        assert distance == pytest.approx(sum(
+            graph.weights(graph_module.LENGTH)[list(graph.link_ids).index(link)]
+            for link in ('BC', 'CD', 'DE')
+        ))
+
+    def test_shortest_path_without_weights(self, graph):
+        distance, nodes, _ = graph.shortest_path('G', 'A', weight=None)
+        assert distance == 4
+        assert nodes[0] == 'G' and nodes[-1] == 'A'
+
+    def test_no_path(self, graph):
+        assert graph.shortest_path('A', 'H') is None
+        assert graph.distances_from('H') == {'H': 0}
+
+    def test_unknown_node(self, graph):
+        with pytest.raises(NodeNotFoundError):
+            graph.shortest_path('A', 'NOT_A_NODE')
+
+    def test_links_without_a_weight_are_not_used(self, manager):
+        del manager.get_link(id='CD').additional_properties['cost']
+        assert Graph(manager.topology).shortest_path('A', 'G', weight='cost') is None
+
+    def test_invalid_weight(self, manager):
+        manager.get_link(id='CD').additional_properties['cost'] = ['fast']
+        with pytest.raises(ValueError):
+            Graph(manager.topology).weights('cost')
+
+    def test_articulation_points(self, graph):
+        assert graph.articulation_points() == {'C', 'D', 'F'}
+
+    def test_articulation_points_match_removal(self):
+        rng = random.Random(3)
+        for _ in range(10):
+            manager = managers.GRENMLManager('RANDOM')
+            for i in range(30):
+                manager.add_node(Node(f'N{i}', latitude=0, longitude=0))
+            for i in range(35):
+                start, end = rng.sample(range(30), 2)
+                manager.add_link(Link(f'L{i}', nodes=[f'N{start}', f'N{end}']))
+            graph = Graph(manager.topology)
+            expected = set()
+            components = len(graph.connected_components())
+            for node in list(manager.topology.nodes):
+                links = manager.topology.links_of(node.id)
+                manager.topology.delete_elements('nodes', [node])
+                manager.topology.delete_elements('links', list(links))
+                # Removing an articulation point leaves more components
+                # besides the node itself, which is no longer counted
+                if len(Graph(manager.topology).connected_components()) > components - (
+                    1 if graph.degrees()[graph.row(node.id)] == 0 else 0
+                ):
+                    expected.add(node.id)
+                manager.topology.add_node(node)
+                for link in links:
+                    manager.topology.add_link(link)
+            assert graph.articulation_points() == expected
+
+    def test_long_chain(self):
+        manager = managers.GRENMLManager('CHAIN')
+        for i in range(5000):
+            manager.add_node(Node(f'N{i}', latitude=0, longitude=0))
+        for i in range(4999):
+            manager.add_link(Link(f'L{i}', nodes=[f'N{i}', f'N{i + 1}']))
+        graph = Graph(manager.topology)
+        assert len(graph.articulation_points()) == 4998
+        assert graph.hops_from('N0')['N4999'] == 4999
+
+    def test_empty_topology(self):
+        graph = Graph(managers.GRENMLManager('EMPTY').topology)
+        assert len(graph) == 0
+        assert graph.connected_components() == []
+        assert graph.degree_statistics()['max'] is None
+        assert graph.articulation_points() == set()
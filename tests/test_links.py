@@ -322,6 +322,7 @@ class TestLinks:
             We use almost every possible combination which pass the match function of the link.
         """
         assert link.match(**kwargs)
+        assert meta.compile_match(**kwargs)(link)
 
     @pytest.mark.parametrize(
         'kwargs',
@@ -409,6 +410,7 @@ class TestLinks:
             We use almost every possible combination which fail the match function of the link.
         """
         assert not link.match(**kwargs)
+        assert not meta.compile_match(**kwargs)(link)
 
     @pytest.mark.parametrize(
         'kwargs',
@@ -1,7 +1,11 @@
+import random
+from datetime import datetime, timezone
 import pytest
 from grenml import managers
-from grenml.models import Institution, Node, Link, GLOBAL_INSTITUTION_ID
+from grenml.models import Institution, Node, Link, Topology, GLOBAL_INSTITUTION_ID, NODES, LINKS
+from grenml.models import INSTITUTIONS, KEEP_NEWEST, RAISE_ON_CONFLICT
 from grenml.exceptions import *
+from grenml.models.temporal import IntervalIndex
 
 INSTITUTION_SHORT_NAME = 'TEST'
 INSTITUTION_TEST_ID = 'TEST_ID'
@@ -582,6 +586,187 @@ class TestManager:
         manager.remove_owner_from_node(institutions[0].id, node.id)
         assert node.owners != set(institutions)
 
+    def test_manager_owner_changes_update_owned_by(self, manager, institutions):
+        manager.add_institutions(institutions)
+        manager.add_node(NODE_TEST_ID, NODE_TEST_NAME)
+        node = manager.get_node(id=NODE_TEST_ID)
+        manager.add_owner_to_node(INSTITUTION_TEST_ID, NODE_TEST_ID)
+        assert manager.topology.owned_by(INSTITUTION_TEST_ID) == {node}
+        manager.remove_owner_from_node(INSTITUTION_TEST_ID, NODE_TEST_ID)
+        assert manager.topology.owned_by(INSTITUTION_TEST_ID) == set()
+        with pytest.raises(KeyError):
+            manager.remove_owner_from_node(INSTITUTION_TEST_ID, NODE_TEST_ID)
+
+    @pytest.fixture
+    def located_nodes(self, manager):
+        manager.add_node('OTTAWA', 'Ottawa', latitude=45.42, longitude=-75.70)
+        manager.add_node('MONTREAL', 'Montreal', latitude=45.50, longitude=-73.57)
+        manager.add_node('TORONTO', 'Toronto', latitude=43.65, longitude=-79.38)
+        manager.add_node('AUCKLAND', 'Auckland', latitude=-36.85, longitude=174.76)
+        manager.add_node('APIA', 'Apia', latitude=-13.83, longitude=-171.76)
+        manager.add_node('UNLOCATED', 'Unlocated')
+        return manager
+
+    @staticmethod
+    def ids(elements):
+        return {element.id for element in elements}
+
+    def test_manager_get_nodes_in_bbox(self, located_nodes):
+        assert self.ids(located_nodes.get_nodes_in_bbox(45, -76, 46, -73)) == {'OTTAWA', 'MONTREAL'}
+        assert located_nodes.get_nodes_in_bbox(0, 0, 1, 1) == set()
+        # The edges of the box are included
+        assert self.ids(located_nodes.get_nodes_in_bbox(45.42, -75.70, 45.42, -75.70)) == {'OTTAWA'}
+
+    def test_manager_get_nodes_in_bbox_across_antimeridian(self, located_nodes):
+        nodes = located_nodes.get_nodes_in_bbox(-40, 170, -10, -170)
+        assert self.ids(nodes) == {'AUCKLAND', 'APIA'}
+
+    def test_manager_get_nodes_within(self, located_nodes):
+        # Ottawa and Montreal are about 165km apart, Toronto 350km away
+        assert self.ids(located_nodes.get_nodes_within(45.42, -75.70, 100)) == {'OTTAWA'}
+        assert self.ids(located_nodes.get_nodes_within(45.42, -75.70, 200)) == {'OTTAWA', 'MONTREAL'}
+        assert len(located_nodes.get_nodes_within(45.42, -75.70, 400)) == 3
+        # Auckland and Apia are about 2900km apart across the antimeridian
+        assert self.ids(located_nodes.get_nodes_within(-36.85, 174.76, 3000)) == {'AUCKLAND', 'APIA'}
+        # Half the circumference of the Earth covers every located node
+        assert len(located_nodes.get_nodes_within(90, 0, 20100)) == 5
+
+    def test_manager_spatial_index_follows_changes(self, located_nodes):
+        assert self.ids(located_nodes.get_nodes_within(45.42, -75.70, 10)) == {'OTTAWA'}
+        located_nodes.add_node('GATINEAU', 'Gatineau', latitude=45.48, longitude=-75.70)
+        located_nodes.delete_nodes(id='OTTAWA')
+        assert self.ids(located_nodes.get_nodes_within(45.42, -75.70, 10)) == {'GATINEAU'}
+        unlocated = located_nodes.get_node(id='UNLOCATED')
+        unlocated.latitude, unlocated.longitude = 45.43, -75.71
+        toronto = located_nodes.get_node(id='TORONTO')
+        toronto.latitude = 45.41
+        toronto.longitude = -75.69
+        assert self.ids(located_nodes.get_nodes_within(45.42, -75.70, 10)) == {
+            'GATINEAU', 'UNLOCATED', 'TORONTO'
+        }
+        assert located_nodes.get_nodes_in_bbox(43, -80, 44, -79) == set()
+
+    def test_manager_spatial_queries_match_a_scan(self, manager):
+        rng = random.Random(7)
+        for i in range(2000):
+            manager.add_node(
+                f'NODE_{i}', latitude=rng.uniform(-90, 90), longitude=rng.uniform(-180, 180)
+            )
+        nodes = manager.get_nodes()
+        for _ in range(20):
+            south, north = sorted(rng.uniform(-90, 90) for _ in range(2))
+            west, east = sorted(rng.uniform(-180, 180) for _ in range(2))
+            expected = {
+                node for node in nodes
+                if south <= node.latitude <= north and west <= node.longitude <= east
+            }
+            assert manager.get_nodes_in_bbox(south, west, north, east) == expected
+
+    def test_manager_get_institutions_within(self, manager):
+        manager.add_institution('NEAR', 'Near', latitude=45.42, longitude=-75.70)
+        manager.add_institution('FAR', 'Far', latitude=-36.85, longitude=174.76)
+        assert self.ids(manager.get_institutions_within(45.5, -75.7, 50)) == {'NEAR'}
+        assert self.ids(manager.get_institutions_in_bbox(-40, 170, -30, 180)) == {'FAR'}
+
+    def test_manager_spatial_query_of_links(self, manager):
+        with pytest.raises(ValueError):
+            manager.topology.get_elements_within(LINKS, 0, 0, 10)
+
+    @pytest.fixture
+    def timed_links(self, manager):
+        manager.add_node('A', 'A')
+        manager.add_node('B', 'B')
+        manager.add_link('OLD', 'Old', nodes=['A', 'B'],
+                         lifetime_start='2010-01-01T00:00:00+00:00', lifetime_end='2015-01-01T00:00:00+00:00')
+        manager.add_link('CURRENT', 'Current', nodes=['A', 'B'], lifetime_start='2014-01-01T00:00:00+00:00')
+        manager.add_link('FUTURE', 'Future', nodes=['A', 'B'],
+                         lifetime_start='2030-01-01T00:00:00+00:00', lifetime_end='2031-01-01T00:00:00+00:00')
+        manager.add_link('FOREVER', 'Forever', nodes=['A', 'B'])
+        return manager
+
+    def test_manager_get_links_active_at(self, timed_links):
+        assert self.ids(timed_links.get_links(active_at='2012-06-01T00:00:00+00:00')) == {'OLD', 'FOREVER'}
+        assert self.ids(timed_links.get_links(active_at=datetime(2014, 6, 1, tzinfo=timezone.utc))) == {
+            'OLD', 'CURRENT', 'FOREVER'
+        }
+        # The ends of a lifetime are included, and epoch seconds work too
+        end = datetime(2015, 1, 1, tzinfo=timezone.utc)
+        assert 'OLD' in self.ids(timed_links.get_links(active_at=int(end.timestamp())))
+        assert self.ids(timed_links.get_links(active_at='2000-01-01T00:00:00+00:00')) == {'FOREVER'}
+        assert timed_links.get_link(active_at='2030-06-01T00:00:00+00:00', name='Future').id == 'FUTURE'
+
+    def test_manager_get_links_active_between(self, timed_links):
+        assert self.ids(timed_links.get_links(
+            active_between=('2016-01-01T00:00:00+00:00', '2030-01-01T00:00:00+00:00'),
+        )) == {'CURRENT', 'FUTURE', 'FOREVER'}
+        assert self.ids(timed_links.get_links(active_between=(None, '2011-01-01T00:00:00+00:00'))) == {
+            'OLD', 'FOREVER'
+        }
+        with pytest.raises(ValueError):
+            timed_links.get_links(active_between=('2020-01-01', '2019-01-01'))
+        with pytest.raises(ValueError):
+            timed_links.get_institutions(active_at='2020-01-01')
+
+    def test_manager_interval_index_follows_changes(self, timed_links):
+        assert self.ids(timed_links.get_links(active_at='2020-01-01T00:00:00+00:00')) == {'CURRENT', 'FOREVER'}
+        timed_links.get_link(id='CURRENT').lifetime_end = '2019-01-01T00:00:00+00:00'
+        timed_links.delete_links(id='FOREVER')
+        timed_links.add_link('NEW', 'New', nodes=['A', 'B'], lifetime_start='2019-06-01T00:00:00+00:00')
+        assert self.ids(timed_links.get_links(active_at='2020-01-01T00:00:00+00:00')) == {'NEW'}
+
+    def test_manager_inverted_lifetime_is_never_active(self, timed_links):
+        timed_links.add_link('INVERTED', 'Inverted', nodes=['A', 'B'],
+                             lifetime_start='2013-01-01T00:00:00+00:00', lifetime_end='2012-01-01T00:00:00+00:00')
+        assert self.ids(timed_links.get_links(active_at='2012-06-01T00:00:00+00:00')) == {'OLD', 'FOREVER'}
+        assert 'INVERTED' not in self.ids(timed_links.get_links(active_between=(None, None)))
+
+    def test_manager_temporal_queries_match_a_scan(self, manager):
+        rng = random.Random(11)
+        for i in range(1000):
+            start = rng.choice((None, rng.randrange(0, 10 ** 6)))
+            end = rng.choice((None, rng.randrange(start or 0, 10 ** 6)))
+            manager.add_node(f'NODE_{i}', lifetime_start=start, lifetime_end=end)
+        nodes = manager.get_nodes()
+
+        def overlaps(node, start, end):
+            node_start = node.lifetime_start_epoch
+            node_end = node.lifetime_end_epoch
+            return (node_start is None or node_start <= end) and (node_end is None or node_end >= start)
+
+        for _ in range(20):
+            start, end = sorted(rng.randrange(0, 10 ** 6) for _ in range(2))
+            expected = {node for node in nodes if overlaps(node, start, end)}
+            assert manager.get_nodes(active_between=(start, end)) == (expected or None)
+            expected = {node for node in nodes if overlaps(node, start, start)}
+            assert manager.get_nodes(active_at=start) == (expected or None)
+
+    def test_manager_temporal_queries_follow_changes(self, manager, monkeypatch):
+        rng = random.Random(12)
+        for i in range(1000):
+            manager.add_node(f'NODE_{i}', lifetime_start=rng.randrange(0, 10 ** 6))
+        manager.get_nodes(active_at=0)
+        builds = []
+        build = IntervalIndex._build
+        monkeypatch.setattr(IntervalIndex, '_build', lambda index: builds.append(1) or build(index))
+
+        def active(node, time):
+            return (node.lifetime_start_epoch is None or node.lifetime_start_epoch <= time) and \
+                (node.lifetime_end_epoch is None or node.lifetime_end_epoch >= time)
+
+        for i in range(200):
+            node = manager.get_node(id=f'NODE_{rng.randrange(1000)}')
+            if i % 3 == 0:
+                node.lifetime_end = rng.randrange(0, 10 ** 6)
+            elif i % 3 == 1:
+                manager.delete_nodes(id=node.id)
+                manager.add_node(node.id, lifetime_start=rng.randrange(0, 10 ** 6))
+            else:
+                node.lifetime_start = None
+            time = rng.randrange(0, 10 ** 6)
+            expected = {node for node in manager.get_nodes() if active(node, time)}
+            assert manager.get_nodes(active_at=time) == (expected or None)
+        assert 0 < len(builds) < 10
+
     def test_manager_delete_node(self, manager, institutions, node):
         manager.add_institutions(institutions)
         manager.add_node(node)
@@ -1011,3 +1196,240 @@ class TestManager:
         manager.add_nodes(nodes)
         manager.add_links(links)
         manager.validate()
+
+    @staticmethod
+    def network(name, node_name='Node', version=None):
+        manager = managers.GRENMLManager(name)
+        manager.add_institution(Institution('INST_ID', 'Institution'), primary_owner=True)
+        manager.add_node(Node('NODE_1', node_name, latitude=1, longitude=1, version=version))
+        manager.add_node(Node('NODE_2', 'Node 2', latitude=2, longitude=2))
+        manager.add_link(Link('LINK_ID', 'Link', nodes=['NODE_1', 'NODE_2']))
+        return manager
+
+    def test_manager_merge(self):
+        merged = managers.GRENMLManager('Merged')
+        other = self.network('Other')
+        other.add_institution(Institution('OTHER_ID', 'Other'))
+        other.add_node(Node('NODE_3', 'Node 3', latitude=3, longitude=3, owners=['OTHER_ID']))
+        assert merged.merge(self.network('First'), other) is merged
+        assert {node.id for node in merged.topology.nodes} == {'NODE_1', 'NODE_2', 'NODE_3'}
+        assert {link.id for link in merged.topology.links} == {'LINK_ID'}
+        # Owners are kept as they are, without the merged primary owner
+        assert merged.get_node(id='NODE_3')._owners == {'OTHER_ID', 'INST_ID'}
+        assert merged.topology.links_of('NODE_1') == {merged.get_link(id='LINK_ID')}
+        merged.set_primary_owner('INST_ID')
+        merged.validate()
+
+    def test_manager_merge_copies_elements(self):
+        source = self.network('Source')
+        source.get_node(id='NODE_1').add_property('tag', 'core')
+        merged = managers.GRENMLManager('Merged').merge(source)
+        node = merged.get_node(id='NODE_1')
+        assert node is not source.get_node(id='NODE_1')
+        node.add_property('tag', 'edge')
+        node.name = 'Renamed'
+        assert source.get_node(id='NODE_1').additional_properties == {'tag': ['core']}
+        assert source.get_node(id='NODE_1').name == 'Node'
+
+    def test_manager_merge_rewrites_object_references(self):
+        source = self.network('Source')
+        institution = source.get_institution(id='INST_ID')
+        source.get_link(id='LINK_ID').owners = {institution}
+        merged = managers.GRENMLManager('Merged').merge(source)
+        link = merged.get_link(id='LINK_ID')
+        assert link._owners == {'INST_ID'}
+        assert link._nodes == {'NODE_1', 'NODE_2'}
+        assert link.owners == {merged.get_institution(id='INST_ID')}
+
+    def test_manager_merge_keep_first(self):
+        merged = self.network('First', node_name='First').merge(
+            self.network('Second', node_name='Second', version='2030-01-01T00:00:00'),
+        )
+        assert merged.get_node(id='NODE_1').name == 'First'
+
+    def test_manager_merge_keep_newest(self):
+        merged = self.network('First', node_name='First', version='2021-01-01T00:00:00')
+        merged.merge(
+            self.network('Second', node_name='Second', version='2030-01-01T00:00:00'),
+            self.network('Third', node_name='Third', version='2025-01-01T00:00:00'),
+            on_conflict=KEEP_NEWEST,
+        )
+        node = merged.get_node(id='NODE_1')
+        assert node.name == 'Second'
+        assert merged.topology.links_of('NODE_1') == {merged.get_link(id='LINK_ID')}
+        merged.validate()
+
+    def test_manager_merge_raise(self):
+        merged = self.network('First', node_name='First')
+        # Identical elements are not conflicts
+        merged.merge(self.network('Copy', node_name='First'), on_conflict=RAISE_ON_CONFLICT)
+        second = self.network('Second', node_name='Second')
+        second.add_node(Node('NODE_3', 'Node 3'))
+        with pytest.raises(MergeConflictError):
+            merged.merge(second, on_conflict=RAISE_ON_CONFLICT)
+        # Nothing was merged
+        assert merged.get_node(id='NODE_1').name == 'First'
+        assert {node.id for node in merged.topology.nodes} == {'NODE_1', 'NODE_2'}
+
+    def test_manager_merge_unknown_policy(self):
+        with pytest.raises(ValueError):
+            managers.GRENMLManager('Merged').merge(self.network('First'), on_conflict='keep-last')
+
+    def test_manager_delete_renamed_node(self):
+        manager = self.network('Base')
+        node = manager.get_node(id='NODE_1')
+        node.id = 'NODE_3'
+        assert node in manager.topology.nodes
+        assert manager.get_nodes(id__in=['NODE_3']) == {node}
+        manager.delete_nodes(id='NODE_3')
+        assert node not in manager.topology.nodes
+        assert manager.topology.owned_by('INST_ID', NODES) == {manager.get_node(id='NODE_2')}
+
+    def test_manager_snapshot_shares_elements(self):
+        base = self.network('Base')
+        node = base.get_node(id='NODE_1')
+        snapshot = base.snapshot()
+        assert snapshot.topology is not base.topology
+        assert snapshot.topology._id_index[NODES]['NODE_1'] is node
+        assert node._parent is base.topology
+        # Elements are copied as the snapshot hands them out
+        assert snapshot.get_node(id='NODE_1') is not node
+        assert snapshot.get_node(id='NODE_1') == node
+        assert base.get_node(id='NODE_1') is node
+        assert snapshot.topology.fingerprint() == base.topology.fingerprint()
+        assert snapshot.write_to_string() == base.write_to_string()
+
+    def test_manager_snapshot_copies_on_edit(self):
+        base = self.network('Base')
+        base.add_institution(Institution('OTHER_ID', 'Other'))
+        base.topology.add_index('name')
+        snapshot = base.snapshot()
+        snapshot.add_owner_to_node('OTHER_ID', 'NODE_1')
+        snapshot.remove_owner_from_link('INST_ID', 'LINK_ID')
+        snapshot.topology.update_elements_properties(NODES, {'id': 'NODE_2'}, 'tag', 'core', append=True)
+        assert snapshot.get_node(id='NODE_1') is not base.get_node(id='NODE_1')
+        assert snapshot.get_node(id='NODE_1')._owners == {'INST_ID', 'OTHER_ID'}
+        assert base.get_node(id='NODE_1')._owners == {'INST_ID'}
+        assert base.get_link(id='LINK_ID')._owners == {'INST_ID'}
+        assert base.get_node(id='NODE_2').additional_properties == {}
+        assert snapshot.get_node(id='NODE_2').additional_properties == {'tag': ['core']}
+        # The indexes of the snapshot follow the copies
+        assert snapshot.topology.owned_by('OTHER_ID') == {snapshot.get_node(id='NODE_1')}
+        assert base.topology.owned_by('OTHER_ID') == set()
+        assert snapshot.topology.links_of('NODE_1') == {snapshot.get_link(id='LINK_ID')}
+        assert snapshot.get_nodes(name='Node') == {snapshot.get_node(id='NODE_1')}
+        assert snapshot.topology.find_anywhere('NODE_2') is snapshot.get_node(id='NODE_2')
+
+    def test_manager_snapshot_adds_and_deletes(self):
+        base = self.network('Base')
+        snapshot = base.snapshot()
+        snapshot.delete_links(id='LINK_ID')
+        snapshot.add_node(Node('NODE_3', 'Node 3', latitude=3, longitude=3))
+        assert base.get_link(id='LINK_ID').id == 'LINK_ID'
+        with pytest.raises(NodeNotFoundError):
+            base.get_node(id='NODE_3')
+        assert snapshot.get_links() is None
+        assert len(base.get_nodes_within(3, 3, 10)) == 0
+        assert len(snapshot.get_nodes_within(3, 3, 10)) == 1
+
+    def test_manager_snapshot_is_isolated_from_base_edits(self):
+        base = self.network('Base')
+        base.add_institution(Institution('OTHER_ID', 'Other'))
+        snapshot = base.snapshot()
+        node = base.get_node(id='NODE_1')
+        base.add_owner_to_node('OTHER_ID', 'NODE_1')
+        assert snapshot.get_node(id='NODE_1')._owners == {'INST_ID'}
+        assert node._owners == {'INST_ID', 'OTHER_ID'}
+        # Elements got from the snapshot can be changed directly
+        editable = snapshot.get_node(id='NODE_2')
+        editable.latitude = 10
+        assert base.get_node(id='NODE_2').latitude == 2
+        assert snapshot.get_nodes_in_bbox(9, 1, 11, 3) == {editable}
+        assert base.get_nodes_in_bbox(9, 1, 11, 3) == set()
+
+    def test_manager_snapshot_of_sub_topologies(self):
+        base = self.network('Base')
+        sub_topology = Topology(name='Sub', id='SUB_ID')
+        sub_topology.add_node(Node('SUB_NODE', 'Sub Node'))
+        base.topology.add_topology(sub_topology)
+        snapshot = base.snapshot()
+        snapshot_sub_topology = snapshot.topology.find_anywhere('SUB_ID')
+        assert snapshot_sub_topology is not sub_topology
+        assert snapshot.topology.topology_of('SUB_NODE') is snapshot_sub_topology
+        snapshot_sub_topology.delete_elements(NODES, [snapshot.topology.find_anywhere('SUB_NODE')])
+        assert base.topology.find_anywhere('SUB_NODE').id == 'SUB_NODE'
+
+    def test_manager_snapshot_validates_after_edits(self):
+        base = self.network('Base')
+        snapshot = base.snapshot()
+        snapshot.add_node(Node('NODE_3', 'Node 3', latitude=3, longitude=3))
+        snapshot.set_primary_owner('INST_ID')
+        assert snapshot.validate() == []
+        assert 'NODE_3' in snapshot.write_to_string()
+        assert base.validate() == []
+        assert 'NODE_3' not in base.write_to_string()
+
+    def test_manager_snapshot_delete_node(self):
+        base = self.network('Base')
+        snapshot = base.snapshot()
+        snapshot.delete_nodes(id='NODE_2')
+        assert snapshot.get_link(id='LINK_ID').nodes == {snapshot.get_node(id='NODE_1')}
+        assert base.get_link(id='LINK_ID').nodes == {
+            base.get_node(id='NODE_1'), base.get_node(id='NODE_2'),
+        }
+        assert snapshot.topology.links_of('NODE_1') == {snapshot.get_link(id='LINK_ID')}
+
+    def test_manager_snapshot_ignores_direct_edits(self):
+        base = self.network('Base')
+        base.topology.add_index('name')
+        snapshot = base.snapshot()
+        later = snapshot.snapshot()
+        node = base.get_node(id='NODE_1')
+        node.name = 'Renamed'
+        node.id = 'NODE_3'
+        del snapshot
+        assert later.get_node(id='NODE_1').name == 'Node'
+        assert later.get_nodes(name='Renamed') is None
+        assert later.topology.links_of('NODE_1') == {later.get_link(id='LINK_ID')}
+        # A node deleted from the base and edited stays as it was too
+        link = base.get_link(id='LINK_ID')
+        base.delete_links(id='LINK_ID')
+        link.nodes = []
+        assert later.get_link(id='LINK_ID').nodes == {
+            later.get_node(id='NODE_1'), later.get_node(id='NODE_2'),
+        }
+        assert later.validate() == []
+
+    def test_manager_snapshot_leaves_base_elements_as_they_are(self):
+        base = self.network('Base')
+        elements = {element: element._parent for element in base.topology.nodes}
+        fingerprint = base.topology.fingerprint()
+        snapshot = base.snapshot()
+        for node in snapshot.topology.nodes:
+            node.name = 'Renamed'
+            node.owners = node._owners | {'OTHER_ID'}
+        snapshot.get_link(id='LINK_ID').nodes = ['NODE_1']
+        assert {element: element._parent for element in base.topology.nodes} == elements
+        assert base.topology.fingerprint() == fingerprint
+        assert base.get_link(id='LINK_ID').nodes == {
+            base.get_node(id='NODE_1'), base.get_node(id='NODE_2'),
+        }
+        assert base.validate() == []
+
+    def test_manager_copy_topology(self):
+        base = self.network('Base')
+        sub_topology = Topology(name='Sub', id='SUB_ID')
+        sub_topology.add_node(Node('SUB_NODE', 'Sub Node'))
+        base.topology.add_topology(sub_topology)
+        clone = base.topology.copy()
+        assert clone == base.topology
+        assert clone._parent is None
+        assert not base.topology._snapshots
+        for ele_type in (INSTITUTIONS, NODES, LINKS):
+            for element in clone._elements[ele_type]:
+                assert element._parent is clone
+        clone_sub_topology = clone.find_anywhere('SUB_ID')
+        assert clone_sub_topology is not sub_topology
+        assert clone_sub_topology._id_index[NODES]['SUB_NODE'] is not \
+            sub_topology._id_index[NODES]['SUB_NODE']
+        assert clone_sub_topology._id_index[NODES]['SUB_NODE']._parent is clone_sub_topology
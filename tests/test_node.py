@@ -1,5 +1,5 @@
 import pytest
-from grenml.models import Institution, Node
+from grenml.models import Institution, Node, Topology, NODES
 from datetime import datetime
 from dateutil.tz import tzlocal
 
@@ -170,6 +170,16 @@ class TestNode:
         node = Node(lifetime_start=datetime(year=2020, month=2, day=13, hour=13, minute=30, second=40))
         node.lifetime_end = node.lifetime_start
 
+    def test_node_lifetime_epoch(self):
+        node = Node(lifetime_start='2020-03-20T14:30:43+00:00')
+        assert node.lifetime_start_epoch == 1584714643
+        assert node.lifetime_end_epoch is None
+        node.lifetime_end = 1584714700
+        assert node.lifetime_end_epoch == 1584714700
+        assert datetime.fromisoformat(node.lifetime_end).timestamp() == 1584714700
+        node.lifetime_start = None
+        assert node.lifetime_start_epoch is None
+
     @pytest.mark.parametrize(
         'kwargs',
         (
@@ -505,3 +515,56 @@ class TestNode:
         assert new_node_with_institution != new_node_with_institutions
         assert new_node_with_institution != new_node
         assert new_node_with_institutions != new_node
+
+    def test_node_eq_does_not_resolve_owners(self, institutions, monkeypatch):
+        topology = Topology()
+        for institution in institutions:
+            topology.add_institution(institution)
+        node = Node(id=TEST_NODE_ID, name=TEST_NODE_NAME, owners=[TEST_INSTITUTION_ID1])
+        topology.add_node(node)
+
+        def fail(*args):
+            pytest.fail('Equality resolved the owners of the node')
+
+        monkeypatch.setattr(Topology, '_resolve_ids', fail)
+        assert node == Node(id=TEST_NODE_ID, name=TEST_NODE_NAME, owners=[institutions[0]])
+        assert node != Node(id=TEST_NODE_ID, name=TEST_NODE_NAME, owners=[TEST_INSTITUTION_ID2])
+
+    def test_node_fingerprint(self, node_with_all_fields):
+        replica = Node(
+            id=node_with_all_fields.id,
+            name=node_with_all_fields.name,
+            short_name=node_with_all_fields.short_name,
+            owners=node_with_all_fields._owners,
+            longitude=node_with_all_fields.longitude,
+            latitude=node_with_all_fields.latitude,
+            altitude=node_with_all_fields.altitude,
+            unlocode=node_with_all_fields.unlocode,
+            address=node_with_all_fields.address,
+            lifetime_start=node_with_all_fields.lifetime_start,
+            lifetime_end=node_with_all_fields.lifetime_end,
+            version=node_with_all_fields.version,
+        )
+        fingerprint = node_with_all_fields.fingerprint()
+        assert replica.fingerprint() == fingerprint
+        replica.short_name = 'OTHER'
+        assert replica == node_with_all_fields
+        assert replica.fingerprint() != fingerprint
+        replica.short_name = node_with_all_fields.short_name
+        replica.add_property('tag', 'new')
+        assert replica.fingerprint() != fingerprint
+        replica.del_property('tag')
+        assert replica.fingerprint() == fingerprint
+        replica.latitude = 0
+        assert replica.fingerprint() != fingerprint
+
+    def test_topology_fingerprint_follows_elements(self, node_with_all_fields):
+        topology = Topology(id='TOPOLOGY')
+        empty = topology.fingerprint()
+        topology.add_node(node_with_all_fields)
+        with_node = topology.fingerprint()
+        assert with_node != empty
+        node_with_all_fields.name = 'RENAMED'
+        assert topology.fingerprint() != with_node
+        topology.delete_elements(NODES, [node_with_all_fields])
+        assert topology.fingerprint() == empty
@@ -1,7 +1,13 @@
+import asyncio
 import pytest
+from io import BytesIO
+from lxml import etree
+from xml.sax import SAXParseException
 
 import grenml.managers as managers
-from grenml.parse import GRENMLParser
+from grenml.parse import GRENMLParser, SchemaValidationError, FileParseError, load_schema, \
+    parse_many
+from grenml.parsing import GRENMLHandler, UnexpectedElementException
 
 TOPOLOGY_MYISP = 'MyISP'
 TOPOLOGY_ID = 'urn:ogf:network:global_MVP'
@@ -280,3 +286,242 @@ class TestReader:
         assert manager.get_institutions(id__in=third_link.owners)
         check_owners_or_nodes_or_links(manager.get_nodes(id__in=third_link.nodes), {TOPOLOGY_NODE_2, TOPOLOGY_NODE_1})
         manager.validate()
+
+    def test_reader_rejects_invalid_documents(self, parser):
+        """
+        This test checks that a document that does not conform to the schema is
+        rejected, including when the handlers reach the offending element first
+        """
+        with open(SINGLE_LINK_FILE_LOCATION) as xml_file:
+            document = xml_file.read()
+        for invalid in (
+            document.replace('<grenml:lat>', '<grenml:lat>north', 1),
+            document.replace('<grenml:name>', '<grenml:Unknown/><grenml:name>', 1),
+            '<Topology/>',
+        ):
+            with pytest.raises(SchemaValidationError):
+                GRENMLParser().parse_string(invalid)
+
+    def test_reader_malformed_after_invalid_document(self):
+        """
+        This test checks that a malformed document read after one that does not
+        conform to the schema raises a syntax error, not a schema validation error
+        """
+        with open(SINGLE_LINK_FILE_LOCATION, 'rb') as xml_file:
+            document = xml_file.read()
+        invalid = document.replace(b'<grenml:lat>', b'<grenml:lat>north', 1)
+        malformed = document[:len(document) // 2]
+
+        def feed(data):
+            parser = GRENMLParser()
+            parser.feed(data)
+            return parser.close()
+
+        for parse in (
+            lambda data: GRENMLParser().parse_byte_stream(BytesIO(data)),
+            lambda data: list(GRENMLParser().iter_elements(BytesIO(data))),
+            feed,
+        ):
+            with pytest.raises(SchemaValidationError):
+                parse(invalid)
+            with pytest.raises(etree.XMLSyntaxError):
+                parse(malformed)
+
+    def test_reader_iter_elements(self, parser):
+        """
+        This test checks that streaming a document yields the same institutions,
+        nodes and links as parsing it, as they are written in the document
+        """
+        manager = parser.parse_file(MULTI_LINKS_FILE_LOCATION)
+        streamed = list(GRENMLParser().iter_elements(MULTI_LINKS_FILE_LOCATION))
+
+        assert [type(element).__name__ for element in streamed] == \
+            ['Institution'] * 3 + ['Link'] * 3 + ['Node'] * 3
+        for element in streamed:
+            parsed = manager.topology.get_element(
+                type(element).__name__.lower() + 's', id=element.id
+            )
+            assert element.name == parsed.name
+            assert element.version == parsed.version
+        first_link = next(element for element in streamed if element.name == TOPOLOGY_LINK_1)
+        # The primary owner of the topology is only added to the owners when
+        # the link is added to a topology
+        assert first_link.owners == {'urn:ogf:network:local'}
+
+    def test_reader_iter_elements_rejects_invalid_documents(self, parser):
+        """
+        This test checks that streaming a document that does not conform to the
+        schema raises an error
+        """
+        with open(SINGLE_LINK_FILE_LOCATION, 'rb') as xml_file:
+            document = xml_file.read().replace(b'<grenml:lat>', b'<grenml:lat>north')
+        with pytest.raises(SchemaValidationError):
+            list(parser.iter_elements(BytesIO(document)))
+
+    def test_reader_handler_dispatch(self):
+        """
+        This test checks that the handlers of child elements are found from their
+        dispatch tables, and that the handler of a child element is reused
+        """
+        topology_handler = GRENMLHandler.TopologyHandler
+        assert topology_handler.handlers['grenml:Node'] is topology_handler.NodeHandler
+        # A topology can hold topologies
+        assert topology_handler.handlers['grenml:Topology'] is topology_handler
+        with pytest.raises(UnexpectedElementException):
+            topology_handler(None, None).getHandler('grenml:Unknown')
+
+        handler = topology_handler(None, None)
+        node_handler = handler.getChildHandler('grenml:Node')
+        assert node_handler.parent_handler is handler
+        assert handler.getChildHandler('grenml:Node') is node_handler
+
+    def test_reader_handler_error_location(self, tmp_path):
+        """
+        This test checks that an error of the handlers reports the file and the
+        position of the element it was raised for, as the SAX parser did
+        """
+        with open(SINGLE_NODE_FILE_LOCATION) as xml_file:
+            document = xml_file.read()
+        unexpected = document.replace('<grenml:name>', '<grenml:Unknown/><grenml:name>', 1)
+        line = document[:document.index('<grenml:name>')].count('\n') + 1
+        column = unexpected.split('\n')[line - 1].index('<')
+        with pytest.raises(SAXParseException) as raised:
+            GRENMLParser(validate_schema=False).parse_string(unexpected)
+        assert raised.value.getLineNumber() == line
+        assert raised.value.getColumnNumber() == column
+
+        file_name = tmp_path / 'unexpected.xml'
+        file_name.write_text(unexpected)
+        with pytest.raises(SAXParseException) as raised:
+            GRENMLParser(validate_schema=False).parse_file(str(file_name))
+        assert str(raised.value).startswith('{}:{}:{}:'.format(file_name, line, column))
+
+    def test_reader_deprecated_attributes(self):
+        """
+        This test checks that the SAX parser is still available, with a warning, and
+        that the schema can be set
+        """
+        parser = GRENMLParser()
+        with pytest.warns(DeprecationWarning):
+            sax_parser = parser.parser
+        sax_parser.parse(MULTI_LINKS_FILE_LOCATION)
+        assert parser.handler.manager.get_link(name=TOPOLOGY_LINK_1)
+
+        schema = etree.XMLSchema(etree.parse(DEFAULT_FILE_PATH + 'grenml.xsd'))
+        parser = GRENMLParser()
+        parser.schema = schema
+        assert parser.schema is schema
+        parser.schema = None
+        assert not parser.validate_schema
+
+    def test_reader_shares_schema(self):
+        """
+        This test checks that the schema is compiled once for all parsers, and not
+        at all by parsers that do not validate documents
+        """
+        load_schema.cache_clear()
+        unvalidated = GRENMLParser(validate_schema=False)
+        unvalidated.parse_file(MULTI_LINKS_FILE_LOCATION)
+        assert unvalidated.schema is None
+        assert load_schema.cache_info().currsize == 0
+
+        assert GRENMLParser().schema is GRENMLParser().schema
+        assert load_schema.cache_info().misses == 1
+
+    def test_reader_without_validation(self):
+        """
+        This test checks that a parser that does not validate documents reads the
+        same topology, and reads documents that do not conform to the schema
+        """
+        validated = GRENMLParser().parse_file(MULTI_LINKS_FILE_LOCATION)
+        unvalidated = GRENMLParser(validate_schema=False).parse_file(MULTI_LINKS_FILE_LOCATION)
+        assert unvalidated.topology.fingerprint() == validated.topology.fingerprint()
+
+        with open(SINGLE_NODE_FILE_LOCATION) as xml_file:
+            document = xml_file.read()
+        # The schema requires a name before the short name
+        invalid = document.replace('<grenml:name>Node 1</grenml:name>', '')
+        with pytest.raises(SchemaValidationError):
+            GRENMLParser().parse_string(invalid)
+        node = GRENMLParser(validate_schema=False).parse_string(invalid).get_node()
+        assert node.short_name == 'node1'
+
+    def test_reader_parse_many(self):
+        """
+        This test checks that files parsed in a pool of processes read the same
+        topologies as when they are parsed one at a time, and that they can be merged
+        """
+        file_names = [MULTI_INST_FILE_LOCATION, MUlTI_NODES_FILE_LOCATION, MULTI_LINKS_FILE_LOCATION]
+        expected = [GRENMLParser().parse_file(file_name) for file_name in file_names]
+        for workers in (1, 2):
+            parsed = parse_many(file_names, workers=workers)
+            assert [manager.topology.fingerprint() for manager in parsed] == [
+                manager.topology.fingerprint() for manager in expected
+            ]
+        links = parse_many(file_names, workers=2)[2]
+        link = links.get_link(name=TOPOLOGY_LINK_1)
+        assert links.topology.topology_of(link.id, 'links') is links.topology
+
+        merged = parse_many(file_names, workers=2, merge=True)
+        expected_merge = expected[0].merge(*expected[1:])
+        assert merged.topology.fingerprint() == expected_merge.topology.fingerprint()
+        assert parse_many([], merge=True).topology.fingerprint() == (
+            managers.GRENMLManager().topology.fingerprint()
+        )
+
+    def test_reader_parse_many_malformed_file(self, tmp_path):
+        """
+        This test checks that a file the parser or the handlers fail on in a worker
+        process is reported with its name, rather than breaking the pool
+        """
+        with open(SINGLE_NODE_FILE_LOCATION) as xml_file:
+            document = xml_file.read()
+        malformed = tmp_path / 'malformed.xml'
+        malformed.write_text(document[:len(document) // 2])
+        unexpected = tmp_path / 'unexpected.xml'
+        unexpected.write_text(document.replace('<grenml:name>', '<grenml:Unknown/><grenml:name>', 1))
+        for file_name, error in ((malformed, 'XMLSyntaxError'), (unexpected, 'Got unexpected')):
+            for workers in (1, 2):
+                with pytest.raises(FileParseError) as raised:
+                    parse_many([SINGLE_NODE_FILE_LOCATION, str(file_name)], workers=workers,
+                               validate_schema=False)
+                assert raised.value.file_name == str(file_name)
+                assert error in raised.value.message
+
+    def test_reader_feed(self):
+        """
+        This test checks that a document fed to the parser in chunks, or read from an
+        asyncio StreamReader, reads the same topology as when it is parsed at once
+        """
+        with open(MULTI_LINKS_FILE_LOCATION, 'rb') as xml_file:
+            document = xml_file.read()
+        expected = GRENMLParser().parse_file(MULTI_LINKS_FILE_LOCATION).topology.fingerprint()
+
+        parser = GRENMLParser()
+        for i in range(0, len(document), 7):
+            parser.feed(document[i:i + 7])
+        assert parser.close().topology.fingerprint() == expected
+
+        reader = asyncio.StreamReader()
+        reader.feed_data(document)
+        reader.feed_eof()
+        manager = asyncio.run(parser.parse_async(reader, chunk_size=100))
+        assert manager.topology.fingerprint() == expected
+
+    def test_reader_feed_rejects_invalid_documents(self):
+        """
+        This test checks that a document fed to the parser is validated, and that the
+        parser can then be fed another document
+        """
+        with open(MULTI_LINKS_FILE_LOCATION, 'rb') as xml_file:
+            document = xml_file.read()
+        # The schema requires a name before the short name
+        invalid = document.replace(b'<grenml:name>Node 1</grenml:name>', b'')
+        parser = GRENMLParser()
+        with pytest.raises(SchemaValidationError):
+            parser.feed(invalid)
+            parser.close()
+
+        parser.feed(document)
+        manager = parser.close()
+        assert manager.get_link(name=TOPOLOGY_LINK_1).name == TOPOLOGY_LINK_1
@@ -1,8 +1,11 @@
 import pytest
-from grenml.models import Topology, Link, Institution, Node, INSTITUTIONS, NODES, LINKS
+from grenml.models import Topology, Link, Institution, Node, INSTITUTIONS, NODES, LINKS, TOPOLOGIES
+from grenml.models import GLOBAL_INSTITUTION_ID
 from grenml.exceptions import InstitutionNotFoundError, NodeNotFoundError, \
-    LinkNotFoundError
+    LinkNotFoundError, MatchError, MultipleReturnedError, ObjectNotFoundError, \
+    AttributeIdError
 from grenml.validation import TopologyValidator
+from grenml.models import topologies
 
 TOPOLOGY_TEST_NAME = 'TEST_TOPOLOGY_NAME'
 TOPOLOGY_TEST_ID = 'TEST_TOPOLOGY_ID'
@@ -25,6 +28,25 @@ LINK_TEST_ID_2 = 'TEST_LINK_ID_2'
 LINK_TEST_NAME_2 = 'TEST_LINK_NAME_2'
 
 
+def counted_matches(monkeypatch):
+    """
+    Record the id of every element a topology search is matched against
+    """
+    matched = []
+    compile_match = topologies.compile_match
+
+    def counting_compile_match(**kwargs):
+        predicate = compile_match(**kwargs)
+
+        def counting_predicate(element):
+            matched.append(element.id)
+            return predicate(element)
+        return counting_predicate
+
+    monkeypatch.setattr(topologies, 'compile_match', counting_compile_match)
+    return matched
+
+
 class TestTopology:
 
     @pytest.fixture
@@ -220,6 +242,316 @@ class TestTopology:
         with pytest.raises(NodeNotFoundError):
             topology.get_element(NODES, id=NODE_TEST_ID)
 
+    def test_topology_id_index_follows_add_and_delete(self, topology, nodes):
+        assert topology._id_index[NODES] == {node.id: node for node in nodes}
+        topology.delete_elements(NODES, [NODE_TEST_ID_2])
+        assert NODE_TEST_ID_2 not in topology._id_index[NODES]
+        assert topology.get_elements(NODES, id=NODE_TEST_ID_2) is None
+        topology.add_node(nodes[1])
+        assert topology.get_element(NODES, id=NODE_TEST_ID_2) is nodes[1]
+
+    def test_topology_get_element_by_id_does_not_scan(self, topology, monkeypatch):
+        matched = counted_matches(monkeypatch)
+        topology.get_element(NODES, id=NODE_TEST_ID)
+        assert matched == [NODE_TEST_ID]
+        matched.clear()
+        found = topology.get_elements(NODES, id__in=[NODE_TEST_ID, NODE_TEST_ID_3, 'MISSING'])
+        assert {node.id for node in found} == {NODE_TEST_ID, NODE_TEST_ID_3}
+        assert sorted(matched) == sorted([NODE_TEST_ID, NODE_TEST_ID_3])
+
+    @pytest.mark.parametrize(
+        'kwargs, expected_ids',
+        (
+            ({'id__in': [NODE_TEST_ID, NODE_TEST_ID_2], 'name': NODE_TEST_NAME_2}, {NODE_TEST_ID_2}),
+            ({'id__in': 'TEST_NODE_ID_2 TEST_NODE_ID_3'}, {NODE_TEST_ID, NODE_TEST_ID_2, NODE_TEST_ID_3}),
+            ({'id__in': [['unhashable'], NODE_TEST_ID]}, {NODE_TEST_ID}),
+            ({'id': ['unhashable']}, set()),
+        ),
+        ids=['ids and name', 'substring', 'unhashable id in list', 'unhashable id'],
+    )
+    def test_topology_get_elements_with_indexed_id(self, topology, kwargs, expected_ids):
+        found = topology.get_elements(NODES, **kwargs) or set()
+        assert {node.id for node in found} == expected_ids
+
+    def test_topology_resolves_references_without_scanning(self, topology, institutions, nodes, monkeypatch):
+        matched = counted_matches(monkeypatch)
+        link = topology.get_element(LINKS, id=LINK_TEST_ID)
+        matched.clear()
+        assert link.owners == set(institutions)
+        assert link.nodes == {nodes[0], nodes[1]}
+        assert nodes[2].owners == {institutions[0], institutions[1]}
+        assert matched == []
+
+        topology.delete_elements(NODES, [nodes[1]])
+        topology.delete_elements(INSTITUTIONS, [institutions[1]])
+        assert link.nodes == {nodes[0]}
+        assert link.owners == {institutions[0], institutions[2]}
+
+    def test_topology_links_of_node(self, topology, nodes, links):
+        assert topology.links_of(NODE_TEST_ID_2) == set(links)
+        assert topology.links_of(nodes[0]) == {links[0]}
+        assert topology.links_of('MISSING') == set()
+
+        links[0].nodes = [nodes[0].id, nodes[2].id]
+        assert topology.links_of(NODE_TEST_ID_2) == {links[1]}
+        assert topology.links_of(NODE_TEST_ID_3) == set(links)
+
+        topology.delete_elements(LINKS, [links[1]])
+        assert topology.links_of(NODE_TEST_ID_3) == {links[0]}
+        assert topology.links_of(NODE_TEST_ID_2) == set()
+
+    def test_topology_owned_by_institution(self, topology, nodes, links):
+        assert topology.owned_by(INSTITUTION_TEST_ID) == set(nodes) | set(links)
+        assert topology.owned_by(INSTITUTION_TEST_ID_2, NODES) == {nodes[0], nodes[2]}
+        assert topology.owned_by(INSTITUTION_TEST_ID_3, LINKS) == {links[0]}
+
+        topology.add_owner(LINKS, LINK_TEST_ID_2, INSTITUTION_TEST_ID_3)
+        assert topology.owned_by(INSTITUTION_TEST_ID_3, LINKS) == set(links)
+        topology.remove_owner(NODES, NODE_TEST_ID, INSTITUTION_TEST_ID_3)
+        assert topology.owned_by(INSTITUTION_TEST_ID_3, NODES) == set()
+
+        nodes[1].owners = [INSTITUTION_TEST_ID_3]
+        assert topology.owned_by(INSTITUTION_TEST_ID_3, NODES) == {nodes[1]}
+        topology.delete_elements(NODES, [nodes[1]])
+        assert topology.owned_by(INSTITUTION_TEST_ID_3) == set(links)
+
+    @pytest.fixture
+    def nested_topology(self, topology):
+        middle = Topology(TOPOLOGY_TEST_NAME, id='MIDDLE_ID')
+        middle.add_node(Node('MIDDLE_NODE_ID', NODE_TEST_NAME))
+        leaf = Topology(TOPOLOGY_TEST_NAME, id='LEAF_ID')
+        leaf.add_node(Node('LEAF_NODE_ID', NODE_TEST_NAME))
+        # Sub-topologies are indexed whether they are attached before or
+        # after their own sub-topologies
+        topology.add_topology(middle)
+        middle.add_topology(leaf)
+        leaf.add_node(Node('LATE_NODE_ID', NODE_TEST_NAME))
+        return topology
+
+    def test_topology_find_anywhere(self, nested_topology, monkeypatch):
+        middle = nested_topology.get_element(TOPOLOGIES, id='MIDDLE_ID')
+        leaf = middle.get_element(TOPOLOGIES, id='LEAF_ID')
+        late_node = leaf.get_element(NODES, id='LATE_NODE_ID')
+        matched = counted_matches(monkeypatch)
+        for topology in (nested_topology, middle, leaf):
+            assert topology.find_anywhere('LATE_NODE_ID') is late_node
+            assert topology.find_anywhere(NODE_TEST_ID, NODES).id == NODE_TEST_ID
+            assert topology.topology_of('MIDDLE_NODE_ID') is middle
+            assert topology.topology_of('LEAF_ID', TOPOLOGIES) is middle
+            assert topology.topology_of(GLOBAL_INSTITUTION_ID) is nested_topology
+        assert matched == []
+        with pytest.raises(ObjectNotFoundError):
+            leaf.find_anywhere('MISSING')
+        with pytest.raises(NodeNotFoundError):
+            leaf.find_anywhere(LINK_TEST_ID, NODES)
+
+    def test_topology_find_anywhere_duplicate_ids(self, nested_topology):
+        leaf = nested_topology.find_anywhere('LEAF_ID')
+        leaf.add_node(Node(NODE_TEST_ID, NODE_TEST_NAME))
+        with pytest.raises(MultipleReturnedError):
+            nested_topology.find_anywhere(NODE_TEST_ID)
+        leaf.delete_elements(NODES, [leaf.get_element(NODES, id=NODE_TEST_ID)])
+        assert nested_topology.topology_of(NODE_TEST_ID) is nested_topology
+
+    def test_topology_rename_element(self, nested_topology, nodes):
+        before = nested_topology.fingerprint()
+        leaf_node = nested_topology.find_anywhere('LEAF_NODE_ID')
+        leaf_node.id = 'RENAMED_ID'
+        nodes[0].id = 'RENAMED_ID_2'
+        assert nested_topology.find_anywhere('RENAMED_ID') is leaf_node
+        assert nested_topology.get_element(NODES, id='RENAMED_ID_2') is nodes[0]
+        assert nested_topology.get_elements(NODES, id=NODE_TEST_ID) is None
+        with pytest.raises(ObjectNotFoundError):
+            nested_topology.find_anywhere('LEAF_NODE_ID')
+        with pytest.raises(AttributeIdError):
+            nodes[0].id = NODE_TEST_ID_2
+        assert nodes[0].id == 'RENAMED_ID_2'
+        leaf_node.id = 'LEAF_NODE_ID'
+        nodes[0].id = NODE_TEST_ID
+        assert nested_topology.fingerprint() == before
+
+    def test_topology_search_and_delete_renamed_element(self, topology, nodes, links):
+        topology.add_index('name')
+        topology.get_elements_in_bbox(NODES, -1, -1, 1, 1)
+        nodes[1].id = 'RENAMED_ID'
+        links[0].id = 'RENAMED_LINK_ID'
+        assert nodes[1] in topology.nodes
+        assert links[0] in topology.links
+        assert topology.get_element(NODES, name=NODE_TEST_NAME_2) is nodes[1]
+        assert nodes[1] in topology.get_elements_in_bbox(NODES, -1, -1, 1, 1)
+        assert nodes[1] in topology.owned_by(INSTITUTION_TEST_ID)
+        assert topology.links_of(NODE_TEST_ID) == {links[0]}
+        topology.delete_elements(NODES, [topology.get_element(NODES, id='RENAMED_ID')])
+        topology.delete_elements(LINKS, [topology.get_element(LINKS, id='RENAMED_LINK_ID')])
+        assert nodes[1] not in topology.nodes
+        assert topology.get_elements(NODES, name=NODE_TEST_NAME_2) is None
+        assert nodes[1] not in topology.get_elements_in_bbox(NODES, -1, -1, 1, 1)
+        assert nodes[1] not in topology.owned_by(INSTITUTION_TEST_ID)
+        assert topology.links_of(NODE_TEST_ID) == set()
+
+    def test_topology_iter_all_nodes(self, nested_topology):
+        expected = {NODE_TEST_ID, NODE_TEST_ID_2, NODE_TEST_ID_3, 'MIDDLE_NODE_ID', 'LEAF_NODE_ID', 'LATE_NODE_ID'}
+        assert {node.id for node in nested_topology.iter_all_nodes()} == expected
+        assert {link.id for link in nested_topology.iter_all_links()} == {LINK_TEST_ID, LINK_TEST_ID_2}
+        assert sum(
+            institution.id == GLOBAL_INSTITUTION_ID for institution in nested_topology.iter_all_institutions()
+        ) == 1
+        nested_topology.find_anywhere('LEAF_ID').delete_elements(
+            NODES, [nested_topology.find_anywhere('LEAF_NODE_ID')]
+        )
+        assert {node.id for node in nested_topology.iter_all_nodes()} == expected - {'LEAF_NODE_ID'}
+
+    def test_topology_detached_sub_topology_has_its_own_index(self, nested_topology):
+        middle = nested_topology.find_anywhere('MIDDLE_ID')
+        nested_topology.delete_elements(TOPOLOGIES, [middle])
+        with pytest.raises(ObjectNotFoundError):
+            nested_topology.find_anywhere('LEAF_NODE_ID')
+        assert {node.id for node in nested_topology.iter_all_nodes()} == {NODE_TEST_ID, NODE_TEST_ID_2, NODE_TEST_ID_3}
+        assert {node.id for node in middle.iter_all_nodes()} == {'MIDDLE_NODE_ID', 'LEAF_NODE_ID', 'LATE_NODE_ID'}
+        assert middle.topology_of(GLOBAL_INSTITUTION_ID) is middle
+        middle.find_anywhere('LEAF_ID').add_node(Node('NEW_NODE_ID', NODE_TEST_NAME))
+        assert middle.topology_of('NEW_NODE_ID').id == 'LEAF_ID'
+        with pytest.raises(ObjectNotFoundError):
+            nested_topology.find_anywhere('NEW_NODE_ID')
+
+    def test_topology_global_index_kept_after_first_search(self, topology):
+        assert topology.topology_of(NODE_TEST_ID) is topology
+        middle = Topology(TOPOLOGY_TEST_NAME, id='MIDDLE_ID')
+        leaf = Topology(TOPOLOGY_TEST_NAME, id='LEAF_ID')
+        leaf.add_node(Node('LEAF_NODE_ID', NODE_TEST_NAME))
+        middle.add_topology(leaf)
+        assert middle.topology_of('LEAF_NODE_ID') is leaf
+        topology.add_topology(middle)
+        leaf.add_node(Node('LATE_NODE_ID', NODE_TEST_NAME))
+        assert topology.topology_of('LEAF_NODE_ID') is leaf
+        assert leaf.topology_of('LATE_NODE_ID') is leaf
+        assert leaf.topology_of(GLOBAL_INSTITUTION_ID) is topology
+        topology.delete_elements(TOPOLOGIES, [middle])
+        with pytest.raises(ObjectNotFoundError):
+            topology.find_anywhere('LATE_NODE_ID')
+        assert leaf.topology_of(GLOBAL_INSTITUTION_ID) is middle
+
+    def test_topology_iter_elements_is_lazy(self, topology, monkeypatch):
+        matched = counted_matches(monkeypatch)
+        matches = topology.iter_elements(NODES, owners__contains=INSTITUTION_TEST_ID)
+        assert matched == []
+        assert next(matches).id in {NODE_TEST_ID, NODE_TEST_ID_2, NODE_TEST_ID_3}
+        assert len(matched) == 1
+        assert len(list(matches)) == 2
+
+    def test_topology_get_element_stops_at_second_match(self, topology, monkeypatch):
+        matched = counted_matches(monkeypatch)
+        with pytest.raises(MultipleReturnedError):
+            topology.get_element(NODES, owners__contains=INSTITUTION_TEST_ID)
+        assert len(matched) == 2
+
+    def test_topology_invalid_match_extension_raises_before_matching(self, simple_topology):
+        with pytest.raises(MatchError):
+            simple_topology.get_elements(NODES, name__startswith='TEST')
+
+    @staticmethod
+    def rebuilt(topology):
+        """
+        A new topology with copies of the elements of a topology
+        """
+        copy = Topology(id=topology.id, name=topology.name)
+        for ele_type in (INSTITUTIONS, NODES, LINKS):
+            for element in topology._elements[ele_type]:
+                if element.id != GLOBAL_INSTITUTION_ID:
+                    copy._add_element(ele_type, element.copy())
+        for sub_topology in topology.topologies:
+            copy.add_topology(TestTopology.rebuilt(sub_topology))
+        return copy
+
+    def test_topology_fingerprint_is_incremental(self, nested_topology, nodes, links):
+        assert nested_topology.fingerprint() == self.rebuilt(nested_topology).fingerprint()
+        before = nested_topology.fingerprint()
+        nodes[0].name = 'RENAMED'
+        links[1].add_property('tag', 'core')
+        nested_topology.delete_elements(NODES, [nodes[1]])
+        nested_topology.add_node(Node('NEW_NODE_ID', NODE_TEST_NAME))
+        changed = nested_topology.fingerprint()
+        assert changed != before
+        assert changed == self.rebuilt(nested_topology).fingerprint()
+        nodes[0].name = NODE_TEST_NAME
+        links[1].del_property('tag')
+        nested_topology.delete_elements(NODES, [nested_topology.get_element(NODES, id='NEW_NODE_ID')])
+        nested_topology.add_node(nodes[1])
+        assert nested_topology.fingerprint() == before
+
+    def test_topology_fingerprint_follows_sub_topologies(self, nested_topology):
+        before = nested_topology.fingerprint()
+        leaf_node = nested_topology.find_anywhere('LEAF_NODE_ID')
+        leaf_node.name = 'RENAMED'
+        assert nested_topology.fingerprint() != before
+        leaf_node.name = NODE_TEST_NAME
+        assert nested_topology.fingerprint() == before
+        nested_topology.find_anywhere('LEAF_ID').name = 'RENAMED'
+        assert nested_topology.fingerprint() != before
+
+    def test_topology_fingerprint_only_digests_changes(self, nested_topology, nodes, monkeypatch):
+        nested_topology.fingerprint()
+        digested = []
+        content_digest = Node._content_digest
+
+        def counted_content_digest(element):
+            digested.append(element.id)
+            return content_digest(element)
+
+        monkeypatch.setattr(Node, '_content_digest', counted_content_digest)
+        nodes[0].name = 'RENAMED'
+        nodes[0].name = 'RENAMED AGAIN'
+        nested_topology.find_anywhere('LEAF_NODE_ID').latitude = 10
+        nested_topology.fingerprint()
+        assert sorted(digested) == sorted([NODE_TEST_ID, 'LEAF_NODE_ID'])
+        digested.clear()
+        nested_topology.fingerprint()
+        assert digested == []
+
+    def test_topology_fingerprint_tracks_changes_once_computed(self, topology, nodes):
+        nodes[0].name = 'RENAMED'
+        assert topology._digests is None and topology._stale == {}
+        before = topology.fingerprint()
+        nodes[0].name = NODE_TEST_NAME
+        assert list(topology._stale.values()) == [(NODES, nodes[0])]
+        assert topology.fingerprint() != before
+
+    def test_topology_fingerprint_after_shared_edit(self, topology, nodes):
+        topology.fingerprint()
+        snapshot = topology.snapshot()
+        nodes[0].name = 'RENAMED'
+        assert snapshot.fingerprint() != topology.fingerprint()
+        snapshot.delete_elements(NODES, [snapshot.get_element(NODES, id=nodes[0].id)])
+        topology.delete_elements(NODES, [nodes[0]])
+        assert snapshot.fingerprint() == topology.fingerprint()
+
+    def test_topology_name_index(self, topology, nodes, monkeypatch):
+        topology.add_index('name')
+        matched = counted_matches(monkeypatch)
+        assert topology.get_element(NODES, name=NODE_TEST_NAME_2) is nodes[1]
+        assert matched == [NODE_TEST_ID_2]
+
+        nodes[1].name = 'RENAMED'
+        assert topology.get_elements(NODES, name=NODE_TEST_NAME_2) is None
+        assert topology.get_element(NODES, name='RENAMED') is nodes[1]
+
+        topology.delete_elements(NODES, [nodes[1]])
+        assert topology.get_elements(NODES, name='RENAMED') is None
+        assert 'RENAMED' not in topology._attribute_indexes['name'][NODES]
+
+    def test_topology_short_name_index_on_creation(self, institutions):
+        topology = Topology(name=TOPOLOGY_TEST_NAME, indexed_attributes=('short_name',))
+        institutions[0].short_name = 'SHORT'
+        topology.add_institution(institutions[0])
+        assert topology.get_element(INSTITUTIONS, short_name='SHORT') is institutions[0]
+        institutions[0].short_name = None
+        assert topology.get_elements(INSTITUTIONS, short_name='SHORT') is None
+        assert institutions[0] in topology.get_elements(INSTITUTIONS, short_name=None)
+
+    def test_topology_index_unsupported_attribute(self, topology):
+        with pytest.raises(ValueError):
+            topology.add_index('latitude')
+
     def test_assigns_primary_owner_with_institution(self, topology, institution):
         topology.primary_owner = institution
         assert topology.primary_owner == institution